@@ -1,47 +1,87 @@
 from dotenv import load_dotenv
-from openai import OpenAI
-import os
-import sys
+import random
+import time
+from cache_utils import get_default_cache
+from backend_utils import RETRYABLE_ERRORS, get_backend
+
+# bump whenever the explain prompt changes so stale cached explanations are not served
+EXPLAIN_PROMPT_VERSION = 1
+
+# per-call timeouts (seconds) and retry policy for 429 / 5xx / network errors
+EXPLAIN_TIMEOUT = 30
+GENERATE_TIMEOUT = 90
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
 
 load_dotenv()
 class AIChatbot:
-    def __init__(self):
-        api_key = os.getenv("OPENROUTER_API_KEY")
-
-        # Create client with OpenRouter base URL
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=api_key
-        )
+    def __init__(self, cache=None, backend=None):
+        # Shared backend: the live OpenRouter client unless AI_BACKEND says record/replay.
+        # Resolved on first use so startup doesn't import or build the OpenAI client.
+        self._backend = backend
         #self.model = "meta-llama/llama-3.1-405b-instruct:free"
         self.model = "meta-llama/llama-3.3-70b-instruct:free"
+        self.explanation_cache = cache if cache is not None else get_default_cache()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = get_backend()
+        return self._backend
+
+    def _call(self, method, messages, max_tokens, timeout):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return method(self.model, messages, max_tokens, 0.5, timeout)
+            except RETRYABLE_ERRORS as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = e.retry_after
+                if delay is None:
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+                    delay = random.uniform(0, delay) + delay / 2   # jitter so a burst of clients spreads out
+                time.sleep(delay)
+
+    def explanation_key(self, term):
+        return self.explanation_cache.make_key(self.model, term, EXPLAIN_PROMPT_VERSION)
+
+    def explain_term(self, term, refresh=False):
+        # refresh=True skips the cache lookup and overwrites the cached entry
+        key = self.explanation_key(term)
+        if not refresh:
+            cached = self.explanation_cache.get(key)
+            if cached is not None:
+                return cached
 
-    def explain_term(self, term):
         prompt = f"Explain the term '{term}' in one concise paragraph. Do not include reasoning steps, lists, or meta-commentary — only give the final explanation."
-        response = self.client.chat.completions.create(
-        model=self.model,
-        messages=[
-            {"role": "system", "content": "You are a helpful tutor. Always respond with a single clear explanatory paragraph, without showing reasoning or internal thoughts."},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=150,
-        temperature=0.5,
+        explanation = self._call(
+            self.backend.complete,
+            [
+                {"role": "system", "content": "You are a helpful tutor. Always respond with a single clear explanatory paragraph, without showing reasoning or internal thoughts."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=150,
+            timeout=EXPLAIN_TIMEOUT,
         )
-        explanation = response.choices[0].message.content.strip()
-        
+        self.explanation_cache.put(key, explanation)
+
         return explanation
-    
+
     def generate_test(self, prompt):
-        try:   
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1024,
-                temperature=0.5,
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Error: {str(e)}")
-            sys.exit(1)
\ No newline at end of file
+        return self._call(
+            self.backend.complete,
+            [{"role": "user", "content": prompt}],
+            max_tokens=1024,
+            timeout=GENERATE_TIMEOUT,
+        )
+
+    def stream_test(self, prompt):
+        # same request as generate_test, but yields the completion text as it arrives;
+        # only opening the stream is retried, a stream that breaks midway raises
+        yield from self._call(
+            self.backend.stream,
+            [{"role": "user", "content": prompt}],
+            max_tokens=1024,
+            timeout=GENERATE_TIMEOUT,
+        )
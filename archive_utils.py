@@ -0,0 +1,135 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+# history is sealed into one segment per calendar month
+SEGMENT_KEY_LENGTH = len("YYYY-MM")
+
+
+def segment_key(timestamp):
+    """Segment a record belongs to, from its ISO timestamp ("2025-10-28T07:42:44" -> "2025-10")."""
+    return (timestamp or "")[:SEGMENT_KEY_LENGTH]
+
+
+def summarize(records):
+    """Date range, count and per-card score aggregates for a batch of records."""
+    stamps = [r.get("timestamp") or "" for r in records]
+    cards = {}
+    for r in records:
+        c = cards.setdefault(r.get("card_name"), {"count": 0, "percent_sum": 0.0, "best": None, "worst": None,
+                                                 "first": None, "last": None})
+        percent = float(r.get("percent") or 0.0)
+        ts = r.get("timestamp") or ""
+        c["count"] += 1
+        c["percent_sum"] += percent
+        c["best"] = percent if c["best"] is None else max(c["best"], percent)
+        c["worst"] = percent if c["worst"] is None else min(c["worst"], percent)
+        c["first"] = ts if c["first"] is None else min(c["first"], ts)
+        c["last"] = ts if c["last"] is None else max(c["last"], ts)
+    return {"start": min(stamps, default=None), "end": max(stamps, default=None),
+            "count": len(records), "cards": cards}
+
+
+def merge_summaries(summaries):
+    """Combine summarize() results (e.g. every sealed segment plus the hot log)."""
+    out = {"start": None, "end": None, "count": 0, "cards": {}}
+    for s in summaries:
+        if not s["count"]:
+            continue
+        out["start"] = s["start"] if out["start"] is None else min(out["start"], s["start"])
+        out["end"] = s["end"] if out["end"] is None else max(out["end"], s["end"])
+        out["count"] += s["count"]
+        for name, c in s["cards"].items():
+            m = out["cards"].get(name)
+            if m is None:
+                out["cards"][name] = dict(c)
+                continue
+            m["count"] += c["count"]
+            m["percent_sum"] += c["percent_sum"]
+            m["best"] = max(m["best"], c["best"])
+            m["worst"] = min(m["worst"], c["worst"])
+            m["first"] = min(m["first"], c["first"])
+            m["last"] = max(m["last"], c["last"])
+    return out
+
+
+class HistoryArchive:
+    """
+    Sealed, gzip-compressed segments of the results log plus a small summary index.
+
+    <results>.archive/index.json lists every segment with its file, date range, count and
+    per-card aggregates, so queries can decide which segments to open without reading them.
+    Segments are immutable once written; a late record for an already sealed month goes into
+    an extra part file for that month.
+    """
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.json"
+        self._segments = None
+
+    @property
+    def segments(self):
+        if self._segments is None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self._segments = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._segments = []
+        return self._segments
+
+    def _write_index(self):
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.segments, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    # ---------- writing ----------
+    def seal(self, key, records):
+        """Write records (all from segment key) as a new compressed segment and index it."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        taken = {s["file"] for s in self.segments}
+        name = f"{key}.jsonl.gz"
+        part = 1
+        while name in taken or (self.directory / name).exists():
+            name = f"{key}.{part}.jsonl.gz"
+            part += 1
+        path = self.directory / name
+        tmp_path = path.with_name(path.name + ".tmp")
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with open(tmp_path, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(data.encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+        self.segments.append({"file": name, "key": key, **summarize(records)})
+        self.segments.sort(key=lambda s: (s["start"] or "", s["file"]))
+        self._write_index()
+
+    # ---------- reading ----------
+    def iter_lines(self, segment):
+        """Stream the raw JSON lines of a segment without holding the whole segment."""
+        with gzip.open(self.directory / segment["file"], "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+    def read(self, segment):
+        return [json.loads(line) for line in self.iter_lines(segment)]
+
+    def select(self, card_name=None, start=None, end=None):
+        """Segments (oldest first) that can hold records for card_name within [start, end)."""
+        out = []
+        for s in self.segments:
+            if card_name is not None and card_name not in s["cards"]:
+                continue
+            if start is not None and (s["end"] or "") < start:
+                continue
+            if end is not None and (s["start"] or "") >= end:
+                continue
+            out.append(s)
+        return out
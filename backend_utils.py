@@ -0,0 +1,294 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+# ---------- Errors the UI can handle ----------
+class AIError(Exception):
+    """Base class for failures talking to the model."""
+    retry_after = None
+
+class AIRateLimitError(AIError):
+    pass
+
+class AITimeoutError(AIError):
+    pass
+
+class AIServiceError(AIError):
+    """Provider-side (5xx) or network failure."""
+
+class AIAuthError(AIError):
+    pass
+
+# worth another attempt with backoff
+RETRYABLE_ERRORS = (AIRateLimitError, AITimeoutError, AIServiceError)
+
+
+# A backend turns one chat request into text. Every backend has the same two methods:
+#
+#     complete(model, messages, max_tokens, temperature, timeout) -> str
+#     stream(model, messages, max_tokens, temperature, timeout) -> iterator of text chunks
+#
+# stream() opens the request eagerly, so errors while connecting surface (and are retried)
+# before the first chunk is consumed.
+
+
+# ---------- Live backend (OpenRouter / any OpenAI-compatible server) ----------
+BASE_URL = "https://openrouter.ai/api/v1"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """One OpenAI client per process, so every caller shares a single keep-alive connection pool."""
+    global _client
+    import httpx
+    from openai import OpenAI
+    with _client_lock:
+        if _client is None:
+            http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+                timeout=httpx.Timeout(90, connect=10),
+            )
+            _client = OpenAI(
+                # AI_BASE_URL points the app at a local stand-in such as replay_server.py
+                base_url=os.getenv("AI_BASE_URL", BASE_URL),
+                api_key=os.getenv("OPENROUTER_API_KEY") or "not-needed",
+                http_client=http_client,
+                max_retries=0,   # retries are done by AIChatbot with jittered backoff
+            )
+        return _client
+
+
+def _to_ai_error(e):
+    import openai
+    if isinstance(e, AIError):
+        return e
+    if isinstance(e, openai.RateLimitError):
+        err = AIRateLimitError("The AI service is rate limiting requests. Please try again shortly.")
+    elif isinstance(e, openai.APITimeoutError):
+        err = AITimeoutError("The AI service took too long to respond.")
+    elif isinstance(e, (openai.AuthenticationError, openai.PermissionDeniedError)):
+        err = AIAuthError("The AI service rejected the API key (check OPENROUTER_API_KEY).")
+    elif isinstance(e, openai.APIConnectionError):
+        err = AIServiceError("Could not reach the AI service.")
+    elif isinstance(e, openai.APIStatusError) and e.status_code >= 500:
+        err = AIServiceError(f"The AI service returned an error ({e.status_code}).")
+    elif isinstance(e, openai.APIStatusError):
+        err = AIError(f"The AI service rejected the request ({e.status_code}).")
+    else:
+        err = AIError(str(e))
+    # honour the server's Retry-After header when it sends one
+    try:
+        err.retry_after = float(e.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return err
+
+
+class OpenAIBackend:
+    def __init__(self, client=None):
+        self.client = client if client is not None else get_client()
+
+    def complete(self, model, messages, max_tokens, temperature, timeout):
+        try:
+            response = self.client.chat.completions.create(
+                model=model, messages=messages, max_tokens=max_tokens,
+                temperature=temperature, timeout=timeout,
+            )
+        except Exception as e:
+            raise _to_ai_error(e) from e
+        return response.choices[0].message.content.strip()
+
+    def stream(self, model, messages, max_tokens, temperature, timeout):
+        try:
+            stream = self.client.chat.completions.create(
+                model=model, messages=messages, max_tokens=max_tokens,
+                temperature=temperature, timeout=timeout, stream=True,
+            )
+        except Exception as e:
+            raise _to_ai_error(e) from e
+        return self._chunks(stream)
+
+    @staticmethod
+    def _chunks(stream):
+        # a stream that breaks midway is not retried; it just raises
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except Exception as e:
+            raise _to_ai_error(e) from e
+
+
+# ---------- Recordings ----------
+def request_key(model, messages, max_tokens, temperature):
+    payload = json.dumps([model, messages, max_tokens, temperature], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def prompt_prefix(messages, length=80):
+    # requests built from the same template share this even when their details differ
+    return messages[-1]["content"][:length] if messages else ""
+
+
+class RecordingStore:
+    """Recorded completions in a JSON-Lines file: one {key, prefix, model, messages, response, latency} per line."""
+    def __init__(self, file_path: Path | str):
+        self.file_path = Path(file_path)
+        self._lock = threading.Lock()
+
+    def load(self):
+        records = []
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            records.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def append(self, record):
+        with self._lock, open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class RecordingBackend:
+    """Passes requests to a live backend and appends every completion to a RecordingStore."""
+    def __init__(self, store, inner=None):
+        self.store = store if isinstance(store, RecordingStore) else RecordingStore(store)
+        self.inner = inner if inner is not None else OpenAIBackend()
+
+    def _record(self, model, messages, max_tokens, temperature, text, latency):
+        self.store.append({
+            "key": request_key(model, messages, max_tokens, temperature),
+            "prefix": prompt_prefix(messages),
+            "model": model,
+            "messages": messages,
+            "response": text,
+            "latency": round(latency, 4),
+        })
+
+    def complete(self, model, messages, max_tokens, temperature, timeout):
+        start = time.perf_counter()
+        text = self.inner.complete(model, messages, max_tokens, temperature, timeout)
+        self._record(model, messages, max_tokens, temperature, text, time.perf_counter() - start)
+        return text
+
+    def stream(self, model, messages, max_tokens, temperature, timeout):
+        start = time.perf_counter()
+        chunks = self.inner.stream(model, messages, max_tokens, temperature, timeout)
+
+        def recorded():
+            parts = []
+            for chunk in chunks:
+                parts.append(chunk)
+                yield chunk
+            self._record(model, messages, max_tokens, temperature, "".join(parts).strip(),
+                         time.perf_counter() - start)
+        return recorded()
+
+
+class ReplayBackend:
+    """
+    Serves recorded completions without any network access.
+    A request is matched by its exact key first, then by prompt prefix (so e.g. grading prompts
+    with different student answers still get a grading response). Latency is simulated: the
+    recorded latency times latency_scale (or a fixed `latency`), plus uniform +/- jitter;
+    streamed responses are split into small chunks spread over that time.
+    error_rate makes a share of calls fail with AIServiceError to exercise retries.
+    """
+    def __init__(self, recordings, latency=None, latency_scale=1.0, jitter=0.0, error_rate=0.0,
+                 chunk_chars=12, seed=None):
+        store = recordings if isinstance(recordings, RecordingStore) else RecordingStore(recordings)
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_chars = chunk_chars
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_prefix = {}
+        for record in store.load():
+            self._by_key.setdefault(record["key"], []).append(record)
+            self._by_prefix.setdefault(record.get("prefix", ""), []).append(record)
+        # several recordings of one request are served round-robin
+        self._cycles = {}
+
+    def __len__(self):
+        return sum(len(v) for v in self._by_key.values())
+
+    def _lookup(self, model, messages, max_tokens, temperature):
+        key = request_key(model, messages, max_tokens, temperature)
+        bucket_key, bucket = key, self._by_key.get(key)
+        if not bucket:
+            bucket_key = "prefix:" + prompt_prefix(messages)
+            bucket = self._by_prefix.get(prompt_prefix(messages))
+        if not bucket:
+            raise AIError("No recorded completion matches this request.")
+        with self._lock:
+            cycle = self._cycles.setdefault(bucket_key, itertools.cycle(bucket))
+            record = next(cycle)
+            fail = self._random.random() < self.error_rate
+            delay = self.latency if self.latency is not None else record.get("latency", 0.0) * self.latency_scale
+            delay = max(0.0, delay + self._random.uniform(-self.jitter, self.jitter))
+        if fail:
+            raise AIServiceError("Simulated service error (replay).")
+        return record["response"], delay
+
+    def complete(self, model, messages, max_tokens, temperature, timeout):
+        text, delay = self._lookup(model, messages, max_tokens, temperature)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise AITimeoutError("The AI service took too long to respond.")
+        time.sleep(delay)
+        return text
+
+    def stream(self, model, messages, max_tokens, temperature, timeout):
+        text, delay = self._lookup(model, messages, max_tokens, temperature)
+        return self._chunks(text, delay)
+
+    def _chunks(self, text, delay):
+        pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+        step = delay / len(pieces)
+        for piece in pieces:
+            time.sleep(step)
+            yield piece
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Process-wide backend chosen by environment:
+      AI_BACKEND=live (default) | record | replay
+      AI_RECORDINGS=path to the recordings file (record / replay)
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            mode = os.getenv("AI_BACKEND", "live").lower()
+            recordings = os.getenv("AI_RECORDINGS", str(Path(__file__).parent / "ai_recordings.jsonl"))
+            if mode == "replay":
+                _backend = ReplayBackend(recordings)
+            elif mode == "record":
+                _backend = RecordingBackend(recordings)
+            else:
+                _backend = OpenAIBackend()
+        return _backend
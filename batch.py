@@ -0,0 +1,173 @@
+"""
+Headless batch generation and grading, for building tests ahead of time.
+
+    python batch.py generate --out weekly/                        # an MCQ and an FRQ test for every deck
+    python batch.py generate --out weekly/ --decks "Unit 1" --types MCQ --length "1 hour" --workers 8
+    python batch.py grade submissions/*.json --out graded/        # grade answer files, save to test history
+    AI_BACKEND=replay python batch.py generate --out /tmp/tests   # against recorded completions
+
+A generated test is a JSON file {card_name, test_type, length, generated, questions}. An answer file
+is the same test with an "answers" object added, keyed by question number ({"1": "B", ...} for MCQ,
+{"1": "free text", ...} for FRQ). Grading writes <name>.graded.json (score and per-question feedback)
+and records the attempt in the test history unless --no-save is given.
+
+Work runs on a thread pool; a throughput report (items/s, p50/p95 latency) is printed per stage.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from ai_utils import AIChatbot
+from backend_utils import AIError
+from benchmark import print_report, run_stage
+from db_utils import configured_db_path
+from fc_utils import FlashcardManager
+from test_engine import TestEngine, normalize_answers
+
+DEFAULT_WORKERS = 4
+# failures that are reported per item instead of stopping the run
+ITEM_ERRORS = (AIError, OSError, ValueError, KeyError, TypeError)
+
+_print_lock = threading.Lock()
+
+
+def _log(message):
+    with _print_lock:
+        print(message, file=sys.stderr)
+
+
+def output_name(card_name, test_type):
+    # readable, filesystem-safe, and distinct for deck names that only differ in punctuation
+    slug = re.sub(r"[^\w-]+", "_", card_name).strip("_")[:60] or "deck"
+    digest = hashlib.sha1(card_name.encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{digest}.{test_type}.json"
+
+
+def write_json(path, data):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _job(label, fn, *args):
+    # zero-arg job for run_stage that names the item when it fails
+    def job():
+        try:
+            fn(*args)
+        except ITEM_ERRORS as e:
+            _log(f"  failed: {label}: {type(e).__name__}: {e}")
+            raise
+    return job
+
+
+# ---------- Generate ----------
+def generate_tests(engine, decks, test_types, length, out_dir, workers):
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def generate(deck, test_type):
+        questions = engine.generate(list(deck["terms"]), test_type, length)
+        if not questions:
+            raise ValueError("no questions parsed from the completion")
+        write_json(out_dir / output_name(deck["name"], test_type), {
+            "card_name": deck["name"], "test_type": test_type, "length": length,
+            "generated": datetime.utcnow().isoformat(), "questions": questions,
+        })
+
+    jobs = [_job(f"{deck['name']} ({test_type})", generate, deck, test_type)
+            for deck in decks for test_type in test_types]
+    return run_stage("generate", jobs, workers, expected=ITEM_ERRORS)
+
+
+# ---------- Grade ----------
+def grade_files(engine, paths, out_dir, workers, stats=None, manager=None):
+    graded = []   # (test, answers, report) for saving on the main thread
+
+    def grade(path):
+        with open(path, "r", encoding="utf-8") as f:
+            test = json.load(f)
+        test_type = test["test_type"]
+        answers = normalize_answers(test_type, test.get("answers", {}))
+        report = engine.grade(test_type, test["questions"], answers)
+        target = (out_dir or path.parent) / (path.name.removesuffix(".json") + ".graded.json")
+        write_json(target, {"card_name": test.get("card_name"), "test_type": test_type,
+                            "source": str(path), "graded": datetime.utcnow().isoformat(), **report})
+        graded.append((test, answers, report))
+
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    result = run_stage("grade", [_job(str(p), grade, p) for p in paths], workers, expected=ITEM_ERRORS)
+
+    # TestStats isn't shared across threads; results are recorded here, in one pass
+    if stats is not None:
+        for test, answers, report in graded:
+            card = manager.get_flashcard(test.get("card_name")) if manager else None
+            stats.add_result(test_type=test["test_type"], card_name=test.get("card_name"),
+                             length=test.get("length"), responses=answers,
+                             parsed_mcqs=test["questions"] if test["test_type"] == "MCQ" else None,
+                             score=report["score"], max_score=report["max_score"],
+                             terms=list(card["terms"]) if card else None, frq_grades=report.get("frq_grades"))
+    return result
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--flashcards", default="flashcards.json")
+    common.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent model calls")
+    common.add_argument("--json", help="also write the throughput report to this file")
+    parser = argparse.ArgumentParser(description="Generate and grade tests without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", parents=[common], help="write a test per deck and test type")
+    gen.add_argument("--out", required=True, help="directory for the test files")
+    gen.add_argument("--decks", nargs="+", help="deck names (default: every deck with terms)")
+    gen.add_argument("--types", nargs="+", choices=["MCQ", "FRQ"], default=["MCQ", "FRQ"])
+    gen.add_argument("--length", choices=["15 min", "1 hour"], default="15 min")
+
+    grd = commands.add_parser("grade", parents=[common], help="grade answer files")
+    grd.add_argument("files", nargs="+", help="test files with an \"answers\" object")
+    grd.add_argument("--out", help="directory for the graded files (default: next to each answer file)")
+    grd.add_argument("--results", help="test history file (default: the app's; not allowed with FLASHIFY_DB set, "
+                                       "where results go to the database)")
+    grd.add_argument("--no-save", action="store_true", help="don't record attempts in the test history")
+    args = parser.parse_args()
+    if getattr(args, "results", None) and configured_db_path():
+        parser.error("--results can't be combined with FLASHIFY_DB: results are saved to the database")
+
+    manager = FlashcardManager(args.flashcards, db_path=configured_db_path())
+    engine = TestEngine(AIChatbot())
+
+    if args.command == "generate":
+        if args.decks:
+            missing = [name for name in args.decks if manager.get_flashcard(name) is None]
+            if missing:
+                parser.error(f"unknown deck(s): {', '.join(missing)}")
+            decks = [manager.get_flashcard(name) for name in args.decks]
+        else:
+            decks = [d for d in manager.flashcards if len(d["terms"])]
+        result = generate_tests(engine, decks, args.types, args.length, Path(args.out), args.workers)
+    else:
+        stats = None
+        if not args.no_save:
+            from test_stats import TestStats
+            # a custom history file starts empty rather than taking over the app's old results
+            stats = TestStats(args.results, legacy_path=None, db_path=configured_db_path()) if args.results \
+                else TestStats(db_path=configured_db_path())
+        result = grade_files(engine, [Path(p) for p in args.files], Path(args.out) if args.out else None,
+                             args.workers, stats=stats, manager=manager)
+
+    print_report([result])
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([result], f, indent=2)
+    sys.exit(1 if result["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Offline latency / throughput benchmark for the AI pipeline.
+
+    python benchmark.py --synthesize                      # build fake recordings from flashcards.json
+    python benchmark.py --latency 0.5 --jitter 0.2        # replay them in-process
+    python benchmark.py --mode server --concurrency 8     # same, through the real client and a local server
+    python benchmark.py --parser 20000                    # question parser throughput only
+    AI_BACKEND=record python main.py                      # capture real completions to replay later
+
+Times explain_term, generate_test, streaming time-to-first-question, parsing and grading,
+and prints count / errors / mean / p50 / p95 / max latency and throughput per stage.
+"""
+import argparse
+import json
+import re
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ai_utils import AIChatbot
+from backend_utils import AIError, OpenAIBackend, RecordingBackend, ReplayBackend, get_backend
+from cache_utils import ExplanationCache
+from fc_utils import FlashcardManager
+from grading_utils import answer_key_map, build_test_prompt, count_correct, grade_frq, grade_mcq
+from question_parser import IncrementalQuestionParser, parse_questions
+
+DEFAULT_RECORDINGS = Path(__file__).parent / "ai_recordings.jsonl"
+
+
+# ---------- Synthetic recordings ----------
+class SyntheticBackend:
+    """Fabricates well-formed completions so recordings can be produced without an API key."""
+    def complete(self, model, messages, max_tokens, temperature, timeout):
+        prompt = messages[-1]["content"]
+        if messages[0]["role"] == "system":
+            term = re.search(r"'(.*?)'", prompt)
+            term = term.group(1) if term else "this term"
+            return (f"{term} is a core idea in this unit. " * 6).strip()
+        if "multiple-choice grader" in prompt:
+            numbers = re.findall(r"^(\d+)\.", prompt, re.MULTILINE)
+            return json.dumps([{"q": int(n), "correct": "B", "explanation": "B matches the definition."} for n in numbers])
+        if "FRQ grader" in prompt:
+            numbers = re.findall(r"^Question (\d+):", prompt, re.MULTILINE)
+            return json.dumps([{"q": int(n), "score": 3, "feedback": "Partially complete answer."} for n in numbers])
+        terms = re.search(r"these terms: (\[.*?\])\. ", prompt)
+        terms = terms.group(1).strip("[]").replace("'", "").split(", ") if terms else ["the topic"]
+        if "Generate MCQ" in prompt:
+            blocks = []
+            for i in range(1, 11):
+                term = terms[(i - 1) % len(terms)]
+                blocks.append(
+                    f"{i}. Which statement best describes {term}?\n"
+                    f"A. An unrelated definition.\nB. The accepted definition of {term}.\n"
+                    f"C. A common misconception.\nD. None of the above.\n"
+                    f"Answer: B\nExplanation: B states the definition of {term}."
+                )
+            return "\n\n".join(blocks)
+        return "\n".join(f"{i}. Explain the significance of {terms[(i - 1) % len(terms)]} with an example."
+                         for i in range(1, 6))
+
+    def stream(self, model, messages, max_tokens, temperature, timeout):
+        text = self.complete(model, messages, max_tokens, temperature, timeout)
+        return iter([text[i:i + 12] for i in range(0, len(text), 12)])
+
+
+def synthesize(recordings, manager):
+    """Run every AI call the app makes for each deck through SyntheticBackend and record it."""
+    Path(recordings).unlink(missing_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ExplanationCache(Path(tmp) / "cache.json")
+        ai = AIChatbot(cache=cache, backend=RecordingBackend(recordings, inner=SyntheticBackend()))
+        for deck in manager.flashcards:
+            terms = list(deck["terms"])
+            if not terms:
+                continue
+            for term in terms:
+                ai.explain_term(term, refresh=True)
+            for test_type in ("MCQ", "FRQ"):
+                raw = ai.generate_test(build_test_prompt(terms, test_type))
+                "".join(ai.stream_test(build_test_prompt(terms, test_type)))
+                questions = [q.to_dict() for q in parse_questions(raw, test_type)]
+                if test_type == "MCQ":
+                    grade_mcq(ai, questions)
+                else:
+                    grade_frq(ai, {f"FRQ_{q['index']}": "answer" for q in questions},
+                              {q["index"]: q["text"] for q in questions})
+        cache.close()
+    return len(ReplayBackend(recordings))
+
+
+# ---------- Timing ----------
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run_stage(name, jobs, concurrency, expected=(AIError,)):
+    """Run zero-arg callables on a pool; returns a stats dict (latencies in ms). expected exceptions count as errors."""
+    latencies = []
+    errors = 0
+
+    def timed(job):
+        start = time.perf_counter()
+        job()
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(timed, job) for job in jobs]:
+            try:
+                latencies.append(future.result())
+            except expected:
+                errors += 1
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    return {
+        "stage": name,
+        "count": len(latencies),
+        "errors": errors,
+        "mean_ms": statistics.fmean(ms) if ms else 0.0,
+        "p50_ms": _percentile(ms, 50),
+        "p95_ms": _percentile(ms, 95),
+        "max_ms": ms[-1] if ms else 0.0,
+        "per_sec": len(latencies) / wall if wall > 0 else 0.0,
+    }
+
+
+def time_to_first_question(ai, prompt, test_type):
+    parser = IncrementalQuestionParser(test_type)
+    start = time.perf_counter()
+    for chunk in ai.stream_test(prompt):
+        if parser.feed(chunk):
+            return time.perf_counter() - start
+    return time.perf_counter() - start
+
+
+def benchmark(ai, manager, iterations=3, concurrency=1, parse_repeat=200):
+    decks = [d for d in manager.flashcards if len(d["terms"])]
+    terms = [t for d in decks for t in d["terms"]]
+    prompts = [(list(d["terms"]), test_type) for d in decks for test_type in ("MCQ", "FRQ")]
+    results = []
+
+    results.append(run_stage("explain_term", [lambda t=t: ai.explain_term(t, refresh=True)
+                                              for t in terms * iterations], concurrency))
+
+    raws = {}
+    def generate(terms, test_type):
+        raws[(tuple(terms), test_type)] = ai.generate_test(build_test_prompt(terms, test_type))
+    results.append(run_stage("generate_test", [lambda p=p: generate(*p) for p in prompts * iterations], concurrency))
+
+    results.append(run_stage("stream_first_question",
+                             [lambda p=p: time_to_first_question(ai, build_test_prompt(*p), p[1])
+                              for p in prompts * iterations], concurrency))
+
+    parsed = {key: [q.to_dict() for q in parse_questions(raw, key[1])] for key, raw in raws.items()}
+    results.append(run_stage("parse_questions", [lambda k=k, r=r: parse_questions(r, k[1])
+                                                 for k, r in raws.items()] * parse_repeat, 1))
+
+    mcqs = [qs for (terms, test_type), qs in parsed.items() if test_type == "MCQ"]
+    def local_grade(qs):
+        count_correct(qs, {q["index"]: "B" for q in qs}, answer_key_map(qs))
+    results.append(run_stage("grade_mcq_local", [lambda qs=qs: local_grade(qs) for qs in mcqs] * parse_repeat, 1))
+    results.append(run_stage("grade_mcq_llm", [lambda qs=qs: grade_mcq(ai, qs) for qs in mcqs * iterations], concurrency))
+
+    frqs = [qs for (terms, test_type), qs in parsed.items() if test_type == "FRQ"]
+    def frq_grade(qs):
+        grade_frq(ai, {f"FRQ_{q['index']}": "student answer" for q in qs}, {q["index"]: q["text"] for q in qs})
+    results.append(run_stage("grade_frq_llm", [lambda qs=qs: frq_grade(qs) for qs in frqs * iterations], concurrency))
+    return results
+
+
+# ---------- Parser throughput ----------
+def synthetic_completion(n_questions, seed=0):
+    """A large MCQ completion mixing every numbering and option style the parser accepts."""
+    import random
+    rng = random.Random(seed)
+    labels = ["{i}. ", "{i}) ", "Q{i}: ", "Question {i}: "]
+    options = ["{L}. ", "{L}) ", "({L}) "]
+    lines = ["Here are your practice questions:", ""]
+    for i in range(1, n_questions + 1):
+        lines.append(rng.choice(labels).format(i=i) + f"Which statement about concept {i} is most accurate?")
+        style = rng.choice(options)
+        for letter in "ABCD":
+            lines.append(style.format(L=letter) + f"Option {letter} for concept {i}, phrased at some length.")
+        lines.append(f"Answer: {rng.choice('ABCD')}")
+        lines.append(f"Explanation: Concept {i} is defined this way.")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def bench_parser(n_questions, repeat=5, chunk_chars=8):
+    raw = synthetic_completion(n_questions)
+    chunks = [raw[i:i + chunk_chars] for i in range(0, len(raw), chunk_chars)]
+    mb = len(raw.encode("utf-8")) / 1e6
+    print(f"Synthetic completion: {n_questions} questions, {raw.count(chr(10)) + 1} lines, {mb:.2f} MB")
+
+    def best_of(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - start)
+        return min(times), out
+
+    full_time, questions = best_of(lambda: parse_questions(raw, "MCQ"))
+    assert len(questions) == n_questions, f"parsed {len(questions)} of {n_questions}"
+
+    def streamed():
+        parser = IncrementalQuestionParser("MCQ")
+        for chunk in chunks:
+            parser.feed(chunk)
+        parser.close()
+        return parser.questions
+    stream_time, _ = best_of(streamed)
+    lookup_time, _ = best_of(lambda: [questions.get(i) for i in range(1, n_questions + 1)])
+
+    print(f"{'mode':<24}{'seconds':>10}{'MB/s':>10}{'questions/s':>14}")
+    for name, t in (("parse (whole text)", full_time), (f"stream ({chunk_chars}-char chunks)", stream_time)):
+        print(f"{name:<24}{t:>10.4f}{mb / t:>10.1f}{n_questions / t:>14.0f}")
+    print(f"{'index lookups':<24}{lookup_time:>10.4f}{'':>10}{n_questions / lookup_time:>14.0f}")
+
+
+def print_report(results):
+    header = f"{'stage':<24}{'count':>7}{'errors':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'ops/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['stage']:<24}{r['count']:>7}{r['errors']:>8}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}"
+              f"{r['p95_ms']:>10.2f}{r['max_ms']:>10.2f}{r['per_sec']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark explain / generate / parse / grade offline.")
+    parser.add_argument("--recordings", default=str(DEFAULT_RECORDINGS))
+    parser.add_argument("--flashcards", default="flashcards.json")
+    parser.add_argument("--synthesize", action="store_true", help="write synthetic recordings first")
+    parser.add_argument("--mode", choices=["replay", "server", "live"], default="replay",
+                        help="replay in-process, replay through a local HTTP server, or call the live API")
+    parser.add_argument("--latency", type=float, default=None, help="fixed simulated latency (s)")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--parser", type=int, metavar="N",
+                        help="only benchmark the question parser on a synthetic N-question completion")
+    args = parser.parse_args()
+
+    if args.parser:
+        bench_parser(args.parser)
+        return
+
+    manager = FlashcardManager(args.flashcards)
+    if args.synthesize:
+        print(f"Wrote {synthesize(args.recordings, manager)} synthetic recordings to {args.recordings}")
+
+    server = None
+    if args.mode == "live":
+        backend = get_backend()
+    else:
+        backend = ReplayBackend(args.recordings, latency=args.latency, latency_scale=args.latency_scale,
+                                jitter=args.jitter, error_rate=args.error_rate, seed=0)
+        if not len(backend):
+            parser.error(f"no recordings in {args.recordings} (run with --synthesize or AI_BACKEND=record)")
+        if args.mode == "server":
+            from openai import OpenAI
+            from replay_server import serve
+            server = serve(backend, port=0)
+            host, port = server.server_address
+            backend = OpenAIBackend(OpenAI(base_url=f"http://{host}:{port}/v1", api_key="replay", max_retries=0))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ExplanationCache(Path(tmp) / "cache.json")
+        ai = AIChatbot(cache=cache, backend=backend)
+        results = benchmark(ai, manager, iterations=args.iterations, concurrency=args.concurrency)
+        cache.close()
+    if server:
+        server.shutdown()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
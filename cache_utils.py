@@ -0,0 +1,170 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).parent / "explanation_cache.json"
+
+
+class ExplanationCache:
+    """
+    On-disk LRU cache for term explanations, keyed by (model, normalized term, prompt version).
+    Entries are evicted least-recently-used once max_entries is exceeded, and expire after
+    ttl_seconds if one is given.
+    The JSON file is a snapshot; puts and invalidations since it was written are appended to a
+    journal next to it (one JSON op per line), which is folded back into the snapshot on load,
+    every compact_every ops and on flush() / close() (at exit for the process-wide cache).
+    """
+    def __init__(self, file_path: Path | str = CACHE_PATH, max_entries=2000, ttl_seconds=None, compact_every=500):
+        self.file_path = Path(file_path)
+        self.journal_path = self.file_path.with_name(self.file_path.name + ".journal")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.compact_every = compact_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._journal_len = 0
+        self._entries = self._load()
+        if self.journal_path.exists():
+            self._dirty = True
+            self._save()
+
+    @staticmethod
+    def normalize(term):
+        return " ".join(str(term).split()).casefold()
+
+    @classmethod
+    def make_key(cls, model, term, prompt_version):
+        return f"{model}|v{prompt_version}|{cls.normalize(term)}"
+
+    # ---------- lookups ----------
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                del self._entries[key]
+                self._dirty = True
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            # hits only reorder in memory; the new order is written on the next compaction
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return entry["value"]
+
+    def put(self, key, value):
+        with self._lock:
+            entry = self._entries[key] = {"value": value, "created": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+            self._append({"op": "put", "key": key, "entry": entry})
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+                self._append({"op": "del", "key": key})
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+            self._save()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def flush(self):
+        with self._lock:
+            self._save()
+
+    def close(self):
+        # for caches that live in a directory that goes away (tests, benchmarks)
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---------- persistence ----------
+    def _expired(self, entry):
+        return self.ttl_seconds is not None and time.time() - entry.get("created", 0) > self.ttl_seconds
+
+    def _load(self):
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            raw = []
+        # stored oldest -> newest, so the file order is the LRU order
+        entries = OrderedDict((k, v) for k, v in raw if isinstance(v, dict) and "value" in v)
+        self._replay_journal(entries)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        return entries
+
+    def _replay_journal(self, entries):
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue   # torn last line; the journal is rewritten into the snapshot on load
+                    if op.get("op") == "put" and isinstance(op.get("entry"), dict):
+                        entries[op["key"]] = op["entry"]
+                        entries.move_to_end(op["key"])
+                    elif op.get("op") == "del":
+                        entries.pop(op.get("key"), None)
+        except FileNotFoundError:
+            pass
+
+    def _append(self, op):
+        # O(1) per change; the cache can be rebuilt, so there is no fsync here
+        if self._journal_len + 1 >= self.compact_every:
+            self._save()
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(op, ensure_ascii=False) + "\n")
+        self._journal_len += 1
+
+    def _save(self):
+        # compaction: full snapshot (temp file + rename), then a fresh journal
+        if not self._dirty:
+            return
+        tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self._entries.items()), f, ensure_ascii=False)
+        os.replace(tmp_path, self.file_path)
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_len = 0
+        self._dirty = False
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    # one cache per process so every AIChatbot shares (and doesn't clobber) the same file
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ExplanationCache()
+            atexit.register(_default_cache.flush)
+        return _default_cache
@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent / "flashify.db"
+# set to a database path to keep decks and test results in SQLite instead of the JSON files
+DB_ENV = "FLASHIFY_DB"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    id       INTEGER PRIMARY KEY,
+    name     TEXT NOT NULL UNIQUE,          -- UNIQUE doubles as the deck-name index
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    deck_id  INTEGER NOT NULL REFERENCES decks(id) ON DELETE CASCADE,
+    term     TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (deck_id, term)
+);
+CREATE INDEX IF NOT EXISTS idx_terms_term ON terms(term);
+CREATE INDEX IF NOT EXISTS idx_terms_order ON terms(deck_id, position);
+
+CREATE TABLE IF NOT EXISTS results (
+    id        INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    test_type TEXT,
+    card_name TEXT,
+    percent   REAL,
+    record    TEXT NOT NULL                 -- the full result dict as JSON
+);
+CREATE INDEX IF NOT EXISTS idx_results_card_time ON results(card_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_time ON results(timestamp);
+
+CREATE TABLE IF NOT EXISTS questions (
+    id   TEXT PRIMARY KEY,                  -- content hash, see question_store
+    body TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS mastery (
+    card_name TEXT NOT NULL,
+    term      TEXT NOT NULL,
+    attempts  INTEGER NOT NULL,
+    correct   REAL NOT NULL,
+    last_seen TEXT,
+    accuracy  REAL,
+    PRIMARY KEY (card_name, term)
+);
+"""
+
+
+def configured_db_path():
+    """Database path from FLASHIFY_DB, or None to keep using the JSON files."""
+    return os.environ.get(DB_ENV) or None
+
+
+def connect(path=DB_PATH):
+    # one connection per store; WAL lets the GUI read while another store writes
+    conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class _Store:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+
+    def _transaction(self, fn, *args):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn, *args)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DeckStore(_Store):
+    """Decks and their terms, in the order they were added."""
+
+    def load(self):
+        rows = self._query(
+            "SELECT d.name, t.term FROM decks d LEFT JOIN terms t ON t.deck_id = d.id "
+            "ORDER BY d.position, t.position")
+        decks = {}
+        for name, term in rows:
+            deck = decks.setdefault(name, {'name': name, 'terms': []})
+            if term is not None:
+                deck['terms'].append(term)
+        return list(decks.values())
+
+    def apply(self, ops):
+        """Apply FlashcardManager journal ops ({'op': 'add_term', ...}) in one transaction."""
+        if ops:
+            self._transaction(self._apply_ops, ops)
+
+    def replace_all(self, decks):
+        def write(conn):
+            conn.execute("DELETE FROM terms")
+            conn.execute("DELETE FROM decks")
+            self._apply_ops(conn, [{'op': 'add_flashcard', 'name': d['name']} for d in decks])
+            self._apply_ops(conn, [{'op': 'add_term', 'card': d['name'], 'term': t}
+                                   for d in decks for t in d['terms']])
+        self._transaction(write)
+
+    @staticmethod
+    def _apply_ops(conn, ops):
+        for op in ops:
+            kind = op.get('op')
+            if kind == 'add_flashcard':
+                conn.execute("INSERT OR IGNORE INTO decks (name, position) "
+                             "SELECT ?, COALESCE(MAX(position), -1) + 1 FROM decks", (op['name'],))
+            elif kind == 'delete_flashcard':
+                conn.execute("DELETE FROM decks WHERE name = ?", (op['name'],))
+            elif kind == 'add_term':
+                conn.execute("INSERT OR IGNORE INTO terms (deck_id, term, position) "
+                             "SELECT d.id, ?, COALESCE((SELECT MAX(position) FROM terms WHERE deck_id = d.id), -1) + 1 "
+                             "FROM decks d WHERE d.name = ?", (op['term'], op['card']))
+            elif kind == 'delete_term':
+                conn.execute("DELETE FROM terms WHERE term = ? AND deck_id = "
+                             "(SELECT id FROM decks WHERE name = ?)", (op['term'], op['card']))
+
+    def decks_with_term(self, term):
+        rows = self._query("SELECT d.name FROM terms t JOIN decks d ON d.id = t.deck_id "
+                           "WHERE t.term = ? ORDER BY d.position", (term,))
+        return [name for (name,) in rows]
+
+
+class ResultStore(_Store):
+    """Test attempts; every query is served by the (card_name, timestamp) or timestamp index."""
+
+    @staticmethod
+    def _insert(conn, record):
+        cur = conn.execute(
+            "INSERT INTO results (timestamp, test_type, card_name, percent, record) VALUES (?, ?, ?, ?, ?)",
+            (record.get("timestamp") or "", record.get("test_type"), record.get("card_name"),
+             record.get("percent"), json.dumps(record, ensure_ascii=False)))
+        return cur.lastrowid
+
+    def add(self, record):
+        """Insert one result dict and return its row id."""
+        return self._transaction(self._insert, record)
+
+    def add_many(self, records):
+        self._transaction(lambda conn: [self._insert(conn, r) for r in records])
+
+    def _records(self, where="", params=(), order="timestamp, id", limit=None):
+        sql = f"SELECT record FROM results {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (*params, limit)
+        return [json.loads(r) for (r,) in self._query(sql, params)]
+
+    def all(self):
+        return self._records(order="id")
+
+    def since(self, last_id):
+        """(id, record) pairs inserted after row last_id, oldest first."""
+        rows = self._query("SELECT id, record FROM results WHERE id > ? ORDER BY id", (last_id,))
+        return [(rid, json.loads(r)) for rid, r in rows]
+
+    # columns that can be returned without parsing the stored record
+    COLUMNS = ("timestamp", "test_type", "card_name", "percent")
+
+    def iter(self, card_name=None, test_type=None, start=None, end=None, fields=None, batch=256):
+        """
+        Yield matching results oldest first, fetched in batches. With fields limited to COLUMNS
+        the rows come straight from the table (dicts of those keys); otherwise full records.
+        """
+        clauses, params = [], []
+        for column, value in (("card_name", card_name), ("test_type", test_type)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_iso(start))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(_iso(end))
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        direct = fields is not None and all(f in self.COLUMNS for f in fields)
+        select = ", ".join(fields) if direct and fields else "record"
+        with self._lock:
+            cur = self._conn.execute(f"SELECT {select} FROM results {where} ORDER BY timestamp, id", params)
+        while True:
+            with self._lock:
+                rows = cur.fetchmany(batch)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(fields, row)) if direct else json.loads(row[0])
+
+    def history(self, card_name, test_type=None):
+        # test_type isn't indexed; it filters the rows the card_name index already narrowed down
+        return list(self.iter(card_name=card_name, test_type=test_type))
+
+    def between(self, start=None, end=None, card_name=None):
+        """Attempts with start <= timestamp < end (datetimes or ISO strings; either end may be None)."""
+        return list(self.iter(card_name=card_name, start=start, end=end))
+
+    def recent(self, n, card_name=None):
+        """The n most recent attempts, newest first."""
+        if card_name is None:
+            return self._records(order="timestamp DESC, id DESC", limit=n)
+        return self._records("WHERE card_name = ?", (card_name,), order="timestamp DESC, id DESC", limit=n)
+
+    def count(self):
+        return self._query("SELECT COUNT(*) FROM results")[0][0]
+
+
+class MasteryStore(_Store):
+    """Persistence for mastery_utils.TermMastery: one row per (deck, term)."""
+
+    def load(self):
+        decks = {}
+        for card_name, term, attempts, correct, last_seen, accuracy in self._query(
+                "SELECT card_name, term, attempts, correct, last_seen, accuracy FROM mastery"):
+            decks.setdefault(card_name, {})[term] = {
+                "attempts": attempts, "correct": correct, "last_seen": last_seen, "accuracy": accuracy}
+        return decks
+
+    def upsert(self, card_name, stats_by_term):
+        def write(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO mastery (card_name, term, attempts, correct, last_seen, accuracy) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(card_name, term, s["attempts"], s["correct"], s["last_seen"], s["accuracy"])
+                 for term, s in stats_by_term.items()])
+        self._transaction(write)
+
+
+class QuestionTable(_Store):
+    """Persistence for question_store.QuestionStore: one row per distinct question."""
+
+    def load(self):
+        return {qid: json.loads(body) for qid, body in self._query("SELECT id, body FROM questions")}
+
+    def add_many(self, bodies):
+        self._transaction(lambda conn: conn.executemany(
+            "INSERT OR IGNORE INTO questions (id, body) VALUES (?, ?)",
+            [(qid, json.dumps(body, ensure_ascii=False)) for qid, body in bodies.items()]))
+
+
+def import_json(db_path=DB_PATH, flashcards_path='flashcards.json', results_path=None):
+    """
+    Copy the JSON decks (snapshot + journal) and results log into the database.
+    Decks replace whatever the database held; results are only imported into an empty table.
+    """
+    from fc_utils import FlashcardManager
+    from test_stats import TestStats, RESULTS_PATH
+
+    decks = FlashcardManager(flashcards_path).flashcards
+    deck_store = DeckStore(db_path)
+    deck_store.replace_all([{'name': d['name'], 'terms': list(d['terms'])} for d in decks])
+    deck_store.close()
+
+    source = TestStats(results_path or RESULTS_PATH)
+    target = TestStats(results_path or RESULTS_PATH, db_path=db_path)
+    imported = 0
+    if target.db.count() == 0:
+        records = source.get_all_results()
+        target.import_records(records)
+        imported = len(records)
+    return len(decks), imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import the Flashify JSON files into SQLite")
+    parser.add_argument("--db", default=str(DB_PATH))
+    parser.add_argument("--flashcards", default="flashcards.json")
+    parser.add_argument("--results", default=None, help="test_results.jsonl (default: next to test_stats.py)")
+    args = parser.parse_args()
+    n_decks, n_results = import_json(args.db, args.flashcards, args.results)
+    print(f"Imported {n_decks} decks and {n_results} test results into {args.db}")
+    print(f"Set {DB_ENV}={args.db} to use it")
@@ -1,43 +1,226 @@
 import json
 import os
+from db_utils import DeckStore
+from term_index import FUZZY_THRESHOLD, TermIndex
+
+class TermSet:
+    # insertion-ordered set of terms backed by a dict: O(1) contains/add/remove, order kept for the GUI and JSON
+    __slots__ = ('_terms',)
+
+    def __init__(self, terms=()):
+        self._terms = dict.fromkeys(terms)
+
+    def add(self, term):
+        if term in self._terms:
+            return False
+        self._terms[term] = None
+        return True
+
+    def discard(self, term):
+        if term not in self._terms:
+            return False
+        del self._terms[term]
+        return True
+
+    def __contains__(self, term):
+        return term in self._terms
+
+    def __iter__(self):
+        return iter(self._terms)
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __eq__(self, other):
+        if isinstance(other, TermSet):
+            return list(self._terms) == list(other._terms)
+        if isinstance(other, list):
+            return list(self._terms) == other
+        return NotImplemented
+
+    def __repr__(self):
+        # render like a list so prompts built from the terms read the same as before
+        return repr(list(self._terms))
 
 class FlashcardManager:
-    def __init__(self, filepath='flashcards.json'):
+    # flashcards.json is a snapshot; mutations since the last compaction live in an append-only
+    # journal next to it (one JSON op per line) and are replayed on startup.
+    # With db_path set the decks live in SQLite instead and save() applies the same ops there.
+    def __init__(self, filepath='flashcards.json', compact_every=500, db_path=None):
         self.filepath = filepath
+        self.db = DeckStore(db_path) if db_path else None
+        self.journal_path = filepath + '.journal'
+        self.compact_every = compact_every
+        self._decks = {}   # name -> deck dict, in insertion order
+        self._pending = []   # ops not yet written to the journal
+        self._journal_len = 0
+        self._listeners = []   # called with a deck name whenever that deck's terms change
+        self._term_index = None   # TermIndex over every deck, built on the first search
         self.flashcards = self.load()
+        self._replay_journal()
+
+    @property
+    def flashcards(self):
+        return list(self._decks.values())
+
+    @flashcards.setter
+    def flashcards(self, decks):
+        self._decks = {}
+        for fc in decks:
+            name = fc['name']
+            if name not in self._decks:
+                self._decks[name] = {'name': name, 'terms': TermSet(fc.get('terms', []))}
+        # a wholesale replacement can't be journaled; the next save writes a full snapshot
+        self._needs_snapshot = True
+        self._term_index = None
 
     def load(self):
+        if self.db is not None:
+            return self.db.load()
         if os.path.exists(self.filepath):
             with open(self.filepath, 'r') as f:
                 return json.load(f)
         return []
 
     def save(self):
-        with open(self.filepath, 'w') as f:
-            json.dump(self.flashcards, f, indent=4)
+        if self.db is not None and not self._needs_snapshot:
+            self.db.apply(self._pending)
+            self._pending = []
+            return
+        if self._needs_snapshot or self._journal_len + len(self._pending) >= self.compact_every:
+            self.compact()
+            return
+        if not self._pending:
+            return
+        lines = ''.join(json.dumps(op) + '\n' for op in self._pending)
+        with open(self.journal_path, 'a') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_len += len(self._pending)
+        self._pending = []
+
+    def compact(self):
+        # write the snapshot atomically (temp file + rename), then start a fresh journal.
+        # A crash between the two steps only means the old journal is replayed again;
+        # every op is idempotent so no data is lost.
+        if self.db is not None:
+            self.db.replace_all(self._serialize())
+            self._pending = []
+            self._needs_snapshot = False
+            return
+        tmp_path = self.filepath + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._serialize(), f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.filepath)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._pending = []
+        self._journal_len = 0
+        self._needs_snapshot = False
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, card_name):
+        for callback in self._listeners:
+            callback(card_name)
+
+    def _serialize(self):
+        return [{'name': fc['name'], 'terms': list(fc['terms'])} for fc in self._decks.values()]
+
+    def _replay_journal(self):
+        self._needs_snapshot = False
+        if self.db is not None or not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    # torn last line from a crash mid-append: rewrite the snapshot on next save
+                    # so new ops aren't appended onto the broken line
+                    self._needs_snapshot = True
+                    continue
+                self._apply(op)
+                self._journal_len += 1
+        self._pending = []
+
+    def _apply(self, op):
+        kind = op.get('op')
+        if kind == 'add_flashcard':
+            self.add_flashcard(op['name'])
+        elif kind == 'delete_flashcard':
+            self.delete_flashcard(op['name'])
+        elif kind == 'add_term':
+            self.add_term(op['card'], op['term'])
+        elif kind == 'delete_term':
+            self.delete_term(op['card'], op['term'])
 
     def add_flashcard(self, name):
-        if not any(fc['name'] == name for fc in self.flashcards):
-            self.flashcards.append({'name': name, 'terms': []})
-    
+        if name not in self._decks:
+            self._decks[name] = {'name': name, 'terms': TermSet()}
+            self._pending.append({'op': 'add_flashcard', 'name': name})
+
     def delete_flashcard(self, name):
-        self.flashcards = [fc for fc in self.flashcards if fc['name'] != name]
+        card = self._decks.pop(name, None)
+        if card is not None:
+            if self._term_index is not None:
+                for term in card['terms']:
+                    self._term_index.remove(name, term)
+            self._pending.append({'op': 'delete_flashcard', 'name': name})
+            self._notify(name)
 
     def get_flashcard_names(self):
-        return [fc['name'] for fc in self.flashcards]
+        return list(self._decks)
 
     def get_flashcard(self, name):
-        for fc in self.flashcards:
-            if fc['name'] == name:
-                return fc
-        return None
+        return self._decks.get(name)
 
     def add_term(self, card_name, term):
         card = self.get_flashcard(card_name)
-        if card and term not in card['terms']:
-            card['terms'].append(term)
+        if card and card['terms'].add(term):
+            if self._term_index is not None:
+                self._term_index.add(card_name, term)
+            self._pending.append({'op': 'add_term', 'card': card_name, 'term': term})
+            self._notify(card_name)
+            return True
+        return False
 
     def delete_term(self, card_name, term):
         card = self.get_flashcard(card_name)
-        if card and term in card['terms']:
-            card['terms'].remove(term)
\ No newline at end of file
+        if card and card['terms'].discard(term):
+            if self._term_index is not None:
+                self._term_index.remove(card_name, term)
+            self._pending.append({'op': 'delete_term', 'card': card_name, 'term': term})
+            self._notify(card_name)
+            return True
+        return False
+
+    # ---------- cross-deck search ----------
+    @property
+    def term_index(self):
+        if self._term_index is None:
+            self._term_index = TermIndex((name, term) for name, fc in self._decks.items() for term in fc['terms'])
+        return self._term_index
+
+    def find_duplicates(self, term, threshold=FUZZY_THRESHOLD):
+        """[(score, deck, term)] for terms in any deck that look like term (1.0 = same after normalizing)."""
+        return self.term_index.fuzzy(term, threshold)
+
+    def search_terms(self, query, limit=50):
+        """[(deck, term, kind)] across all decks: exact matches, then word-prefix matches, then fuzzy ones."""
+        index = self.term_index
+        seen = {}
+        for deck, term in index.exact(query):
+            seen.setdefault((deck, term), 'exact')
+        for deck, term in index.prefix(query, limit):
+            seen.setdefault((deck, term), 'prefix')
+        for _, deck, term in index.fuzzy(query, limit=limit):
+            seen.setdefault((deck, term), 'fuzzy')
+        return [(deck, term, kind) for (deck, term), kind in seen.items()][:limit]
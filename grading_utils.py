@@ -0,0 +1,112 @@
+import json
+
+# Prompt building and grading with no Tk dependency, shared by TestGenerator and the benchmark.
+
+
+def build_test_prompt(terms, test_type):
+    return (
+        f"Generate {test_type} style AP-level test questions using ONLY these terms: {terms}. "
+        f"For MCQ: Each question starts with a number and a period (ex: 1.) followed by the question text. "
+        f"Each option starts with a capital letter (A-D) followed by a period and a space followed by the option text. "
+        f"After the options of each MCQ add a line 'Answer: <letter>' and a line 'Explanation: <1-2 sentences>'. "
+        f"For FRQ: provide an open-ended question. Return one question per line. "
+        f"Do not mix formats—only {test_type} questions."
+    )
+
+
+# ----------- Utility: extract JSON array substring ----------- #
+def extract_json_array(text):
+    start = text.find("[")
+    end = text.rfind("]")
+    if start != -1 and end != -1 and end > start:
+        return text[start:end+1]
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end != -1 and end > start:
+        return text[start:end+1]
+    return None
+
+
+# ---------------- MCQ Grading ---------------- #
+def answer_key_map(parsed_mcqs):
+    # grading info for the questions that were generated with an answer key
+    return {
+        q["index"]: {"correct": q["answer"], "explanation": q.get("explanation", "")}
+        for q in parsed_mcqs if q.get("answer")
+    }
+
+
+def build_mcq_grading_prompt(questions):
+    grading_prompt = (
+        "You are an expert AP-style multiple-choice grader. "
+        "For each question below (stem and options), determine the single best correct choice letter (A-D) "
+        "and provide a 1-2 sentence explanation. "
+        "Return JSON array of objects with fields: "
+        '{"q": <index>, "correct": "<A-D>", "explanation": "..."}.\n\n'
+    )
+    for q in questions:
+        grading_prompt += q["full_text"] + "\n\n"
+    return grading_prompt
+
+
+def parse_mcq_grading(ai_response):
+    json_text = extract_json_array(ai_response)
+    grading_map = {}
+    if json_text:
+        try:
+            parsed = json.loads(json_text)
+            for obj in parsed:
+                idx = int(obj.get("q"))
+                correct_letter = str(obj.get("correct", "")).upper()
+                explanation = obj.get("explanation", "").strip()
+                grading_map[idx] = {"correct": correct_letter, "explanation": explanation}
+        except Exception:
+            pass
+    return grading_map
+
+
+def grade_mcq(ai, questions):
+    """Ask the model for the answer key of questions generated without one (blocking)."""
+    return parse_mcq_grading(ai.generate_test(build_mcq_grading_prompt(questions)))
+
+
+def count_correct(parsed_mcqs, answers, grading_map):
+    total_correct = 0
+    for item in parsed_mcqs:
+        gm = grading_map.get(item["index"])
+        if gm and answers.get(item["index"], "") == gm["correct"]:
+            total_correct += 1
+    return total_correct
+
+
+# ---------------- FRQ Grading ---------------- #
+def build_frq_grading_prompt(answers, question_texts):
+    # question_texts maps question index -> question text
+    frq_keys = [k for k in answers.keys() if str(k).startswith("FRQ_")]
+    frq_prompt = "You are an AP-style FRQ grader. Grade each response out of 5 points and provide 1-2 sentence feedback. Return JSON array [{\"q\": <index>, \"score\": <points>, \"feedback\": \"...\"}]\n\n"
+    frq_questions = {}
+    for key in frq_keys:
+        idx = int(key.split("_")[1])
+        question_text = question_texts.get(idx, f"Question {idx}")
+        student_answer = answers.get(key, "")
+        frq_questions[idx] = question_text
+        frq_prompt += f"Question {idx}: {question_text}\nStudent answer: {student_answer}\n\n"
+    return frq_prompt, frq_questions
+
+
+def parse_frq_grading(ai_response):
+    json_text = extract_json_array(ai_response)
+    parsed = []
+    if json_text:
+        try:
+            parsed = json.loads(json_text)
+        except Exception:
+            parsed = []
+    return parsed
+
+
+def grade_frq(ai, answers, question_texts):
+    """Grade FRQ answers with the model (blocking); returns {parsed, questions, count}."""
+    frq_prompt, frq_questions = build_frq_grading_prompt(answers, question_texts)
+    parsed = parse_frq_grading(ai.generate_test(frq_prompt))
+    return {"parsed": parsed, "questions": frq_questions, "count": len(frq_questions)}
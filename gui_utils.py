@@ -1,3 +1,4 @@
+import time
 import ttkbootstrap as ttk
 import tkinter as tk
 from tkinter import messagebox
@@ -6,14 +7,32 @@ from fc_utils import FlashcardManager
 from ai_utils import AIChatbot
 from test_gen_utils import TestGenerator
 from test_stats import TestStats # newwwwwwwwwwwwwww
+from db_utils import configured_db_path
+from worker_utils import BusyIndicator, DEFAULT_AI_TIMEOUT, get_ai_worker
+from prefetch_utils import ExplanationPrefetcher
+from review_utils import QUALITY, ReviewScheduler
+from list_utils import VirtualListbox, sync_listbox
+from term_index import PrefixIndex
+
+# warm explanations for every term of a deck when it is opened
+PREFETCH_ON_OPEN = True
+PREFETCH_CONCURRENCY = 3
+PREFETCH_RATE_PER_SEC = 1.0
+# top up the deck's question bank in the background when it is opened
+WARM_BANK_ON_OPEN = True
 
 
 class FlashcardGUI:
     def __init__(self, manager: FlashcardManager):
         self.manager = manager
         self.ai = AIChatbot()
-        self.test_gen = TestGenerator(manager)
-        self._stats = TestStats()
+        self.worker = get_ai_worker()
+        self.prefetcher = ExplanationPrefetcher(self.ai, max_concurrency=PREFETCH_CONCURRENCY,
+                                                rate_per_sec=PREFETCH_RATE_PER_SEC)
+        self._prefetch_job = None
+        self._stats = TestStats(db_path=configured_db_path())
+        self.test_gen = TestGenerator(manager, stats=self._stats)
+        self._scheduler = None   # ReviewScheduler, built on the first review
 
         # Themed Window
         self.root = ttk.Window(title="Flashify", themename="minty")
@@ -66,9 +85,14 @@ class FlashcardGUI:
         self.flashcard_list.grid(row=0, column=0, padx=20, pady=20)
         self.flashcard_list.bind("<<ListboxSelect>>", self._on_flashcard_select)
 
-        # Term List
-        self.term_list = tk.Listbox(
-            self.center_frame,
+        # Term List: search box over a virtualized list (only the visible rows live in Tk)
+        term_frame = ttk.Frame(self.center_frame)
+        term_frame.grid(row=0, column=1, padx=20, pady=20)
+        self.term_search = tk.StringVar()
+        ttk.Entry(term_frame, textvariable=self.term_search, bootstyle="secondary").pack(fill="x", pady=(0, 5))
+        self.term_search.trace_add("write", lambda *a: self._refresh_term_list())
+        self.term_list = VirtualListbox(
+            term_frame,
             selectmode="browse",
             exportselection=False,
             bg="white",
@@ -78,8 +102,10 @@ class FlashcardGUI:
             height=20,
             font=("Comic Sans MS", 14)
         )
-        self.term_list.grid(row=0, column=1, padx=20, pady=20)
-        self.term_list.bind("<Double-Button-1>", lambda e: self.explain_term())
+        self.term_list.pack()
+        self.term_list.listbox.bind("<Double-Button-1>", lambda e: self.explain_term(), add="+")
+        self._current_card = None
+        self._term_index = None   # (card name, PrefixIndex), built on the first search in a deck
 
         # Entry Field
         self.entry = ttk.Entry(self.center_frame, bootstyle="info", width=80)
@@ -103,6 +129,16 @@ class FlashcardGUI:
                    command=self._generate_test_for_selected).pack(side="left", padx=5)
         ttk.Button(button_frame, text="View Test Stats", bootstyle=INFO,
                    command=self._show_stats).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Weakest Terms", bootstyle=WARNING,
+                   command=self._show_weakest_terms).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Review", bootstyle=SUCCESS,
+                   command=self._open_review).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="Search All Decks", bootstyle=SECONDARY,
+                   command=self._open_global_search).pack(side="left", padx=5)
+
+        # Prefetch progress
+        self.prefetch_label = ttk.Label(self.center_frame, text="", bootstyle="secondary")
+        self.prefetch_label.grid(row=3, column=0, columnspan=2, pady=(0, 5))
 
         self._update_flashcard_list()
 
@@ -119,9 +155,12 @@ class FlashcardGUI:
         selection = self.flashcard_list.curselection()
         if selection:
             name = self.flashcard_list.get(selection[0])
-            self.manager.flashcards = [fc for fc in self.manager.flashcards if fc["name"] != name]
+            self.manager.delete_flashcard(name)
             self.manager.save()
             self._update_flashcard_list()
+            if name == self._current_card:
+                self._term_index = None
+                self._update_term_list(name)
 
     # Term Methods
     def add_term(self):
@@ -130,7 +169,14 @@ class FlashcardGUI:
             card_name = self.flashcard_list.get(selection[0])
             term = self.entry.get().strip()
             if term:
-                self.manager.add_term(card_name, term)
+                dups = [d for d in self.manager.find_duplicates(term)[:5] if (d[1], d[2]) != (card_name, term)]
+                if dups:
+                    listing = "\n".join(f"  {t}  ({deck})" for _, deck, t in dups)
+                    if not messagebox.askyesno("Possible Duplicate",
+                                               f"'{term}' looks like:\n{listing}\n\nAdd it anyway?"):
+                        return
+                if self.manager.add_term(card_name, term) and self._term_index and self._term_index[0] == card_name:
+                    self._term_index[1].add(term)
                 self.manager.save()
                 self._update_term_list(card_name)
                 self.entry.delete(0, "end")
@@ -141,7 +187,8 @@ class FlashcardGUI:
         if card_sel and term_sel:
             card_name = self.flashcard_list.get(card_sel[0])
             term = self.term_list.get(term_sel[0])
-            self.manager.delete_term(card_name, term)
+            if self.manager.delete_term(card_name, term) and self._term_index and self._term_index[0] == card_name:
+                self._term_index[1].remove(term)
             self.manager.save()
             self._update_term_list(card_name)
 
@@ -152,12 +199,43 @@ class FlashcardGUI:
             return
 
         term = self.term_list.get(term_sel[0])
-        explanation = self.ai.explain_term(term)
 
         popup = ttk.Toplevel(self.root)
         popup.title(f"Explanation for {term}")
-        msg = tk.Message(popup, text=explanation, width=500)
+        msg = tk.Message(popup, text="", width=500)
         msg.pack(padx=10, pady=10)
+        regen_btn = ttk.Button(popup, text="Regenerate", bootstyle=SECONDARY)
+        state = {"task": None, "busy": None}
+
+        def fetch(refresh=False):
+            if state["task"]:
+                state["task"].cancel()
+            regen_btn.config(state="disabled")
+            state["busy"] = BusyIndicator(popup, text="Explaining...")
+            state["task"] = self.worker.submit(
+                popup, self.ai.explain_term, term, refresh=refresh,
+                on_success=on_done, on_error=on_error, timeout=DEFAULT_AI_TIMEOUT,
+            )
+
+        def on_done(explanation):
+            state["busy"].destroy()
+            msg.config(text=explanation)
+            regen_btn.config(state="normal")
+
+        def on_error(e):
+            state["busy"].destroy()
+            msg.config(text=f"Could not get an explanation:\n{e}")
+            regen_btn.config(state="normal")
+
+        def close():
+            if state["task"]:
+                state["task"].cancel()
+            popup.destroy()
+
+        regen_btn.config(command=lambda: fetch(refresh=True))
+        regen_btn.pack(pady=(0, 10))
+        popup.protocol("WM_DELETE_WINDOW", close)
+        fetch()
 
     # Generate Test
     def _generate_test_for_selected(self):
@@ -178,23 +256,167 @@ class FlashcardGUI:
     
     def _show_stats(self):
         try:
-            # opens the score-over-time plot window (uses TestStats)
-            self._stats.plot_score_over_time(parent=self.root)
+            # one score-over-time window, reused on every click (uses TestStats)
+            self._stats.show_stats_window(parent=self.root)
         except Exception as e:
             messagebox.showerror("Stats Error", f"Could not show stats:\n{e}")
 
+    def _show_weakest_terms(self):
+        # selected deck only, or every deck when none is selected
+        selection = self.flashcard_list.curselection()
+        card_name = self.flashcard_list.get(selection[0]) if selection else None
+        rows = self._stats.get_weakest_terms(card_name, n=20)
+
+        popup = ttk.Toplevel(self.root)
+        popup.title(f"Weakest Terms ({card_name or 'All decks'})")
+        if not rows:
+            ttk.Label(popup, text="No tested terms yet.", bootstyle="warning").pack(padx=20, pady=20)
+            return
+        columns = ("term", "deck", "accuracy", "attempts", "last_seen")
+        tree = ttk.Treeview(popup, columns=columns, show="headings", height=min(len(rows), 20))
+        for col, heading, width in zip(columns, ("Term", "Deck", "Recent accuracy", "Attempts", "Last tested"),
+                                       (260, 160, 120, 80, 160)):
+            tree.heading(col, text=heading)
+            tree.column(col, width=width, anchor="w")
+        for r in rows:
+            tree.insert("", "end", values=(r["term"], r["card_name"], f"{r['accuracy'] * 100:.0f}%",
+                                           r["attempts"], (r["last_seen"] or "")[:16].replace("T", " ")))
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+    # Cross-deck search
+    def _open_global_search(self):
+        popup = ttk.Toplevel(self.root)
+        popup.title("Search All Decks")
+        query = tk.StringVar()
+        entry = ttk.Entry(popup, textvariable=query, bootstyle="info", width=60)
+        entry.pack(fill="x", padx=10, pady=10)
+        columns = ("term", "deck", "match")
+        tree = ttk.Treeview(popup, columns=columns, show="headings", height=15)
+        for col, heading, width in zip(columns, ("Term", "Deck", "Match"), (320, 180, 80)):
+            tree.heading(col, text=heading)
+            tree.column(col, width=width, anchor="w")
+        tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        def update(*_):
+            tree.delete(*tree.get_children())
+            text = query.get().strip()
+            if text:
+                for deck, term, kind in self.manager.search_terms(text):
+                    tree.insert("", "end", values=(term, deck, kind))
+
+        def open_selected(event):
+            sel = tree.selection()
+            if not sel:
+                return
+            term, deck, _ = tree.item(sel[0], "values")
+            names = self.manager.get_flashcard_names()
+            if deck not in names:
+                return
+            self.flashcard_list.selection_clear(0, "end")
+            self.flashcard_list.selection_set(names.index(deck))
+            self.flashcard_list.see(names.index(deck))
+            self.term_search.set("")
+            self._on_flashcard_select(None)
+            card = self.manager.get_flashcard(deck)
+            terms = list(card["terms"]) if card else []
+            if term in terms:
+                self.term_list.selection_set(terms.index(term))
+
+        query.trace_add("write", update)
+        tree.bind("<Double-Button-1>", open_selected)
+        entry.focus_set()
+
+    # Spaced-repetition review
+    def _open_review(self):
+        selection = self.flashcard_list.curselection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a flashcard first.")
+            return
+        card_name = self.flashcard_list.get(selection[0])
+        if self._scheduler is None:
+            self._scheduler = ReviewScheduler(self.manager)
+        scheduler = self._scheduler
+
+        popup = ttk.Toplevel(self.root)
+        popup.title(f"Review: {card_name}")
+        status = ttk.Label(popup, text="", bootstyle="secondary")
+        status.pack(padx=20, pady=(15, 5))
+        term_label = ttk.Label(popup, text="", font=("Helvetica", 20, "bold"), wraplength=500)
+        term_label.pack(padx=20, pady=15)
+        msg = tk.Message(popup, text="", width=500)
+        msg.pack(padx=10, pady=5)
+        buttons = ttk.Frame(popup)
+        buttons.pack(pady=15)
+        state = {"term": None, "task": None}
+
+        def show_next():
+            if state["task"]:
+                state["task"].cancel()
+                state["task"] = None
+            msg.config(text="")
+            term = scheduler.next_due(card_name)
+            state["term"] = term
+            if term is None:
+                due = scheduler.next_due_time(card_name)
+                term_label.config(text="Nothing due")
+                status.config(text=f"Next review: {time.strftime('%Y-%m-%d %H:%M', time.localtime(due))}"
+                              if due else "This deck has no terms.")
+                for child in buttons.winfo_children():
+                    child.config(state="disabled")
+                return
+            term_label.config(text=term)
+            status.config(text=f"{scheduler.due_count(card_name)} due")
+
+        def explain():
+            if state["term"] is None or state["task"]:
+                return
+            msg.config(text="Explaining...")
+            state["task"] = self.worker.submit(
+                popup, self.ai.explain_term, state["term"],
+                on_success=lambda text: msg.config(text=text),
+                on_error=lambda e: msg.config(text=f"Could not get an explanation:\n{e}"),
+                timeout=DEFAULT_AI_TIMEOUT,
+            )
+
+        def rate(quality):
+            if state["term"] is not None:
+                scheduler.answer(card_name, state["term"], quality)
+                show_next()
+
+        def close():
+            if state["task"]:
+                state["task"].cancel()
+            scheduler.flush()
+            popup.destroy()
+
+        ttk.Button(buttons, text="Show Explanation", bootstyle=INFO, command=explain).pack(side="left", padx=5)
+        for label, quality in QUALITY.items():
+            ttk.Button(buttons, text=label, bootstyle=SECONDARY,
+                       command=lambda q=quality: rate(q)).pack(side="left", padx=5)
+        popup.protocol("WM_DELETE_WINDOW", close)
+        show_next()
+
     # Update UI
     def _update_flashcard_list(self):
-        self.flashcard_list.delete(0, "end")
-        for name in self.manager.get_flashcard_names():
-            self.flashcard_list.insert("end", name)
+        sync_listbox(self.flashcard_list, self.manager.get_flashcard_names())
 
     def _update_term_list(self, card_name):
-        self.term_list.delete(0, "end")
+        self._current_card = card_name
         card = self.manager.get_flashcard(card_name)
-        if card:
-            for term in card["terms"]:
-                self.term_list.insert("end", term)
+        if not card:
+            self.term_list.set_items([])
+            return
+        query = self.term_search.get().strip()
+        if not query:
+            self.term_list.set_items(list(card["terms"]))
+            return
+        if not self._term_index or self._term_index[0] != card_name:
+            self._term_index = (card_name, PrefixIndex(card["terms"]))
+        self.term_list.set_items(self._term_index[1].search(query))
+
+    def _refresh_term_list(self):
+        if self._current_card is not None:
+            self._update_term_list(self._current_card)
 
     # Event Handlers
     def _on_flashcard_select(self, event):
@@ -202,6 +424,34 @@ class FlashcardGUI:
         if selection:
             name = self.flashcard_list.get(selection[0])
             self._update_term_list(name)
+            if PREFETCH_ON_OPEN:
+                self._start_prefetch(name)
+            card = self.manager.get_flashcard(name)
+            if WARM_BANK_ON_OPEN and card:
+                self.test_gen.warm_bank(card)
+
+    # Explanation Prefetch
+    def _start_prefetch(self, card_name):
+        if self._prefetch_job:
+            self._prefetch_job.cancel()
+        card = self.manager.get_flashcard(card_name)
+        if not card or not card["terms"]:
+            self._prefetch_job = None
+            self.prefetch_label.config(text="")
+            return
+        self._prefetch_job = self.prefetcher.start(card["terms"])
+        self._poll_prefetch(self._prefetch_job, card_name)
+
+    def _poll_prefetch(self, job, card_name):
+        # prefetch threads only bump counters; the label is refreshed from the Tk thread
+        if job is not self._prefetch_job:
+            return
+        text = f"Explanations for {card_name}: {job.completed}/{job.total} ready"
+        if job.failed:
+            text += f" ({job.failed} failed)"
+        self.prefetch_label.config(text=text)
+        if not job.finished:
+            self.root.after(250, lambda: self._poll_prefetch(job, card_name))
 
     # Main Loop
     def run(self):
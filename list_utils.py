@@ -0,0 +1,212 @@
+import tkinter as tk
+import ttkbootstrap as ttk
+
+
+def sync_listbox(listbox, items, current=None):
+    """
+    Make listbox show items, touching only the rows that changed.
+    Keeps the common prefix and suffix and replaces what lies between, so a single add or delete
+    is one insert/delete call instead of a full clear-and-refill.
+    """
+    if current is None:
+        current = listbox.get(0, "end")
+    n_old, n_new = len(current), len(items)
+    start = 0
+    limit = min(n_old, n_new)
+    while start < limit and current[start] == items[start]:
+        start += 1
+    end_old, end_new = n_old, n_new
+    while end_old > start and end_new > start and current[end_old - 1] == items[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+    if end_old > start:
+        listbox.delete(start, end_old - 1)
+    if end_new > start:
+        listbox.insert(start, *items[start:end_new])
+
+
+class VirtualListbox(ttk.Frame):
+    """
+    Listbox that holds any number of items but only ever puts `height` rows into Tk.
+    Scrolling re-renders the visible window (diffed, so only changed rows are redrawn).
+    Offers the parts of the tk.Listbox API the GUI uses: curselection(), get(), see(), size();
+    bind events on .listbox with add="+" so selection tracking runs first.
+    """
+    def __init__(self, master, height=20, **listbox_options):
+        super().__init__(master)
+        self.rows = height
+        self._items = []
+        self._first = 0
+        self._selected = None
+        self._shown = ()
+        self.listbox = tk.Listbox(self, height=height, **listbox_options)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.listbox.bind(seq, self._on_wheel)
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+
+    # ---------- model ----------
+    def set_items(self, items):
+        selected = self._items[self._selected] if self._selected is not None else None
+        self._items = items
+        if self._selected is not None and (self._selected >= len(items) or items[self._selected] != selected):
+            self._selected = None
+        self._first = max(0, min(self._first, len(items) - self.rows))
+        self._render()
+
+    def size(self):
+        return len(self._items)
+
+    def get(self, index):
+        return self._items[index]
+
+    def curselection(self):
+        return (self._selected,) if self._selected is not None else ()
+
+    def selection_set(self, index):
+        self._selected = index
+        self.see(index)
+        self._render()
+
+    def see(self, index):
+        if index < self._first:
+            self._first = index
+        elif index >= self._first + self.rows:
+            self._first = index - self.rows + 1
+        else:
+            return
+        self._render()
+
+    # ---------- rendering ----------
+    def _render(self):
+        window = self._items[self._first:self._first + self.rows]
+        sync_listbox(self.listbox, window, self._shown)
+        self._shown = tuple(window)
+        self.listbox.selection_clear(0, "end")
+        if self._selected is not None and self._first <= self._selected < self._first + self.rows:
+            self.listbox.selection_set(self._selected - self._first)
+        n = len(self._items)
+        if n <= self.rows:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self._first / n, (self._first + self.rows) / n)
+
+    def _scroll_to(self, first):
+        first = max(0, min(int(first), len(self._items) - self.rows))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(float(amount) * len(self._items))
+        elif action == "scroll":
+            step = self.rows if unit == "pages" else 1
+            self._scroll_to(self._first + int(amount) * step)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self._first - 3)
+        else:
+            self._scroll_to(self._first + 3)
+        return "break"
+
+    def _on_select(self, event):
+        sel = self.listbox.curselection()
+        if sel:
+            self._selected = self._first + sel[0]
+
+    def _move_selection(self, step):
+        if not self._items:
+            return "break"
+        index = 0 if self._selected is None else max(0, min(self._selected + step, len(self._items) - 1))
+        self.selection_set(index)
+        self.listbox.event_generate("<<ListboxSelect>>")
+        return "break"
+
+
+class PagedView(ttk.Frame):
+    """
+    Shows a long list of items one page at a time; only the current page's widgets exist.
+    render(parent, item) builds the widgets for one item, so a page is rebuilt cheaply whenever it
+    is shown. on_clear() runs before a page's widgets are destroyed (e.g. to save what was typed).
+    Items can be added while the view is on screen: ones that land on the current page are drawn
+    at once. The page scrolls in a canvas whose scroll region is recomputed once per change rather
+    than on every <Configure>. Extra controls (e.g. a Submit button) can be packed into .nav.
+    """
+    def __init__(self, master, render, page_size=10, on_clear=None):
+        super().__init__(master)
+        self.render = render
+        self.page_size = page_size
+        self.on_clear = on_clear
+        self.items = []
+        self.page = 0
+        self.body = None
+        self._region_job = None
+
+        self.nav = ttk.Frame(self)
+        self.nav.pack(side="bottom", fill="x", pady=5)
+        self.prev_button = ttk.Button(self.nav, text="< Prev", bootstyle="secondary",
+                                      command=lambda: self.show_page(self.page - 1))
+        self.page_label = ttk.Label(self.nav, text="")
+        self.next_button = ttk.Button(self.nav, text="Next >", bootstyle="secondary",
+                                      command=lambda: self.show_page(self.page + 1))
+        self.prev_button.pack(side="left", padx=5)
+        self.page_label.pack(side="left", padx=5)
+        self.next_button.pack(side="left", padx=5)
+
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.show_page(0)
+
+    def pages(self):
+        return max(1, -(-len(self.items) // self.page_size))
+
+    def add(self, item):
+        self.items.append(item)
+        if (len(self.items) - 1) // self.page_size == self.page:
+            self.render(self.body, item)
+            self._schedule_region()
+        self._update_nav()
+
+    def set_items(self, items):
+        self.items = list(items)
+        self.show_page(0)
+
+    def show_page(self, page):
+        page = max(0, min(page, self.pages() - 1))
+        if self.body is not None:
+            if self.on_clear:
+                self.on_clear()
+            self.body.destroy()
+            self.canvas.delete("all")
+        self.page = page
+        self.body = ttk.Frame(self.canvas, padding=10)
+        self.canvas.create_window((0, 0), window=self.body, anchor="nw")
+        for item in self.items[page * self.page_size:(page + 1) * self.page_size]:
+            self.render(self.body, item)
+        self.canvas.yview_moveto(0)
+        self._schedule_region()
+        self._update_nav()
+
+    def _schedule_region(self):
+        # widgets are laid out on the next idle pass; measure once after that
+        if self._region_job is None:
+            self._region_job = self.after_idle(self._update_region)
+
+    def _update_region(self):
+        self._region_job = None
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def _update_nav(self):
+        n = self.pages()
+        self.page_label.configure(text=f"Page {self.page + 1} of {n}")
+        self.prev_button.configure(state="normal" if self.page > 0 else "disabled")
+        self.next_button.configure(state="normal" if self.page < n - 1 else "disabled")
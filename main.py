@@ -1,10 +1,61 @@
+import argparse
+import sys
+import time
+
+_START = time.perf_counter()
+
 from fc_utils import FlashcardManager
+from db_utils import configured_db_path
 from gui_utils import FlashcardGUI
 
+_IMPORTED = time.perf_counter()
+
+# modules that must not be loaded before the first AI action / stats click
+DEFERRED_MODULES = ("matplotlib", "openai", "httpx")
+# default cold-start budget for --profile-startup, in seconds
+STARTUP_BUDGET = 2.0
+
+
+def profile_startup(budget):
+    """Build the main window, wait for its first paint, report timings and exit (1 if over budget)."""
+    manager = FlashcardManager(db_path=configured_db_path())
+    built_start = time.perf_counter()
+    gui = FlashcardGUI(manager)
+    built = time.perf_counter()
+    gui.root.update()   # maps the window and runs the first draw
+    painted = time.perf_counter()
+
+    total = painted - _START
+    print("Startup profile")
+    print(f"  imports          {(_IMPORTED - _START) * 1000:8.1f} ms")
+    print(f"  load decks       {(built_start - _IMPORTED) * 1000:8.1f} ms")
+    print(f"  build window     {(built - built_start) * 1000:8.1f} ms")
+    print(f"  first paint      {(painted - built) * 1000:8.1f} ms")
+    print(f"  total            {total * 1000:8.1f} ms  (budget {budget * 1000:.0f} ms)")
+    loaded = [m for m in DEFERRED_MODULES if m in sys.modules]
+    print(f"  deferred modules loaded at startup: {', '.join(loaded) if loaded else 'none'}")
+    gui.root.destroy()
+
+    over = total > budget
+    if over:
+        print("  OVER BUDGET")
+    return 1 if over or loaded else 0
+
+
 def main():
-    manager = FlashcardManager()
+    parser = argparse.ArgumentParser(description="Flashify")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import and first-paint time, then exit")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET,
+                        help="cold-start budget in seconds for --profile-startup")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        sys.exit(profile_startup(args.budget))
+
+    manager = FlashcardManager(db_path=configured_db_path())
     gui = FlashcardGUI(manager)
     gui.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
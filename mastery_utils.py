@@ -0,0 +1,151 @@
+import heapq
+import json
+import os
+import threading
+from pathlib import Path
+
+# weight of the newest attempt in the decayed accuracy (older attempts fade by 1 - alpha each time)
+MASTERY_ALPHA = 0.3
+FRQ_MAX_SCORE = 5
+
+
+def match_terms(text, terms):
+    """Deck terms mentioned in a question (case-insensitive)."""
+    text = text.casefold()
+    return [t for t in terms if t and t.casefold() in text]
+
+
+def question_outcomes(test_type, responses, parsed_mcqs=None, frq_grades=None):
+    """
+    (question text, score in 0..1) for every graded question of one attempt.
+    MCQs need an answer key in parsed_mcqs; FRQs need the per-question grades from grade_frq.
+    """
+    responses = responses or {}
+    out = []
+    if test_type == "MCQ":
+        for q in parsed_mcqs or []:
+            expected = q.get("answer") or q.get("correct")
+            if not expected:
+                continue
+            idx = q.get("index")
+            given = responses.get(idx, responses.get(str(idx), ""))
+            correct = isinstance(given, str) and given.strip().upper() == str(expected).strip().upper()
+            # the stem only: a term that is just one of the options wasn't what the question tested
+            out.append((q.get("display") or "", 1.0 if correct else 0.0))
+    elif test_type == "FRQ":
+        for g in frq_grades or []:
+            score = min(max(float(g.get("score") or 0), 0.0), g.get("max") or FRQ_MAX_SCORE)
+            out.append((g.get("question") or "", score / (g.get("max") or FRQ_MAX_SCORE)))
+    return out
+
+
+class TermMastery:
+    """
+    Rolling per-(deck, term) aggregates: attempts, correct, last_seen and a decayed accuracy.
+    Everything is held in a dict keyed by deck then term, so reading one term is a lookup;
+    record() updates only the terms an attempt touched. Persisted as a JSON snapshot next to the
+    results log plus a journal of the stats each attempt changed (one line per attempt, compacted
+    into the snapshot on load and every compact_every attempts), or as rows of the mastery table
+    when a db_utils.MasteryStore is given.
+    """
+    def __init__(self, file_path, store=None, alpha=MASTERY_ALPHA, compact_every=500):
+        self.file_path = Path(file_path)
+        self.journal_path = self.file_path.with_name(self.file_path.name + ".journal")
+        self.store = store
+        self.alpha = alpha
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._journal_len = 0
+        self._decks = self._load()
+        if self.store is None and self.journal_path.exists():
+            self._save()
+
+    def _load(self):
+        if self.store is not None:
+            return self.store.load()
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        decks = data if isinstance(data, dict) else {}
+        self._replay_journal(decks)
+        return decks
+
+    def _replay_journal(self, decks):
+        # each line holds the full new stats of the terms one attempt touched, so replay is a dict update
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue   # torn last line; the journal is compacted into the snapshot on load
+                    decks.setdefault(entry["deck"], {}).update(entry["terms"])
+        except FileNotFoundError:
+            pass
+
+    def _append(self, card_name, changed):
+        if self._journal_len + 1 >= self.compact_every:
+            self._save()
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"deck": card_name, "terms": changed}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_len += 1
+
+    def _save(self):
+        # compaction: full snapshot (temp file + rename), then a fresh journal
+        tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._decks, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_len = 0
+
+    # ---------- updates ----------
+    def record(self, card_name, terms, outcomes, timestamp):
+        """Fold one attempt's (question text, score) outcomes into the stats of the terms they mention."""
+        scores = {}
+        for text, score in outcomes:
+            for term in match_terms(text, terms):
+                scores.setdefault(term, []).append(score)
+        if not scores:
+            return {}
+        with self._lock:
+            deck = self._decks.setdefault(card_name, {})
+            for term, values in scores.items():
+                stats = deck.get(term)
+                if stats is None:
+                    stats = deck[term] = {"attempts": 0, "correct": 0.0, "last_seen": None, "accuracy": None}
+                for score in values:
+                    stats["attempts"] += 1
+                    stats["correct"] += score
+                    prev = stats["accuracy"]
+                    stats["accuracy"] = score if prev is None else self.alpha * score + (1 - self.alpha) * prev
+                stats["last_seen"] = timestamp
+            changed = {term: deck[term] for term in scores}
+            if self.store is not None:
+                self.store.upsert(card_name, changed)
+            else:
+                self._append(card_name, changed)
+        return changed
+
+    # ---------- queries ----------
+    def get(self, card_name, term):
+        stats = self._decks.get(card_name, {}).get(term)
+        return dict(stats) if stats else None
+
+    def deck(self, card_name):
+        return {term: dict(stats) for term, stats in self._decks.get(card_name, {}).items()}
+
+    def weakest(self, card_name=None, n=10, min_attempts=1):
+        """The n terms with the lowest decayed accuracy, as dicts with card_name and term added."""
+        decks = [card_name] if card_name is not None else list(self._decks)
+        rows = ({"card_name": name, "term": term, **stats}
+                for name in decks for term, stats in self._decks.get(name, {}).items()
+                if stats["attempts"] >= min_attempts)
+        return heapq.nsmallest(n, rows, key=lambda r: (r["accuracy"], -r["attempts"]))
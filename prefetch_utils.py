@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """Token bucket: on average `rate` acquisitions per second, with bursts of up to `burst`."""
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_event=None):
+        # blocks until a token is available; returns False if cancel_event was set meanwhile
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if cancel_event is None:
+                time.sleep(wait)
+            elif cancel_event.wait(wait):
+                return False
+
+
+class PrefetchJob:
+    """Progress of one deck warm-up; counters are updated from the prefetch threads."""
+    def __init__(self, total, cached):
+        self.total = total
+        self.cached = cached      # already in the cache, nothing to fetch
+        self.fetched = 0
+        self.failed = 0
+        self._remaining = total - cached
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def completed(self):
+        return self.cached + self.fetched + self.failed
+
+    @property
+    def finished(self):
+        return self._remaining == 0 or self._cancel.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _record(self, ok):
+        with self._lock:
+            if ok:
+                self.fetched += 1
+            else:
+                self.failed += 1
+            self._remaining -= 1
+
+
+class ExplanationPrefetcher:
+    """
+    Warms the explanation cache for a whole deck in the background.
+    At most max_concurrency requests are in flight and no more than rate_per_sec are started
+    per second; explanations land in the chatbot's persistent cache.
+    """
+    def __init__(self, ai, max_concurrency=3, rate_per_sec=1.0, burst=3):
+        self.ai = ai
+        self._limiter = RateLimiter(rate_per_sec, burst)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="prefetch")
+
+    def start(self, terms, on_progress=None):
+        """Queue every uncached term; on_progress(job) is called from a worker thread after each one."""
+        terms = list(dict.fromkeys(terms))
+        cache = self.ai.explanation_cache
+        pending = [t for t in terms if self.ai.explanation_key(t) not in cache]
+        job = PrefetchJob(total=len(terms), cached=len(terms) - len(pending))
+        for term in pending:
+            self._executor.submit(self._fetch_one, job, term, on_progress)
+        return job
+
+    def _fetch_one(self, job, term, on_progress):
+        if job.cancelled or not self._limiter.acquire(job._cancel):
+            return
+        try:
+            self.ai.explain_term(term)
+            job._record(True)
+        except Exception as e:
+            print(f"Prefetch failed for '{term}': {e}")
+            job._record(False)
+        if on_progress:
+            on_progress(job)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
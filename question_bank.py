@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BANK_PATH = Path(__file__).parent / "question_bank.json"
+
+# how many questions a test draws from the bank, by test length
+TEST_SIZES = {"15 min": 10, "1 hour": 30}
+
+_NUMBER = re.compile(r"^\d+\.\s*")
+
+
+def terms_signature(terms):
+    return hashlib.sha1("\x1f".join(sorted(terms)).encode("utf-8")).hexdigest()
+
+
+def renumber(question, index):
+    # questions come from different generations, so give them their position in the new test
+    q = dict(question)
+    q["index"] = index
+    for field in ("display", "text"):
+        if field in q:
+            q[field] = f"{index}. " + _NUMBER.sub("", q[field], count=1)
+    if "full_text" in q:
+        first, _, rest = q["full_text"].partition("\n")
+        q["full_text"] = f"{index}. " + _NUMBER.sub("", first, count=1) + ("\n" + rest if rest else "")
+    return q
+
+
+class QuestionBank:
+    """
+    Pre-generated questions per (deck, test type), kept on disk so a test can be assembled instantly.
+    A background thread tops each bank up to target_depth; banks are dropped when their deck's
+    terms change. Each bank holds at most max_per_bank questions and at most max_banks banks are
+    kept (least recently used go first).
+    """
+    def __init__(self, generate, file_path: Path | str = BANK_PATH, target_depth=30,
+                 max_per_bank=60, max_banks=50, max_refill_calls=8):
+        # generate(terms, test_type) -> list of parsed question dicts (blocking, runs on the refill thread)
+        self.generate = generate
+        self.file_path = Path(file_path)
+        self.target_depth = target_depth
+        self.max_per_bank = max_per_bank
+        self.max_banks = max_banks
+        self.max_refill_calls = max_refill_calls
+        self._lock = threading.Lock()
+        self._generation = {}   # deck name -> bumped on invalidation so in-flight refills are discarded
+        self._scheduled = set()
+        self._save_pending = False
+        self._write_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bank-refill")
+        self._banks = self._load()
+
+    @staticmethod
+    def _key(deck_name, test_type):
+        return f"{deck_name}|{test_type}"
+
+    # ---------- queries ----------
+    def depth(self, deck_name, terms, test_type):
+        with self._lock:
+            bank = self._bank_if_current(deck_name, terms, test_type)
+            return len(bank["questions"]) if bank else 0
+
+    def draw(self, deck_name, terms, test_type, count):
+        """
+        Take `count` random questions out of the bank, renumbered 1..count.
+        Returns None (and leaves the bank alone) if it can't fill a whole test.
+        """
+        with self._lock:
+            bank = self._bank_if_current(deck_name, terms, test_type)
+            if not bank or len(bank["questions"]) < count:
+                return None
+            questions = bank["questions"]
+            picks = set(random.sample(range(len(questions)), count))
+            drawn = [q for i, q in enumerate(questions) if i in picks]
+            bank["questions"] = [q for i, q in enumerate(questions) if i not in picks]
+            bank["used"] = time.time()
+            self._schedule_save()
+        return [renumber(q, i) for i, q in enumerate(drawn, start=1)]
+
+    # ---------- maintenance ----------
+    def invalidate_deck(self, deck_name):
+        with self._lock:
+            self._generation[deck_name] = self._generation.get(deck_name, 0) + 1
+            stale = [k for k, b in self._banks.items() if b.get("deck") == deck_name]
+            for k in stale:
+                del self._banks[k]
+            if stale:
+                self._schedule_save()
+
+    def schedule_refill(self, deck_name, terms, test_type):
+        """Top the bank up in the background; repeated calls for the same bank are coalesced."""
+        key = self._key(deck_name, test_type)
+        terms = list(terms)
+        if not terms:
+            return
+        with self._lock:
+            if key in self._scheduled:
+                return
+            self._scheduled.add(key)
+        self._executor.submit(self._refill, deck_name, terms, test_type)
+
+    def _refill(self, deck_name, terms, test_type):
+        key = self._key(deck_name, test_type)
+        try:
+            with self._lock:
+                generation = self._generation.get(deck_name, 0)
+            for _ in range(self.max_refill_calls):
+                if self.depth(deck_name, terms, test_type) >= self.target_depth:
+                    return
+                try:
+                    questions = self.generate(terms, test_type)
+                except Exception as e:
+                    print(f"Question bank refill failed for {key}: {e}")
+                    return
+                with self._lock:
+                    if self._generation.get(deck_name, 0) != generation:
+                        return   # deck changed while we were generating
+                    self._add(deck_name, terms, test_type, questions)
+                self._flush()   # already on the refill thread
+        finally:
+            with self._lock:
+                self._scheduled.discard(key)
+
+    def _add(self, deck_name, terms, test_type, questions):
+        key = self._key(deck_name, test_type)
+        sig = terms_signature(terms)
+        bank = self._banks.get(key)
+        if not bank or bank.get("sig") != sig:
+            bank = {"deck": deck_name, "type": test_type, "sig": sig, "questions": []}
+            self._banks[key] = bank
+        bank["questions"].extend(questions)
+        # oldest questions go first when a bank is over its limit
+        del bank["questions"][:-self.max_per_bank]
+        bank["used"] = time.time()
+        while len(self._banks) > self.max_banks:
+            lru = min(self._banks, key=lambda k: self._banks[k].get("used", 0))
+            del self._banks[lru]
+        self._schedule_save()
+
+    def _bank_if_current(self, deck_name, terms, test_type):
+        bank = self._banks.get(self._key(deck_name, test_type))
+        if bank and bank.get("sig") == terms_signature(terms):
+            return bank
+        return None
+
+    # ---------- persistence ----------
+    def _load(self):
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _schedule_save(self):
+        # called with the lock held, often from the Tk thread: the file is written on the refill
+        # thread, and changes made before that write runs share it
+        if not self._save_pending:
+            self._save_pending = True
+            self._executor.submit(self._flush)
+
+    def _flush(self):
+        with self._lock:
+            if not self._save_pending:
+                return
+            self._save_pending = False
+            data = json.dumps(self._banks, ensure_ascii=False)
+        # the disk write happens outside the lock so draw() never waits on it
+        with self._write_lock:
+            tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.file_path)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._flush()
@@ -0,0 +1,183 @@
+import re
+from dataclasses import dataclass, field
+
+# Question labels: "1.", "1)", "Q1:", "Q1.", "Question 1:"
+NUMBERED = re.compile(r"^(\d+)\s*[.)](?:\s+|$)(.*)")
+Q_PREFIXED = re.compile(r"^Q(?:uestion)?\s*(\d+)\s*[.):\-]?\s*(.*)", re.IGNORECASE)
+# Option labels: "A.", "A)", "(A)"
+OPTION = re.compile(r"^(?:\(([A-Da-d])\)|([A-D])\s*[.)])\s*(.*)")
+MCQ_ANSWER = re.compile(r"^(?:correct\s+)?answer\s*[:\-]\s*\(?([A-Da-d])\b", re.IGNORECASE)
+MCQ_EXPLANATION = re.compile(r"^explanation\s*[:\-]\s*(.*)", re.IGNORECASE)
+
+
+@dataclass
+class MCQQuestion:
+    index: int
+    stem: str
+    options: dict = field(default_factory=dict)
+    answer: str | None = None
+    explanation: str | None = None
+
+    @property
+    def display(self):
+        return f"{self.index}. {self.stem}"
+
+    @property
+    def full_text(self):
+        return "\n".join([self.display] + [f"{letter}. {text}" for letter, text in self.options.items()])
+
+    def to_dict(self):
+        # the shape stored in TestGenerator.parsed_mcqs / test results
+        d = {"index": self.index, "display": self.display, "options": dict(self.options), "full_text": self.full_text}
+        if self.answer:
+            d["answer"] = self.answer
+        if self.explanation is not None:
+            d["explanation"] = self.explanation
+        return d
+
+
+@dataclass
+class FRQQuestion:
+    index: int
+    stem: str
+
+    @property
+    def text(self):
+        return f"{self.index}. {self.stem}"
+
+    def to_dict(self):
+        return {"index": self.index, "text": self.text}
+
+
+class QuestionSet(list):
+    """Parsed questions in order, plus an index -> question map for O(1) lookup."""
+    def __init__(self, questions=()):
+        super().__init__(questions)
+        self.by_index = {q.index: q for q in self}
+
+    def append(self, question):
+        super().append(question)
+        self.by_index[question.index] = question
+
+    def get(self, index):
+        return self.by_index.get(index)
+
+
+def _question_label(line):
+    # cheap first-character check before running any regex
+    first = line[0]
+    if first.isdigit():
+        m = NUMBERED.match(line)
+    elif first in "Qq":
+        m = Q_PREFIXED.match(line)
+    else:
+        return None
+    return m.group(2).strip() if m else None
+
+
+def _option(line):
+    if line[0] not in "ABCD(":
+        return None
+    m = OPTION.match(line)
+    if not m:
+        return None
+    return (m.group(1) or m.group(2)).upper(), m.group(3).strip()
+
+
+class IncrementalQuestionParser:
+    """
+    Single-pass parser for MCQ / FRQ completions that works on a token stream.
+    feed() takes raw text chunks and returns the questions completed by them; close() flushes the rest.
+    Every line is looked at once; questions are renumbered 1..n in the order they appear.
+
+    MCQ questions are emitted once their Explanation line arrives, or at the next question otherwise.
+    FRQ questions are emitted as soon as their (numbered) line is complete; if the model numbers
+    nothing, every non-empty line counts as a question once the stream closes.
+    """
+    def __init__(self, test_type):
+        self.test_type = test_type
+        self.questions = QuestionSet()
+        self._buffer = ""
+        self._current = None       # MCQ being built
+        self._unnumbered = []      # FRQ lines seen before any numbered question
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        if "\n" not in chunk:
+            return []
+        *lines, self._buffer = self._buffer.split("\n")
+        out = []
+        for line in lines:
+            self._line(line, out)
+        return out
+
+    def close(self):
+        out = []
+        if self._buffer:
+            self._line(self._buffer, out)
+            self._buffer = ""
+        if self.test_type == "MCQ":
+            self._flush(out)
+        elif not self.questions:
+            for line in self._unnumbered:
+                self._emit(FRQQuestion(len(self.questions) + 1, line), out)
+        self._unnumbered = []
+        return out
+
+    def _emit(self, question, out):
+        self.questions.append(question)
+        out.append(question)
+
+    def _line(self, line, out):
+        line = line.strip()
+        if not line:
+            return
+        if self.test_type != "MCQ":
+            stem = _question_label(line)
+            if stem is not None:
+                self._emit(FRQQuestion(len(self.questions) + 1, stem), out)
+            elif not self.questions:
+                self._unnumbered.append(line)
+            # unnumbered lines after numbered questions are commentary
+            return
+
+        stem = _question_label(line)
+        if stem is not None:
+            self._flush(out)
+            self._current = MCQQuestion(len(self.questions) + 1, stem)
+            return
+        q = self._current
+        if q is None:
+            # preamble before the first numbered question
+            return
+        option = _option(line)
+        if option is not None:
+            letter, text = option
+            q.options[letter] = text
+            return
+        # the answer key is kept out of full_text so it never reaches the student or a grading prompt
+        m = MCQ_ANSWER.match(line)
+        if m:
+            q.answer = m.group(1).upper()
+            return
+        m = MCQ_EXPLANATION.match(line)
+        if m:
+            q.explanation = m.group(1).strip()
+            self._flush(out)
+            return
+        if not q.options:
+            # stem wrapped onto a second line
+            q.stem = f"{q.stem} {line}"
+
+    def _flush(self, out):
+        if self._current is not None:
+            self._emit(self._current, out)
+            self._current = None
+
+
+def parse_questions(raw, test_type):
+    """Parse a complete (non-streamed) completion into a QuestionSet."""
+    parser = IncrementalQuestionParser(test_type)
+    parser.feed(raw)
+    parser.close()
+    return parser.questions
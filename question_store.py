@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from question_parser import MCQQuestion
+
+
+def compact_question(q):
+    """
+    Split a parsed_mcqs entry into (body, index): body is what gets stored and hashed.
+    MCQQuestion.to_dict() shapes lose display/full_text (rebuilt from stem + options);
+    anything else is stored verbatim so rehydration is always exact.
+    """
+    q = dict(q)
+    index = q.pop("index", None)
+    display = q.get("display")
+    prefix = f"{index}. "
+    if isinstance(index, int) and isinstance(display, str) and display.startswith(prefix) \
+            and isinstance(q.get("options"), dict):
+        body = {"stem": display[len(prefix):], "options": q["options"]}
+        for k in ("answer", "explanation"):
+            if k in q:
+                body[k] = q[k]
+        if expand_question(body, index) == {**q, "index": index}:
+            return body, index
+    return {"raw": q}, index
+
+
+def expand_question(body, index):
+    if "raw" in body:
+        q = dict(body["raw"])
+        if index is not None:
+            q["index"] = index
+        return q
+    return MCQQuestion(index, body["stem"], dict(body["options"]),
+                       body.get("answer"), body.get("explanation")).to_dict()
+
+
+def question_id(body):
+    return hashlib.sha1(json.dumps(body, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+class QuestionStore:
+    """
+    Content-addressed store for generated questions: each distinct question is kept once under
+    the hash of its content, and results refer to questions as [id, index] pairs.
+    Persisted as an append-only JSON-Lines file next to the results log, or in the questions
+    table when a db_utils.QuestionTable is given. Loaded on first use.
+    """
+    def __init__(self, file_path, table=None):
+        self.file_path = Path(file_path)
+        self.table = table
+        self._lock = threading.Lock()
+        self._bodies = None   # id -> body
+
+    def _load(self):
+        if self._bodies is not None:
+            return self._bodies
+        if self.table is not None:
+            self._bodies = self.table.load()
+            return self._bodies
+        bodies = {}
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    bodies[entry["id"]] = entry["q"]
+        except FileNotFoundError:
+            pass
+        self._bodies = bodies
+        return bodies
+
+    def put_many(self, questions):
+        """Store questions (parsed_mcqs dicts) and return their [id, index] refs."""
+        refs, new = [], {}
+        with self._lock:
+            bodies = self._load()
+            for q in questions:
+                body, index = compact_question(q)
+                qid = question_id(body)
+                if qid not in bodies and qid not in new:
+                    new[qid] = body
+                refs.append([qid, index])
+            if new:
+                self._write(new)
+                bodies.update(new)
+        return refs
+
+    def _write(self, new):
+        if self.table is not None:
+            self.table.add_many(new)
+            return
+        lines = "".join(json.dumps({"id": qid, "q": body}, ensure_ascii=False) + "\n" for qid, body in new.items())
+        with open(self.file_path, "ab+") as f:
+            # same torn-line guard as the results log
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines = "\n" + lines
+            f.write(lines.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def expand(self, refs):
+        """Rebuild the parsed_mcqs list for [id, index] refs (unknown ids are skipped)."""
+        with self._lock:
+            bodies = self._load()
+        return [expand_question(bodies[qid], index) for qid, index in refs if qid in bodies]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+
+class ResultRecord(dict):
+    """
+    A results-log record whose parsed_mcqs are rebuilt from the QuestionStore on first access
+    (record["parsed_mcqs"] or record.get("parsed_mcqs")); until then only the refs are held.
+    """
+    __slots__ = ("_questions",)
+
+    def __init__(self, data, questions):
+        super().__init__(data)
+        self._questions = questions
+
+    def __missing__(self, key):
+        if key == "parsed_mcqs" and "question_refs" in self:
+            value = self["parsed_mcqs"] = self._questions.expand(self["question_refs"])
+            return value
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
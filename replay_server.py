@@ -0,0 +1,129 @@
+"""
+Local OpenAI-compatible stand-in that answers /v1/chat/completions from recorded completions.
+
+    python replay_server.py ai_recordings.jsonl --port 8765 --latency 0.3 --jitter 0.1
+    AI_BASE_URL=http://127.0.0.1:8765/v1 python main.py
+
+Pointing the real client at it exercises the full HTTP path (connection pool, streaming, retries)
+without touching OpenRouter.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend_utils import AIError, AIServiceError, AITimeoutError, ReplayBackend
+
+
+def _completion(model, text):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _chunk(chunk_id, model, delta, finish_reason=None):
+    return {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def make_handler(backend):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like the real service
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            model = request.get("model", "replay")
+            args = (model, request.get("messages", []), request.get("max_tokens"), request.get("temperature"), None)
+            try:
+                if request.get("stream"):
+                    self._stream(model, backend.stream(*args))
+                else:
+                    self._send_json(200, _completion(model, backend.complete(*args)))
+            except AIServiceError as e:
+                self._send_json(503, {"error": {"message": str(e)}})
+            except AITimeoutError as e:
+                self._send_json(504, {"error": {"message": str(e)}})
+            except AIError as e:
+                self._send_json(404, {"error": {"message": str(e)}})
+
+        def _stream(self, model, chunks):
+            chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def send(data):
+                payload = f"data: {data}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+                self.wfile.flush()
+
+            send(json.dumps(_chunk(chunk_id, model, {"role": "assistant", "content": ""})))
+            for piece in chunks:
+                send(json.dumps(_chunk(chunk_id, model, {"content": piece})))
+            send(json.dumps(_chunk(chunk_id, model, {}, finish_reason="stop")))
+            send("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+
+    return ReplayHandler
+
+
+def serve(backend, host="127.0.0.1", port=8765):
+    """Start the server on a daemon thread; returns it (call .shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), make_handler(backend))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded completions as an OpenAI-compatible API.")
+    parser.add_argument("recordings", help="JSON-Lines file written with AI_BACKEND=record")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=None, help="fixed latency in seconds (default: as recorded)")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    backend = ReplayBackend(args.recordings, latency=args.latency, latency_scale=args.latency_scale,
+                            jitter=args.jitter, error_rate=args.error_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(backend))
+    server.daemon_threads = True
+    print(f"Replaying {len(backend)} recordings on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
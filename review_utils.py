@@ -0,0 +1,230 @@
+import atexit
+import hashlib
+import heapq
+import json
+import os
+import threading
+import time
+
+DAY = 86400
+# SM-2 defaults
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+# answer buttons in the review window -> SM-2 quality (0-5)
+QUALITY = {"Again": 1, "Hard": 3, "Good": 4, "Easy": 5}
+
+
+def sm2(state, quality, now):
+    """Next [due, interval_days, ease, reps] after answering with quality 0-5."""
+    _, interval, ease, reps = state
+    if quality < 3:
+        reps, interval = 0, 1
+    else:
+        if reps == 0:
+            interval = 1
+        elif reps == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+        reps += 1
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return [int(now + interval * DAY), interval, round(ease, 2), reps]
+
+
+class _DeckSchedule:
+    # state: term -> [due (epoch s), interval (days), ease, reps]; heap of (due, term) with stale
+    # entries skipped when popped (a term's entry is live only while its due matches the state).
+    # due is the number of terms due at counted_at; upcoming holds the entries due after it, and
+    # is drained into the count as time moves on
+    __slots__ = ("name", "state", "heap", "dirty", "needs_sync", "due", "counted_at", "upcoming")
+
+    def __init__(self, name, state):
+        self.name = name
+        self.state = state
+        self.heap = [(s[0], term) for term, s in state.items()]
+        heapq.heapify(self.heap)
+        self.dirty = False
+        self.needs_sync = True
+        self.due = 0
+        self.counted_at = 0
+        self.upcoming = []
+
+    def push(self, term, due):
+        heapq.heappush(self.heap, (due, term))
+
+    def schedule(self, term, due):
+        # push() for a term that is in the deck, keeping the due count current
+        self.push(term, due)
+        if due <= self.counted_at:
+            self.due += 1
+        else:
+            heapq.heappush(self.upcoming, (due, term))
+
+
+class ReviewScheduler:
+    """
+    SM-2 spaced repetition over FlashcardManager decks.
+    Each deck keeps a min-heap of due times, so the next due term and rescheduling it are O(log n).
+    State is stored per deck under <flashcards>.review/ and a deck's file is only read the first
+    time that deck is reviewed; new terms are due immediately, deleted terms drop out lazily.
+    """
+    def __init__(self, manager, directory=None):
+        self.manager = manager
+        self.directory = directory or os.path.splitext(manager.filepath)[0] + '.review'
+        self._decks = {}   # name -> _DeckSchedule, only decks opened so far
+        self._lock = threading.Lock()
+        manager.add_listener(self._on_deck_changed)
+        atexit.register(self.flush)
+
+    # ---------- persistence ----------
+    def _path(self, card_name):
+        digest = hashlib.sha1(card_name.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, digest + '.json')
+
+    def _deck(self, card_name):
+        deck = self._decks.get(card_name)
+        if deck is None:
+            state = {}
+            try:
+                with open(self._path(card_name), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('deck') == card_name:
+                    state = data.get('terms', {})
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+            deck = self._decks[card_name] = _DeckSchedule(card_name, state)
+        if deck.needs_sync:
+            self._sync(deck)
+        return deck
+
+    def _sync(self, deck):
+        # schedule terms added since the deck was last looked at; removed ones are skipped on pop
+        card = self.manager.get_flashcard(deck.name)
+        terms = card['terms'] if card else ()
+        now = int(time.time())
+        for term in terms:
+            if term not in deck.state:
+                deck.state[term] = [now, 0, INITIAL_EASE, 0]
+                deck.schedule(term, now)
+                deck.dirty = True
+        deck.needs_sync = False
+        self._recount(deck, terms, now)
+
+    @staticmethod
+    def _recount(deck, terms, now):
+        # O(n); only on first load and after the deck's terms change
+        deck.due = 0
+        deck.upcoming = []
+        for term, s in deck.state.items():
+            if term not in terms:
+                continue
+            if s[0] <= now:
+                deck.due += 1
+            else:
+                deck.upcoming.append((s[0], term))
+        heapq.heapify(deck.upcoming)
+        deck.counted_at = now
+
+    def flush(self):
+        with self._lock:
+            for deck in self._decks.values():
+                if deck.dirty:
+                    self._save(deck)
+
+    def _save(self, deck):
+        card = self.manager.get_flashcard(deck.name)
+        if card is None:
+            return
+        # drop state for terms that were deleted from the deck
+        state = {t: s for t, s in deck.state.items() if t in card['terms']}
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(deck.name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'deck': deck.name, 'terms': state}, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        deck.dirty = False
+
+    def _on_deck_changed(self, card_name):
+        if self.manager.get_flashcard(card_name) is None:
+            # deck deleted, whether or not it was reviewed this session
+            self._decks.pop(card_name, None)
+            try:
+                os.remove(self._path(card_name))
+            except FileNotFoundError:
+                pass
+            return
+        deck = self._decks.get(card_name)
+        if deck is not None:
+            deck.needs_sync = True
+
+    # ---------- scheduling ----------
+    def _peek(self, deck):
+        card = self.manager.get_flashcard(deck.name)
+        heap = deck.heap
+        while heap:
+            due, term = heap[0]
+            s = deck.state.get(term)
+            if s is not None and s[0] == due and card is not None and term in card['terms']:
+                return due, term
+            heapq.heappop(heap)
+        return None
+
+    def next_due(self, card_name, now=None):
+        """The term of card_name that is due soonest and already due, or None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            top = self._peek(self._deck(card_name))
+        return top[1] if top and top[0] <= now else None
+
+    def next_due_time(self, card_name):
+        """Epoch seconds when the next term of card_name becomes due, or None for an empty deck."""
+        with self._lock:
+            top = self._peek(self._deck(card_name))
+        return top[0] if top else None
+
+    def due_count(self, card_name, now=None):
+        """Terms of card_name due at now; O(log n) per term that became due since the last count."""
+        now = time.time() if now is None else now
+        with self._lock:
+            deck = self._deck(card_name)
+            card = self.manager.get_flashcard(card_name)
+            terms = card['terms'] if card else ()
+            if now < deck.counted_at:
+                self._recount(deck, terms, now)
+            upcoming = deck.upcoming
+            while upcoming and upcoming[0][0] <= now:
+                due, term = heapq.heappop(upcoming)
+                s = deck.state.get(term)
+                if s is not None and s[0] == due and term in terms:
+                    deck.due += 1
+            deck.counted_at = now
+            return deck.due
+
+    def answer(self, card_name, term, quality, now=None):
+        """Record a review of term (quality 0-5, see QUALITY) and reschedule it; returns the new due time."""
+        now = time.time() if now is None else now
+        with self._lock:
+            deck = self._deck(card_name)
+            card = self.manager.get_flashcard(card_name)
+            live = card is not None and term in card['terms']
+            state = deck.state.get(term)
+            if live and state is not None and state[0] <= deck.counted_at:
+                deck.due -= 1   # was counted as due; schedule() counts the new due time
+            state = state or [int(now), 0, INITIAL_EASE, 0]
+            deck.state[term] = new = sm2(state, quality, now)
+            if live:
+                deck.schedule(term, new[0])
+            else:
+                deck.push(term, new[0])
+            deck.dirty = True
+            return new[0]
+
+    def get_state(self, card_name, term):
+        with self._lock:
+            s = self._deck(card_name).state.get(term)
+        if s is None:
+            return None
+        return {'due': s[0], 'interval_days': s[1], 'ease': s[2], 'reps': s[3]}
@@ -0,0 +1,241 @@
+import json
+import os
+from datetime import datetime
+import numpy as np
+
+
+def rolling_mean(values, window):
+    """Trailing mean over `window` points (shorter at the start), vectorized with a cumulative sum."""
+    values = np.asarray(values, dtype=float)
+    if window <= 1 or len(values) == 0:
+        return values
+    csum = np.cumsum(values)
+    out = np.empty_like(csum)
+    out[:window] = csum[:window] / np.arange(1, min(window, len(values)) + 1)
+    out[window:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def lttb(x, y, n_out):
+    """
+    Indices of the n_out points Largest-Triangle-Three-Buckets downsampling keeps (all of them if
+    there are no more than n_out). First and last points are always kept; in between, each bucket
+    keeps the point forming the largest triangle with the previous pick and the next bucket's mean,
+    which preserves peaks and dips that plain striding would drop.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, stops = edges[:-1], edges[1:]
+    # bucket means from cumulative sums, plus the last point standing in for the bucket after the last
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = stops - starts
+    mean_x = np.append((cx[stops] - cx[starts]) / sizes, x[-1])
+    mean_y = np.append((cy[stops] - cy[starts]) / sizes, y[-1])
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = starts[i], stops[i]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - mean_x[i + 1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (mean_y[i + 1] - ay))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+class ResultColumns:
+    """
+    Column-oriented, in-memory copy of the results log used by the TestStats plots.
+
+    Each attempt becomes one row: timestamp (datetime64), percent (float), card id and test-type id
+    (small ints into a name table), plus the MCQ response values for per-option counts.
+    Because the log is append-only, refresh() only parses bytes past the last offset it read; a file
+    that shrank or was replaced is re-read from scratch. add_result() can also push its record in
+    directly so the next plot doesn't touch the file at all.
+    With a db_utils.ResultStore the same scheme runs on row ids: offset is the last id read.
+    Sealed archive segments are read once, before the hot log; sealing rewrites the hot log,
+    which resets the cache.
+    """
+    def __init__(self, file_path, store=None, archive=None):
+        self.file_path = file_path
+        self.store = store
+        self.archive = archive
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self._stat = None
+        self.card_names = []
+        self._card_ids = {}
+        self.test_types = []
+        self._type_ids = {}
+        # rows not yet folded into the numpy columns
+        self._pending = {"ts": [], "percent": [], "card": [], "type": [], "responses": []}
+        self._ts = np.empty(0, dtype="datetime64[us]")
+        self._percent = np.empty(0, dtype=float)
+        self._card = np.empty(0, dtype=np.int32)
+        self._type = np.empty(0, dtype=np.int16)
+        self._responses = []     # per row: tuple of MCQ response values, or None
+        self._order = None       # cached argsort by timestamp
+        self._selection_cache = {}
+        self._sealed = False
+
+    # ---------- loading ----------
+    def refresh(self):
+        if self.store is not None:
+            for row_id, record in self.store.since(self.offset):
+                self._add_row(record)
+                self.offset = row_id
+            return
+        try:
+            st = os.stat(self.file_path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if key == self._stat:
+            return
+        if self._stat is not None and (st.st_ino != self._stat[0] or st.st_size < self.offset):
+            # rewritten (migration / compaction / sealing): start over
+            self._reset()
+        if not self._sealed and self.archive is not None:
+            for segment in self.archive.segments:
+                for line in self.archive.iter_lines(segment):
+                    self._add_row(json.loads(line))
+        self._sealed = True
+        self._read_from(self.offset)
+        self._stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _read_from(self, offset):
+        # line by line, so a large backlog is never held in memory at once
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break   # only a partial line so far
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._add_row(json.loads(line))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+        self.offset = offset
+
+    def append(self, record, start_offset, end_offset):
+        """Add a record written by this process at [start_offset, end_offset) of the log."""
+        if start_offset != self.offset:
+            return   # someone else appended meanwhile; refresh() will read both
+        self._add_row(record)
+        self.offset = end_offset
+        if self.store is not None:
+            return
+        try:
+            st = os.stat(self.file_path)
+            if st.st_size == end_offset:
+                self._stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+
+    def _code(self, value, names, ids):
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(names)
+            names.append(value)
+        return code
+
+    def _add_row(self, record):
+        p = self._pending
+        try:
+            ts = np.datetime64(datetime.fromisoformat(record["timestamp"]), "us")
+        except Exception:
+            ts = np.datetime64(datetime.utcnow(), "us")
+        p["ts"].append(ts)
+        p["percent"].append(float(record.get("percent") or 0.0))
+        p["card"].append(self._code(record.get("card_name"), self.card_names, self._card_ids))
+        p["type"].append(self._code(record.get("test_type"), self.test_types, self._type_ids))
+        responses = record.get("responses") or {}
+        p["responses"].append(tuple(responses.values()) if record.get("test_type") == "MCQ" else None)
+
+    def _columns(self):
+        p = self._pending
+        if p["ts"]:
+            self._ts = np.concatenate([self._ts, np.array(p["ts"], dtype="datetime64[us]")])
+            self._percent = np.concatenate([self._percent, np.array(p["percent"], dtype=float)])
+            self._card = np.concatenate([self._card, np.array(p["card"], dtype=np.int32)])
+            self._type = np.concatenate([self._type, np.array(p["type"], dtype=np.int16)])
+            self._responses.extend(p["responses"])
+            for k in p:
+                p[k] = []
+            self._order = None
+        return self._ts, self._percent, self._card, self._type
+
+    def __len__(self):
+        return len(self._ts) + len(self._pending["ts"])
+
+    # ---------- queries ----------
+    def _mask(self, card_name=None, test_type=None):
+        ts, _, card, ttype = self._columns()
+        mask = np.ones(len(ts), dtype=bool)
+        if card_name is not None:
+            code = self._card_ids.get(card_name)
+            if code is None:
+                return np.zeros(len(ts), dtype=bool)
+            mask &= card == code
+        if test_type is not None:
+            code = self._type_ids.get(test_type)
+            if code is None:
+                return np.zeros(len(ts), dtype=bool)
+            mask &= ttype == code
+        return mask
+
+    def scores(self, card_name=None, test_type=None, recent_n=None):
+        """(times, percents) sorted by time, optionally only the last recent_n attempts."""
+        ts, percent, _, _ = self._columns()
+        if self._order is None:
+            self._order = np.argsort(ts, kind="stable")
+        order = self._order[self._mask(card_name, test_type)[self._order]]
+        if recent_n:
+            order = order[-recent_n:]
+        return ts[order], percent[order]
+
+    def selection_counts(self, question_index, card_name=None):
+        """
+        For MCQ attempts (in log order) that answered question #question_index:
+        returns (times, options, cumulative) where cumulative[i, j] counts how often
+        options[j] had been chosen up to attempt i.
+        """
+        ts, _, _, _ = self._columns()
+        codes, options = self._selection_column(question_index)
+        mask = (codes >= 0) & self._mask(card_name)
+        picked = codes[mask]
+        if not len(picked):
+            return ts[:0], [], np.zeros((0, 0), dtype=int)
+        present = np.unique(picked)
+        labels = [options[c] for c in present]
+        order = sorted(range(len(labels)), key=lambda i: str(labels[i]))
+        present, labels = present[order], [labels[i] for i in order]
+        cumulative = np.cumsum(picked[:, None] == present[None, :], axis=0)
+        return ts[mask], labels, cumulative
+
+    def _selection_column(self, question_index):
+        # codes for the chosen option of one question, extended incrementally as rows arrive
+        cached = self._selection_cache.get(question_index)
+        codes, options, ids = cached if cached else (np.empty(0, dtype=np.int32), [], {})
+        start = len(codes)
+        if start < len(self._responses):
+            new = []
+            for values in self._responses[start:]:
+                if values is None or len(values) <= question_index or values[question_index] is None:
+                    new.append(-1)
+                else:
+                    new.append(self._code(values[question_index], options, ids))
+            codes = np.concatenate([codes, np.array(new, dtype=np.int32)])
+            self._selection_cache[question_index] = (codes, options, ids)
+        return codes, options
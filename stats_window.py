@@ -0,0 +1,139 @@
+import tkinter as tk
+import ttkbootstrap as ttk
+import numpy as np
+from matplotlib import dates as mdates
+from matplotlib.figure import Figure
+from stats_columns import lttb, rolling_mean
+
+ALL_DECKS = "All decks"
+ALL_TYPES = "All types"
+# window selector label -> recent_n
+WINDOWS = {"All attempts": None, "Last 50": 50, "Last 200": 200, "Last 1000": 1000}
+# markers are only drawn when this few points are on screen
+MARKER_LIMIT = 200
+
+
+class ScorePlot:
+    """
+    Score-over-time axes drawn into one long-lived figure.
+    The attempt and rolling-average lines are animated artists: changing the data only restores the
+    cached background and redraws the two lines (blitting). A full draw happens only when the
+    axes themselves change (x range, title, size); the draw_event hook re-caches the background.
+    Each line is downsampled with LTTB to about one point per horizontal pixel.
+    """
+    def __init__(self, fig, canvas, rolling=5):
+        self.fig = fig
+        self.canvas = canvas
+        self.rolling = rolling
+        self.ax = fig.add_subplot(111)
+        self.attempts, = self.ax.plot([], [], linestyle="-", label="Attempt", animated=True)
+        self.average, = self.ax.plot([], [], linestyle="--", label=f"{rolling}-attempt average", animated=True)
+        self.ax.set_xlabel("Date")
+        self.ax.set_ylabel("Percent (%)")
+        self.ax.set_ylim(0, 100)
+        self.ax.grid(True)
+        self.ax.xaxis_date()
+        self.ax.legend(loc="lower left")
+        self.empty = self.ax.text(0.5, 0.5, "No test results found.", transform=self.ax.transAxes,
+                                  ha="center", va="center", visible=False)
+        self._background = None
+        self._layout = None
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _budget(self):
+        # about one point per pixel of axes width
+        return max(int(self.ax.bbox.width), 100)
+
+    def set_data(self, times, percents, title):
+        budget = self._budget()
+        x = mdates.date2num(times) if len(times) else np.empty(0)
+        y = np.asarray(percents, dtype=float)
+        keep = lttb(x, y, budget)
+        self.attempts.set_data(x[keep], y[keep])
+        self.attempts.set_marker("o" if len(keep) <= MARKER_LIMIT else "")
+        if self.rolling and len(y) > self.rolling:
+            avg = rolling_mean(y, self.rolling)
+            keep = lttb(x, avg, budget)
+            self.average.set_data(x[keep], avg[keep])
+        else:
+            self.average.set_data([], [])
+
+        if len(x):
+            lo, hi = x[0], x[-1]
+            if hi - lo < 1:
+                # a single day (or point): show a day either side
+                lo, hi = lo - 1, hi + 1
+            self.ax.set_xlim(lo, hi)
+        self.ax.set_title(title)
+        self.empty.set_visible(not len(x))
+        layout = (self.ax.get_xlim(), title, not len(x), self.fig.bbox.bounds)
+        if layout != self._layout or self._background is None:
+            self._layout = layout
+            self.canvas.draw()   # static parts only; _on_draw puts the lines on top
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        self.ax.draw_artist(self.attempts)
+        self.ax.draw_artist(self.average)
+        self.canvas.blit(self.fig.bbox)
+
+
+class StatsWindow(ttk.Toplevel):
+    """
+    Persistent "View Test Stats" window: one canvas and figure for the life of the app.
+    Closing only hides it; TestStats.show_stats_window() shows it again and refreshes the data.
+    Deck, test type and window selectors redraw the plot in place.
+    """
+    def __init__(self, stats, parent):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        super().__init__(parent)
+        self.title("Score Over Time")
+        self.stats = stats
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
+        controls = ttk.Frame(self)
+        controls.pack(fill="x", padx=10, pady=(10, 0))
+        self.card_var = tk.StringVar(value=ALL_DECKS)
+        self.type_var = tk.StringVar(value=ALL_TYPES)
+        self.window_var = tk.StringVar(value=next(iter(WINDOWS)))
+        self.card_box = ttk.Combobox(controls, textvariable=self.card_var, state="readonly", width=30)
+        self.type_box = ttk.Combobox(controls, textvariable=self.type_var, state="readonly", width=12)
+        window_box = ttk.Combobox(controls, textvariable=self.window_var, values=list(WINDOWS),
+                                  state="readonly", width=14)
+        for label, box in (("Deck:", self.card_box), ("Type:", self.type_box), ("Show:", window_box)):
+            ttk.Label(controls, text=label).pack(side="left", padx=(0, 4))
+            box.pack(side="left", padx=(0, 12))
+            box.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+
+        fig = Figure(figsize=(7, 3.5), dpi=100)
+        self.canvas = FigureCanvasTkAgg(fig, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.plot = ScorePlot(fig, self.canvas)
+        self._resize_job = None
+        self.canvas.get_tk_widget().bind("<Configure>", self._on_resize, add="+")
+
+    def refresh(self):
+        columns = self.stats._get_columns()
+        self.card_box.configure(values=[ALL_DECKS, *sorted(n for n in columns.card_names if n is not None)])
+        self.type_box.configure(values=[ALL_TYPES, *(t for t in columns.test_types if t is not None)])
+        card_name = None if self.card_var.get() == ALL_DECKS else self.card_var.get()
+        test_type = None if self.type_var.get() == ALL_TYPES else self.type_var.get()
+        times, percents = columns.scores(card_name=card_name, test_type=test_type,
+                                         recent_n=WINDOWS.get(self.window_var.get()))
+        self.plot.set_data(times, percents, f"Score / Answered % Over Time ({card_name or 'All'})")
+
+    def _on_resize(self, event):
+        # the point budget follows the width; re-sample once resizing settles
+        if self._resize_job is not None:
+            self.after_cancel(self._resize_job)
+        self._resize_job = self.after(150, self._after_resize)
+
+    def _after_resize(self):
+        self._resize_job = None
+        self.refresh()
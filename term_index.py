@@ -0,0 +1,210 @@
+import bisect
+import math
+import re
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+# Dice similarity on character trigrams above which two terms count as likely duplicates
+FUZZY_THRESHOLD = 0.7
+
+
+def normalize(term):
+    """Comparison key: casefolded, punctuation dropped, whitespace collapsed ("Newton's 2nd Law" -> "newtons 2nd law")."""
+    return " ".join(_NON_WORD.sub("", term.casefold()).split())
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class PrefixIndex:
+    """
+    Sorted (key, term) pairs for search-as-you-type: every word of a term is a key, so "rev"
+    finds both "Revolution" and "French Revolution". Lookups are two bisects; add/remove
+    keep the list sorted with insort.
+    """
+    def __init__(self, terms=()):
+        self._keys = sorted((key, term) for term in terms for key in self._term_keys(term))
+
+    @staticmethod
+    def _term_keys(term):
+        words = term.casefold().split()
+        # the whole term as well, so prefixes spanning words ("french re") still match
+        return {" ".join(words[i:]) for i in range(len(words))}
+
+    def add(self, term):
+        for key in self._term_keys(term):
+            bisect.insort(self._keys, (key, term))
+
+    def remove(self, term):
+        for key in self._term_keys(term):
+            i = bisect.bisect_left(self._keys, (key, term))
+            if i < len(self._keys) and self._keys[i] == (key, term):
+                del self._keys[i]
+
+    def search(self, prefix, limit=None):
+        """Terms with a word starting with prefix, in key order, without duplicates."""
+        prefix = " ".join(prefix.casefold().split())
+        keys = self._keys
+        seen = {}
+        for i in range(bisect.bisect_left(keys, (prefix,)), len(keys)):
+            key, term = keys[i]
+            if not key.startswith(prefix):
+                break
+            seen.setdefault(term, None)
+            if limit is not None and len(seen) >= limit:
+                break
+        return list(seen)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def dice(a, b):
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 1.0
+
+
+def _variants(word):
+    # the word and every single-character deletion of it; two words sharing a variant are
+    # at most one typo apart (insert, delete, substitute or swap)
+    return {word, *(word[:i] + word[i + 1:] for i in range(len(word)))}
+
+
+class TermIndex:
+    """
+    Cross-deck index of every (deck, term) pair with exact, prefix and fuzzy lookup.
+    Terms are grouped by their normalized key (so exact lookup is one dict hit); prefix search is a
+    PrefixIndex over the keys; fuzzy search goes through the words of the keys.
+    add()/remove() keep everything up to date.
+
+    Fuzzy lookup: each query word is expanded to the known words within one typo of it using a
+    deletion-variant table (a handful of dict lookups). A match has to contain most of the
+    query's words, so only the postings of its rarest words are read, and the few keys
+    found are scored by trigram Dice similarity against the query.
+    """
+    def __init__(self, pairs=()):
+        self._entries = {}     # key -> {(deck, term): None}
+        self._word_keys = {}   # word -> set of keys containing it
+        self._variants = {}    # deletion variant -> set of words
+        self._count = 0
+        for deck, term in pairs:
+            key = normalize(term)
+            entries = self._entries.get(key)
+            if entries is None:
+                entries = self._entries[key] = {}
+                self._index_key(key)
+            if (deck, term) not in entries:
+                entries[(deck, term)] = None
+                self._count += 1
+        # bulk load: the prefix index is sorted once instead of insort per key
+        self._prefix = PrefixIndex(self._entries)
+
+    def __len__(self):
+        return self._count
+
+    # ---------- maintenance ----------
+    def _index_key(self, key):
+        for word in set(key.split()):
+            keys = self._word_keys.get(word)
+            if keys is None:
+                keys = self._word_keys[word] = set()
+                for v in _variants(word):
+                    self._variants.setdefault(v, set()).add(word)
+            keys.add(key)
+
+    def _unindex_key(self, key):
+        for word in set(key.split()):
+            keys = self._word_keys[word]
+            keys.discard(key)
+            if not keys:
+                del self._word_keys[word]
+                for v in _variants(word):
+                    words = self._variants[v]
+                    words.discard(word)
+                    if not words:
+                        del self._variants[v]
+
+    def add(self, deck, term):
+        key = normalize(term)
+        entries = self._entries.get(key)
+        if entries is None:
+            entries = self._entries[key] = {}
+            self._index_key(key)
+            self._prefix.add(key)
+        if (deck, term) not in entries:
+            entries[(deck, term)] = None
+            self._count += 1
+
+    def remove(self, deck, term):
+        key = normalize(term)
+        entries = self._entries.get(key)
+        if entries is None or (deck, term) not in entries:
+            return
+        del entries[(deck, term)]
+        self._count -= 1
+        if not entries:
+            del self._entries[key]
+            self._unindex_key(key)
+            self._prefix.remove(key)
+
+    # ---------- lookups ----------
+    def exact(self, term):
+        """(deck, term) pairs whose normalized form equals term's."""
+        return list(self._entries.get(normalize(term), ()))
+
+    def prefix(self, prefix, limit=50):
+        """(deck, term) pairs with a word starting with prefix."""
+        out = []
+        for key in self._prefix.search(normalize(prefix), limit=limit):
+            out.extend(self._entries[key])
+            if len(out) >= limit:
+                break
+        return out[:limit]
+
+    def fuzzy(self, term, threshold=FUZZY_THRESHOLD, limit=10):
+        """
+        [(score, deck, term)] for terms whose trigram Dice similarity to term is >= threshold, best first.
+        Terms equal after normalize() score 1.0, so this also serves as the duplicate check.
+        """
+        key = normalize(term)
+        words = set(key.split())
+        if not words:
+            return []
+        expanded = []
+        for word in words:
+            similar = set()
+            for v in _variants(word):
+                similar |= self._variants.get(v, set())
+            expanded.append((sum(len(self._word_keys[w]) for w in similar), similar))
+        # words with no known form can't be part of any match
+        expanded = sorted((e for e in expanded if e[1]), key=lambda e: e[0])
+        # a match shares (a typo'd form of) a threshold share of the query's words, less one for
+        # longer terms, hence at least one of the len - need + 1 rarest known ones
+        need = max(1, math.ceil(len(words) * threshold) - (len(words) >= 3))
+        candidates = set()
+        for _, similar in expanded[:max(0, len(expanded) - need + 1)]:
+            for w in similar:
+                candidates |= self._word_keys[w]
+        query = trigrams(key)
+        # a key of m trigrams can only reach the threshold if t/(2-t) <= m/n <= (2-t)/t;
+        # len(key) + 2 approximates m without building the set
+        n = len(query)
+        min_len, max_len = n * threshold / (2 - threshold), n * (2 - threshold) / threshold
+        scored = []
+        for cand in candidates:
+            if not min_len <= len(cand) + 2 <= max_len:
+                continue
+            # cheap word-count check first; trigrams are only built for keys that pass it
+            cand_words = cand.split()
+            if need > 1 and sum(1 for _, similar in expanded if not similar.isdisjoint(cand_words)) < need:
+                continue
+            score = dice(query, trigrams(cand))
+            if score >= threshold:
+                scored.append((score, cand))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        out = []
+        for score, cand in scored:
+            out.extend((round(score, 3), deck, t) for deck, t in self._entries[cand])
+            if len(out) >= limit:
+                break
+        return out[:limit]
@@ -0,0 +1,94 @@
+from grading_utils import answer_key_map, build_test_prompt, count_correct, grade_frq, grade_mcq
+from question_parser import parse_questions
+from question_bank import TEST_SIZES
+
+# Test generation and grading with no Tk dependency: TestGenerator drives it from the GUI,
+# batch.py from the command line. All methods block, so callers run them on worker threads.
+
+
+def normalize_answers(test_type, answers):
+    """
+    Answers as TestGenerator stores them: MCQ choices by int question index ("1": "b" -> 1: "B"),
+    FRQ text under "FRQ_<index>". Answer files may use either form.
+    """
+    out = {}
+    for key, value in answers.items():
+        key = str(key)
+        if test_type == "FRQ":
+            out[key if key.startswith("FRQ_") else f"FRQ_{int(key)}"] = value
+        else:
+            out[int(key)] = str(value or "").strip().upper()
+    return out
+
+
+def mcq_report(parsed_mcqs, answers, grading_map):
+    """
+    Score MCQ answers against grading_map (index -> {correct, explanation}).
+    Fills each question's "answer" from the grading map so the saved record carries the key.
+    """
+    items = []
+    for q in parsed_mcqs:
+        idx = q["index"]
+        gm = grading_map.get(idx)
+        item = {"index": idx, "question": q["display"], "answer": answers.get(idx, "")}
+        if gm:
+            q["answer"] = gm["correct"]
+            item.update(correct=gm["correct"], explanation=gm["explanation"],
+                        correct_text=q["options"].get(gm["correct"], "(option text unavailable)"),
+                        is_correct=item["answer"] == gm["correct"])
+        items.append(item)
+    return {"score": count_correct(parsed_mcqs, answers, grading_map), "max_score": len(parsed_mcqs),
+            "items": items}
+
+
+def frq_report(graded, answers):
+    """Score FRQ answers from a grade_frq() result (each question out of 5)."""
+    parsed = graded["parsed"]
+    items, frq_grades = [], []
+    for g in parsed:
+        idx = int(g.get("q", 0))
+        score = int(g.get("score", 0))
+        question = graded["questions"].get(idx, f"Question {idx}")
+        items.append({"index": idx, "question": question, "answer": answers.get(f"FRQ_{idx}", ""),
+                      "score": score, "feedback": g.get("feedback", "")})
+        frq_grades.append({"question": question, "score": score, "max": 5})
+    return {"score": sum(i["score"] for i in items),
+            "max_score": len(parsed) * 5 if parsed else graded["count"] * 5,
+            "items": items, "frq_grades": frq_grades}
+
+
+class TestEngine:
+    """Generate and grade tests with an AIChatbot, independent of any widgets."""
+    def __init__(self, ai):
+        self.ai = ai
+
+    def generate(self, terms, test_type, length=None):
+        """Parsed question dicts for terms; trimmed to the test size for length when given."""
+        raw = self.ai.generate_test(build_test_prompt(terms, test_type))
+        questions = [q.to_dict() for q in parse_questions(raw, test_type)]
+        size = TEST_SIZES.get(length)
+        return questions[:size] if size else questions
+
+    @staticmethod
+    def needs_model(test_type, questions):
+        # MCQs generated with an answer key are graded locally
+        return test_type == "FRQ" or any(not q.get("answer") for q in questions)
+
+    def grade_mcq(self, questions, answers):
+        grading_map = answer_key_map(questions)
+        ungraded = [q for q in questions if q["index"] not in grading_map]
+        if ungraded:
+            grading_map = {**grading_map, **grade_mcq(self.ai, ungraded)}
+        return mcq_report(questions, answers, grading_map)
+
+    def grade_frq(self, question_texts, answers):
+        # question_texts maps question index -> question text
+        return frq_report(grade_frq(self.ai, answers, question_texts), answers)
+
+    def grade(self, test_type, questions, answers):
+        """Report for normalized answers: score, max_score, per-question items (and frq_grades for FRQ)."""
+        if test_type == "MCQ":
+            return self.grade_mcq(questions, answers)
+        if test_type == "FRQ":
+            return self.grade_frq({q["index"]: q["text"] for q in questions}, answers)
+        raise ValueError(f"unknown test type: {test_type!r}")
@@ -1,25 +1,88 @@
-import json
-import re
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from ai_utils import AIChatbot
 from test_stats import TestStats
+from db_utils import configured_db_path
+from worker_utils import BusyIndicator, DEFAULT_AI_TIMEOUT, get_ai_worker
+from question_parser import IncrementalQuestionParser
+from question_bank import QuestionBank, TEST_SIZES
+from grading_utils import build_test_prompt
+from test_engine import TestEngine
+from list_utils import PagedView
 from datetime import datetime
 
+# questions (and graded answers) shown per page; only the visible page has widgets
+PAGE_SIZE = 10
+
+
+class AnswerSheet:
+    """
+    The student's answers, kept apart from the widgets that edit them.
+    bind() hands out a StringVar for an on-screen widget; sync() copies the live vars back and
+    drops them, so a page's widgets can be destroyed without losing anything. collect() only
+    reads them.
+    Keys are question indexes for MCQs and "FRQ_<index>" for FRQs, as stored in results.
+    """
+    def __init__(self):
+        self.values = {}
+        self._live = {}
+
+    def clear(self):
+        self.values.clear()
+        self._live.clear()
+
+    def add(self, key):
+        self.values.setdefault(key, "")
+
+    def bind(self, key, master):
+        var = self._live[key] = tk.StringVar(master=master, value=self.values.get(key, ""))
+        return var
+
+    def sync(self):
+        # the page is being torn down: keep the values, release its vars
+        self._snapshot()
+        self._live.clear()
+
+    def _snapshot(self):
+        for key, var in self._live.items():
+            self.values[key] = var.get()
+
+    def collect(self):
+        # the vars stay bound so the page keeps showing the answers after submit
+        self._snapshot()
+        # MCQ choices are stripped, FRQ text is kept as typed
+        return {k: v.strip() if isinstance(k, int) else v for k, v in self.values.items()}
+
+
 class TestGenerator:
-    def __init__(self, manager):
+    def __init__(self, manager, stats=None):
         self.manager = manager
         self.ai = AIChatbot()
-        self.responses = {}
+        self.engine = TestEngine(self.ai)
+        self.worker = get_ai_worker()
+        self.responses = AnswerSheet()
         self.remaining_seconds = 0
-        self.generated_questions = []   # raw lines from AI
+        self.generated_questions = {}   # question index -> question text
         self.parsed_mcqs = []           # list of dicts with parsed MCQ info
         self.test_submitted = False
-        self._stats = TestStats()
+        self._stats = stats or TestStats(db_path=configured_db_path())
         self.current_card_name = None
         self.current_length = None
         self.current_test_type = None
+        # pre-generated questions per deck; dropped whenever the deck's terms change
+        self.bank = QuestionBank(self._generate_questions)
+        self.manager.add_listener(self.bank.invalidate_deck)
+
+    # ----------- Question Bank ----------- #
+    def _generate_questions(self, terms, test_type):
+        # runs on the bank's refill thread
+        return self.engine.generate(terms, test_type)
+
+    def warm_bank(self, selected_card):
+        terms = selected_card.get("terms", [])
+        for test_type in ("MCQ", "FRQ"):
+            self.bank.schedule_refill(selected_card["name"], terms, test_type)
 
     # ----------- Test Config Popup ----------- #
     def open_test_config(self, parent, selected_card):
@@ -57,150 +120,153 @@ class TestGenerator:
         self.test_submitted = False
 
         # --- Timer label ---
+        # the countdown starts once the questions are on screen, not while they are generated
         self.timer_label = ttk.Label(test_popup, text="", bootstyle="inverse-primary", font=("Helvetica", 12, "bold"))
         self.timer_label.pack(pady=5)
-        self._update_timer(test_popup)
+        self._show_time()
 
-        # --- Get AI-generated questions ---
-        terms = selected_card.get("terms", [])
-        prompt = (
-            f"Generate {test_type} style AP-level test questions using ONLY these terms: {terms}. "
-            f"For MCQ: Each question starts with a number and a period (ex: 1.) followed by the question text. "
-            f"Each option starts with a capital letter (A-D) followed by a period and a space followed by the option text. "
-            f"For FRQ: provide an open-ended question. Return one question per line. "
-            f"Do not mix formats—only {test_type} questions."
-        )
-
-        raw = self.ai.generate_test(prompt)
-        questions = [q.strip() for q in raw.split("\n") if q.strip()]
-        self.generated_questions = questions
+        self.generated_questions = {}
         self.parsed_mcqs = []   # reset parsed storage
-        if not questions:
-            ttk.Label(test_popup, text="No questions generated.", bootstyle="danger").pack(pady=20)
-            return
-
-        # --- Scrollable frame ---
-        canvas = tk.Canvas(test_popup)
-        scrollbar = ttk.Scrollbar(test_popup, orient="vertical", command=canvas.yview)
-        scroll_frame = ttk.Frame(canvas)
-        scroll_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas.create_window((0, 0), window=scroll_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        wrap_width = test_popup.winfo_screenwidth() - 300
-
         self.responses.clear()
+        self._pages = None
 
-        def group_mcq_blocks(lines):
-            blocks = []
-            current = []
-            for line in lines:
-                if re.match(r"^\d+\.", line):
-                    if current:
-                        blocks.append(current)
-                    current = [line]
-                else:
-                    if current:
-                        current.append(line)
-            if current:
-                blocks.append(current)
-            return blocks
+        # --- Use pre-generated questions when the bank has enough ---
+        terms = selected_card.get("terms", [])
+        card_name = self.current_card_name
+        banked = None
+        if card_name:
+            banked = self.bank.draw(card_name, terms, test_type, TEST_SIZES.get(length, TEST_SIZES["15 min"]))
+            self.bank.schedule_refill(card_name, terms, test_type)
+        if banked:
+            self._setup_question_area(test_popup)
+            for question in banked:
+                self._render_question(question, test_type)
+            self._finish_test_body(test_popup)
+            self._update_timer(test_popup)
+            test_popup.protocol("WM_DELETE_WINDOW", lambda: self._close_test_window(test_popup))
+            return
 
+        # --- Get AI-generated questions ---
+        prompt = build_test_prompt(terms, test_type)
+        busy = BusyIndicator(test_popup, text="Generating questions...")
+
+        # questions are rendered one by one as the completion streams in
+        def on_question(question):
+            if self._pages is None:
+                self._setup_question_area(test_popup)
+                busy.set_text("Generating more questions...")
+                self._update_timer(test_popup)
+            self._render_question(question, test_type)
+
+        def on_done(_):
+            busy.destroy()
+            self._finish_test_body(test_popup)
+
+        def on_error(e):
+            busy.destroy()
+            ttk.Label(test_popup, text=f"Could not generate questions: {e}", bootstyle="danger").pack(pady=20)
+            if self._pages is not None:
+                self._finish_test_body(test_popup)
+
+        task = self.worker.submit_stream(test_popup, self._stream_questions, prompt, test_type,
+                                         on_item=on_question, on_success=on_done, on_error=on_error,
+                                         timeout=DEFAULT_AI_TIMEOUT)
+
+        test_popup.protocol("WM_DELETE_WINDOW", lambda: self._close_test_window(test_popup, task))
+
+    def _close_test_window(self, test_popup, task=None):
+        if task:
+            task.cancel()
+        self.test_submitted = True   # stops the timer
+        test_popup.destroy()
+
+    def _stream_questions(self, prompt, test_type, emit):
+        # runs on the worker pool: parse the stream and hand over each finished question
+        parser = IncrementalQuestionParser(test_type)
+        for chunk in self.ai.stream_test(prompt):
+            for question in parser.feed(chunk):
+                emit(question.to_dict())
+        for question in parser.close():
+            emit(question.to_dict())
+
+    def _setup_question_area(self, test_popup):
+        # --- Paged question list: widgets exist only for the page on screen ---
+        self._wrap_width = test_popup.winfo_screenwidth() - 300
+        self._pages = PagedView(test_popup, self._draw_question, page_size=PAGE_SIZE, on_clear=self.responses.sync)
+        self._pages.pack(fill="both", expand=True)
+
+    def _render_question(self, question, test_type):
+        idx = question["index"]
         if test_type == "MCQ":
-            # Parse and display MCQ blocks; store structured info for grading
-            mcq_blocks = group_mcq_blocks(questions)
-            for idx, block in enumerate(mcq_blocks, start=1):
-                if not block:
-                    continue
-                question_display = block[0].strip()
-                ttk.Label(scroll_frame, text=question_display, bootstyle="primary", wraplength=wrap_width).pack(anchor="w", pady=5)
-
-                # parse options lines into (letter, option_text)
-                options = []
-                for line in block[1:]:
-                    m = re.match(r"^\s*([A-D])\.\s*(.*)", line)
-                    if m:
-                        letter = m.group(1)
-                        text = m.group(2).strip()
-                        options.append((letter, text))
-
-                # create radiobuttons; responses mapped by integer index
-                var = tk.StringVar()
-                for letter, text in options:
-                    ttk.Radiobutton(
-                        scroll_frame,
-                        text=f"{letter}. {text}",
-                        variable=var,
-                        value=letter,
-                        bootstyle="primary"
-                    ).pack(anchor="w", padx=20, pady=1, fill="x")
-
-                self.responses[idx] = var
-
-                # store parsed MCQ for grading
-                full_block_text = "\n".join(block)
-                opts_dict = {letter: text for (letter, text) in options}
-                self.parsed_mcqs.append({
-                    "index": idx,
-                    "display": question_display,
-                    "options": opts_dict,
-                    "full_text": full_block_text
-                })
-
+            # responses mapped by integer index; structured info kept for grading
+            self.responses.add(idx)
+            self.generated_questions[idx] = question["display"]
+            self.parsed_mcqs.append(question)
         elif test_type == "FRQ":
-            for i, q in enumerate(questions, start=1):
-                ttk.Label(scroll_frame, text=q, bootstyle="primary", wraplength=wrap_width).pack(anchor="w", pady=5)
-                entry = ttk.Entry(scroll_frame, width=80)
-                entry.pack(anchor="w", pady=5, fill="x")
-                self.responses[f"FRQ_{i}"] = entry
+            self.responses.add(f"FRQ_{idx}")
+            self.generated_questions[idx] = question["text"]
+        else:
+            return
+        self._pages.add(question)
+
+    def _draw_question(self, parent, question):
+        # called by the PagedView each time the question's page is shown
+        wrap_width = self._wrap_width
+        idx = question["index"]
+
+        if self.current_test_type == "MCQ":
+            ttk.Label(parent, text=question["display"], bootstyle="primary", wraplength=wrap_width).pack(anchor="w", pady=5)
+            var = self.responses.bind(idx, parent)
+            for letter, text in question["options"].items():
+                ttk.Radiobutton(
+                    parent,
+                    text=f"{letter}. {text}",
+                    variable=var,
+                    value=letter,
+                    bootstyle="primary"
+                ).pack(anchor="w", padx=20, pady=1, fill="x")
+        else:
+            ttk.Label(parent, text=question["text"], bootstyle="primary", wraplength=wrap_width).pack(anchor="w", pady=5)
+            var = self.responses.bind(f"FRQ_{idx}", parent)
+            ttk.Entry(parent, textvariable=var, width=80).pack(anchor="w", pady=5, fill="x")
+
+    def _finish_test_body(self, test_popup):
+        if self._pages is None:
+            ttk.Label(test_popup, text="No questions generated.", bootstyle="danger").pack(pady=20)
+            return
 
         ttk.Button(
-            scroll_frame,
+            self._pages.nav,
             text="Submit Test",
             bootstyle=SUCCESS,
             command=lambda: self._submit_test(test_popup)
-        ).pack(pady=15)
+        ).pack(side="right", padx=15)
 
     # ----------- Timer Update ----------- #
-    def _update_timer(self, window):
-        if self.test_submitted:
-            return
+    def _show_time(self):
         minutes = self.remaining_seconds // 60
         seconds = self.remaining_seconds % 60
         self.timer_label.config(text=f"Time Remaining: {minutes:02d}:{seconds:02d}")
+
+    def _update_timer(self, window):
+        if self.test_submitted:
+            return
+        self._show_time()
         if self.remaining_seconds > 0:
             self.remaining_seconds -= 1
             window.after(1000, lambda: self._update_timer(window))
         else:
             self._submit_test(window)
 
-    # ----------- Utility: extract JSON array substring ----------- #
-    def _extract_json_array(self, text):
-        start = text.find("[")
-        end = text.rfind("]")
-        if start != -1 and end != -1 and end > start:
-            return text[start:end+1]
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return text[start:end+1]
-        return None
-
     # ----------- Submit Handler (MCQ + FRQ) ----------- #
     def _submit_test(self, window):
+        # guards against a double click or the timer firing while grading is still running
+        if self.test_submitted:
+            return
+        self.test_submitted = True
+
         # ---------------- Collect Answers ---------------- #
-        answers = {}
-        for key, widget in self.responses.items():
-            try:
-                if isinstance(widget, tk.StringVar):
-                    answers[key] = widget.get().strip()
-                else:
-                    answers[key] = widget.get()
-            except Exception:
-                answers[key] = repr(widget)
-
-        print("DEBUG: Collected Answers:", answers)
+        answers = self.responses.collect()
 
         # ---------------- Build result dict ---------------- #
         result = {
@@ -214,144 +280,106 @@ class TestGenerator:
             "max_score": None,
         }
 
-        # ---------------- MCQ Grading ---------------- #
+        # grading runs on the worker pool; widgets are only built in the callbacks
+        frq_keys = [k for k in answers.keys() if str(k).startswith("FRQ_")]
         if self.current_test_type == "MCQ" and self.parsed_mcqs:
-            grading_prompt = (
-                "You are an expert AP-style multiple-choice grader. "
-                "For each question below (stem and options), determine the single best correct choice letter (A-D) "
-                "and provide a 1-2 sentence explanation. "
-                "Return JSON array of objects with fields: "
-                '{"q": <index>, "correct": "<A-D>", "explanation": "..."}.\n\n'
+            grade = lambda a: self.engine.grade_mcq(self.parsed_mcqs, a)
+            show = self._show_mcq_results
+            # questions generated with an answer key are graded locally; the model is only
+            # asked about questions that came without one
+            if not self.engine.needs_model("MCQ", self.parsed_mcqs):
+                show(window, result, grade(answers))
+                self._save_result(window, answers, result)
+                return
+        elif self.current_test_type == "FRQ" and frq_keys:
+            grade = lambda a: self.engine.grade_frq(self.generated_questions, a)
+            show = self._show_frq_results
+        else:
+            self._save_result(window, answers, result)
+            return
+
+        busy = BusyIndicator(window, text="Grading...")
+
+        def on_graded(report):
+            busy.destroy()
+            show(window, result, report)
+            self._save_result(window, answers, result)
+
+        def on_error(e):
+            busy.destroy()
+            ttk.Label(window, text=f"Could not grade test: {e}", bootstyle="danger").pack(pady=10)
+            self._save_result(window, answers, result)
+
+        self.worker.submit(window, grade, answers, on_success=on_graded, on_error=on_error,
+                           timeout=DEFAULT_AI_TIMEOUT)
+
+    # ---------------- MCQ Results ---------------- #
+    def _show_mcq_results(self, window, result, report):
+        result["score"] = report["score"]
+        result["max_score"] = report["max_score"]
+
+        result_popup = ttk.Toplevel(window)
+        result_popup.title("MCQ Results")
+        result_popup.state("zoomed")
+        rows = []   # (text, bootstyle) per question, drawn a page at a time
+
+        for item in report["items"]:
+            idx = item["index"]
+            if "correct" not in item:
+                rows.append((f"Q{idx}: No grading info from AI.", "warning"))
+                continue
+            color = "success" if item["is_correct"] else "danger"
+            icon = "✔" if item["is_correct"] else "✖"
+            display_text = (
+                f"Q{idx} {icon}\n"
+                f"  Question: {item['question']}\n"
+                f"  Your answer: {item['answer'] if item['answer'] else '(no answer)'}\n"
+                f"  Correct: {item['correct']}. {item['correct_text']}\n"
+                f"  Explanation: {item['explanation']}"
             )
-            for q in self.parsed_mcqs:
-                grading_prompt += q["full_text"] + "\n\n"
-
-            ai_response = self.ai.generate_test(grading_prompt)
-            json_text = self._extract_json_array(ai_response)
-            grading_map = {}
-            if json_text:
-                try:
-                    parsed = json.loads(json_text)
-                    for obj in parsed:
-                        idx = int(obj.get("q"))
-                        correct_letter = str(obj.get("correct", "")).upper()
-                        explanation = obj.get("explanation", "").strip()
-                        grading_map[idx] = {"correct": correct_letter, "explanation": explanation}
-                except Exception:
-                    pass
-
-            total_correct = 0
-            for item in self.parsed_mcqs:
-                idx = item["index"]
-                gm = grading_map.get(idx)
-                if gm:
-                    item["answer"] = gm["correct"]
-                student_choice = answers.get(idx, "")
-                if gm and student_choice == gm["correct"]:
-                    total_correct += 1
-
-            result["score"] = total_correct
-            result["max_score"] = len(self.parsed_mcqs)
-
-            # ---------------- Show MCQ Results ---------------- #
-            result_popup = ttk.Toplevel(window)
-            result_popup.title("MCQ Results")
-            result_popup.state("zoomed")
-            canvas = tk.Canvas(result_popup)
-            scrollbar = ttk.Scrollbar(result_popup, orient="vertical", command=canvas.yview)
-            frame = ttk.Frame(canvas, padding=10)
-            frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-            canvas.create_window((0, 0), window=frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
-            canvas.pack(side="left", fill="both", expand=True)
-            scrollbar.pack(side="right", fill="y")
-
-            for item in self.parsed_mcqs:
-                idx = item["index"]
-                student_choice = answers.get(idx, "")
-                gm = grading_map.get(idx)
-                if not gm:
-                    ttk.Label(frame, text=f"Q{idx}: No grading info from AI.", bootstyle="warning", wraplength=760).pack(anchor="w", pady=6)
-                    continue
-                correct_letter = gm["correct"]
-                explanation = gm["explanation"]
-                correct_text = item["options"].get(correct_letter, "(option text unavailable)")
-                is_correct = (student_choice == correct_letter)
-                color = "success" if is_correct else "danger"
-                icon = "✔" if is_correct else "✖"
-                display_text = (
-                    f"Q{idx} {icon}\n"
-                    f"  Question: {item['display']}\n"
-                    f"  Your answer: {student_choice if student_choice else '(no answer)'}\n"
-                    f"  Correct: {correct_letter}. {correct_text}\n"
-                    f"  Explanation: {explanation}"
-                )
-                ttk.Label(frame, text=display_text, bootstyle=color, wraplength=760, justify="left").pack(anchor="w", pady=8)
-
-            ttk.Label(frame, text=f"Total Correct: {total_correct}/{len(self.parsed_mcqs)}",
-                    bootstyle="info", font=("Helvetica", 14, "bold")).pack(anchor="center", pady=10)
-
-        # ---------------- FRQ Grading ---------------- #
-        elif self.current_test_type == "FRQ":
-            frq_keys = [k for k in answers.keys() if str(k).startswith("FRQ_")]
-            if frq_keys:
-                frq_prompt = "You are an AP-style FRQ grader. Grade each response out of 5 points and provide 1-2 sentence feedback. Return JSON array [{\"q\": <index>, \"score\": <points>, \"feedback\": \"...\"}]\n\n"
-                frq_questions = {}
-                for key in frq_keys:
-                    idx = int(key.split("_")[1])
-                    question_text = next((line for line in self.generated_questions if line.startswith(f"{idx}.")), f"Question {idx}")
-                    student_answer = answers.get(key, "")
-                    frq_questions[idx] = question_text
-                    frq_prompt += f"Question {idx}: {question_text}\nStudent answer: {student_answer}\n\n"
-
-                ai_response = self.ai.generate_test(frq_prompt)
-                json_text = self._extract_json_array(ai_response)
-                parsed = []
-                if json_text:
-                    try:
-                        parsed = json.loads(json_text)
-                    except Exception:
-                        parsed = []
-
-                total_score = 0
-                max_score = len(parsed)*5 if parsed else len(frq_keys)*5
-
-                result_popup = ttk.Toplevel(window)
-                result_popup.title("FRQ Results")
-                result_popup.state("zoomed")
-                canvas = tk.Canvas(result_popup)
-                scrollbar = ttk.Scrollbar(result_popup, orient="vertical", command=canvas.yview)
-                frame = ttk.Frame(canvas, padding=10)
-                frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-                canvas.create_window((0, 0), window=frame, anchor="nw")
-                canvas.configure(yscrollcommand=scrollbar.set)
-                canvas.pack(side="left", fill="both", expand=True)
-                scrollbar.pack(side="right", fill="y")
-
-                for item in parsed:
-                    idx = int(item.get("q", 0))
-                    score = int(item.get("score", 0))
-                    feedback = item.get("feedback", "")
-                    total_score += score
-                    student_answer = answers.get(f"FRQ_{idx}", "")
-                    question_text = frq_questions.get(idx, f"Question {idx}")
-                    color = "success" if score >= 3 else "danger"
-                    display_text = (
-                        f"Q{idx}\n"
-                        f"  Question: {question_text}\n"
-                        f"  Your answer: {student_answer}\n"
-                        f"  Score: {score}/5\n"
-                        f"  Feedback: {feedback}"
-                    )
-                    ttk.Label(frame, text=display_text, bootstyle=color, wraplength=760, justify="left").pack(anchor="w", pady=8)
-
-                ttk.Label(frame, text=f"Total Score: {total_score}/{max_score}", bootstyle="info",
-                        font=("Helvetica", 14, "bold")).pack(anchor="center", pady=10)
-
-                result["score"] = total_score
-                result["max_score"] = max_score
-
-        # ---------------- Final Save to TestStats ---------------- #
+            rows.append((display_text, color))
+
+        self._show_result_rows(result_popup, rows, f"Total Correct: {report['score']}/{report['max_score']}")
+
+    # ---------------- FRQ Results ---------------- #
+    def _show_frq_results(self, window, result, report):
+        result_popup = ttk.Toplevel(window)
+        result_popup.title("FRQ Results")
+        result_popup.state("zoomed")
+        rows = []   # (text, bootstyle) per question, drawn a page at a time
+
+        for item in report["items"]:
+            color = "success" if item["score"] >= 3 else "danger"
+            display_text = (
+                f"Q{item['index']}\n"
+                f"  Question: {item['question']}\n"
+                f"  Your answer: {item['answer']}\n"
+                f"  Score: {item['score']}/5\n"
+                f"  Feedback: {item['feedback']}"
+            )
+            rows.append((display_text, color))
+
+        self._show_result_rows(result_popup, rows, f"Total Score: {report['score']}/{report['max_score']}")
+
+        result["score"] = report["score"]
+        result["max_score"] = report["max_score"]
+        result["frq_grades"] = report["frq_grades"]
+
+    def _show_result_rows(self, result_popup, rows, total_text):
+        # total first so it is visible without paging to the end
+        ttk.Label(result_popup, text=total_text, bootstyle="info",
+                  font=("Helvetica", 14, "bold")).pack(anchor="center", pady=10)
+        pages = PagedView(result_popup, self._draw_result_row, page_size=PAGE_SIZE)
+        pages.pack(fill="both", expand=True)
+        pages.set_items(rows)
+
+    @staticmethod
+    def _draw_result_row(parent, row):
+        text, color = row
+        ttk.Label(parent, text=text, bootstyle=color, wraplength=760, justify="left").pack(anchor="w", pady=8)
+
+    # ---------------- Final Save to TestStats ---------------- #
+    def _save_result(self, window, answers, result):
         try:
             self._stats.add_result(
                 test_type=self.current_test_type,
@@ -360,11 +388,13 @@ class TestGenerator:
                 responses=answers,
                 parsed_mcqs=getattr(self, "parsed_mcqs", None),
                 score=result["score"],
-                max_score=result["max_score"]
+                max_score=result["max_score"],
+                terms=list((self.manager.get_flashcard(self.current_card_name) or {}).get("terms", [])),
+                frq_grades=result.get("frq_grades"),
             )
             ttk.Label(window,
                     text="Test submitted successfully!" if self.remaining_seconds > 0 else "Time's up! Test submitted!",
                     bootstyle="success").pack(pady=10)
-            print("Saved test result to test_results.json")
+            print(f"Saved test result to {self._stats.file_path.name}")
         except Exception as e:
-            print(f"Error saving test result: {e}")
\ No newline at end of file
+            print(f"Error saving test result: {e}")
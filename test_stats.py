@@ -1,40 +1,237 @@
 import json
+import os
+import re
 from pathlib import Path
 from datetime import datetime
-from collections import Counter
-import tkinter as tk
-import ttkbootstrap as ttk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from mastery_utils import TermMastery, question_outcomes
+from question_store import QuestionStore, ResultRecord
+from archive_utils import HistoryArchive, merge_summaries, segment_key, summarize
+# Tk and matplotlib are imported inside the plot methods: matplotlib is slow to load and only
+# needed once "View Test Stats" is clicked, and batch.py records results without a display
 
-RESULTS_PATH = Path(__file__).parent / "test_results.json"
+RESULTS_PATH = Path(__file__).parent / "test_results.jsonl"
+LEGACY_RESULTS_PATH = Path(__file__).parent / "test_results.json"
+# pulls the timestamp out of a raw log line so date filters can skip it unparsed
+_TIMESTAMP = re.compile(r'"timestamp":\s*"([^"]*)"')
 
 
 class TestStats:
-    def __init__(self, file_path: Path | str = RESULTS_PATH):
+    """
+    Test history stored as an append-only JSON-Lines log (one record per line).
+    An old-style JSON array file (legacy_path; test_results.json for the app's own log) is migrated
+    to the log once, on first use.
+    With db_path set, results go to an indexed SQLite table instead (see db_utils).
+    Generated questions are kept once each in a QuestionStore; records only hold their refs.
+    Attempts from past months are sealed into compressed segments (see archive_utils), so the
+    hot log only holds the current month.
+    """
+    def __init__(self, file_path: Path | str = RESULTS_PATH, legacy_path: Path | str | None = None,
+                 db_path: Path | str | None = None):
         self.file_path = Path(file_path)
-        if not self.file_path.exists():
-            self._save_data([])
+        if legacy_path is None and self.file_path == RESULTS_PATH:
+            # only the app's own log takes over the app's old array file
+            legacy_path = LEGACY_RESULTS_PATH
+        self._columns = None   # ResultColumns, built on the first plot
+        self._mastery = None   # TermMastery, loaded on first use
+        self._window = None    # StatsWindow, kept once opened
+        self.db_path = db_path
+        self.db = None
+        question_table = None
+        if db_path:
+            from db_utils import QuestionTable, ResultStore
+            self.db = ResultStore(db_path)
+            question_table = QuestionTable(db_path)
+        self.questions = QuestionStore(self.file_path.with_name(self.file_path.stem + ".questions.jsonl"),
+                                       table=question_table)
+        self.archive = HistoryArchive(self.file_path.with_name(self.file_path.stem + ".archive"))
+        self._hot_key = None   # segment key of the oldest record in the hot log
+        if self.db is None:
+            if not self.file_path.exists():
+                self._save_data(self._load_legacy(legacy_path))
+            elif self._is_legacy_array(self.file_path):
+                # caller pointed us at an old array file: convert it in place
+                self._save_data(self._load_legacy(self.file_path))
+            elif self._has_embedded_questions():
+                # log written before the question store existed: move its questions out, once
+                self._save_data(self._load_hot())
+            self._hot_key = self._first_hot_key()
+            if self._hot_key and self._hot_key < segment_key(datetime.utcnow().isoformat()):
+                self.seal_segments()
 
     # ---------- JSON helpers ----------
+    @staticmethod
+    def _is_legacy_array(path):
+        with open(path, "r", encoding="utf-8") as f:
+            head = f.read(64).lstrip()
+        return head.startswith("[")
+
+    @staticmethod
+    def _load_legacy(path):
+        if path is None or not Path(path).exists():
+            return []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            return []
+        return data if isinstance(data, list) else []
+
+    def _has_embedded_questions(self):
+        # stored records hold question_refs; a non-empty parsed_mcqs list means an older log.
+        # The old format predates refs, so the first record with questions settles it
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if '"question_refs"' in line:
+                    return False
+                if '"parsed_mcqs": [{' in line:
+                    return True
+        return False
+
+    def _first_hot_key(self):
+        # the log is in append order, so its first record is the oldest one
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            return segment_key(json.loads(line).get("timestamp")) or None
+                        except json.JSONDecodeError:
+                            continue
+        except FileNotFoundError:
+            pass
+        return None
+
     def _load_data(self):
+        if self.db is not None:
+            return self._wrap(self.db.all())
+        data = []
+        for segment in self.archive.segments:
+            data.extend(self._load_segment(segment))
+        return data + self._load_hot()
+
+    def _load_segment(self, segment):
+        return self._wrap(self.archive.read(segment))
+
+    def _load_hot(self):
+        data = []
         try:
             with open(self.file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # torn write from a crash mid-append; skip it
+                        continue
+                    if "question_refs" in record:
+                        record = ResultRecord(record, self.questions)
+                    data.append(record)
+        except FileNotFoundError:
             return []
+        return data
+
+    def _wrap(self, records):
+        return [ResultRecord(r, self.questions) if "question_refs" in r else r for r in records]
+
+    def _store_record(self, record):
+        # the on-disk form: parsed_mcqs replaced by [id, index] refs into the question store
+        if isinstance(record, ResultRecord) and record._questions is self.questions \
+                and not dict.__contains__(record, "parsed_mcqs"):
+            return dict(record)   # already stored here and never rehydrated
+        # a record from another store: get() rehydrates its questions so they are put into this one
+        parsed_mcqs = record.get("parsed_mcqs")
+        out = {k: v for k, v in record.items() if k not in ("parsed_mcqs", "question_refs")}
+        if parsed_mcqs:
+            out["question_refs"] = self.questions.put_many(parsed_mcqs)
+        else:
+            out["parsed_mcqs"] = parsed_mcqs
+        return out
 
     def _save_data(self, data):
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # full rewrite, only used for migration: write to a temp file then swap it in
+        tmp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in data:
+                f.write(json.dumps(self._store_record(record), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+
+    # ---------- Segments ----------
+    def seal_segments(self, now=None):
+        """
+        Move every hot-log record from before the current month into sealed monthly segments.
+        Returns how many records were archived.
+        """
+        if self.db is not None:
+            return 0
+        current = segment_key((now or datetime.utcnow()).isoformat())
+        old, keep = {}, []
+        for record in self._load_hot():
+            key = segment_key(record.get("timestamp"))
+            if key and key < current:
+                old.setdefault(key, []).append(record)
+            else:
+                keep.append(record)
+        if not old:
+            return 0
+        archived = 0
+        for key in sorted(old):
+            # a crash after sealing but before the hot log was rewritten leaves these records
+            # in both places; don't seal them twice
+            sealed = {r.get("timestamp") for seg in self.archive.segments if seg["key"] == key
+                      for r in self.archive.read(seg)}
+            records = [self._store_record(r) for r in old[key] if r.get("timestamp") not in sealed]
+            if records:
+                self.archive.seal(key, records)
+                archived += len(records)
+        self._save_data(keep)
+        self._hot_key = segment_key(keep[0].get("timestamp")) if keep else None
+        return archived
+
+    def summary(self, card_name=None):
+        """
+        Count, date range and per-card score aggregates for the whole history, from the segment
+        index plus the hot log (no sealed segment is opened).
+        """
+        if self.db is not None:
+            records = self.get_history(card_name) if card_name is not None else self._load_data()
+            merged = summarize(records)
+        else:
+            merged = merge_summaries([*(s for s in self.archive.segments), summarize(self._load_hot())])
+        for c in merged["cards"].values():
+            c["avg_percent"] = round(c["percent_sum"] / c["count"], 2) if c["count"] else None
+        if card_name is not None:
+            return merged["cards"].get(card_name)
+        return merged
+
+    def _append_record(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.file_path, "ab+") as f:
+            start = f.seek(0, os.SEEK_END)
+            # make sure a torn last line doesn't swallow this record
+            if start > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            end = f.tell()
+        return start, end
 
     # ---------- Save result ----------
-    def add_result(self, *, test_type, card_name=None, length=None, responses=None, parsed_mcqs=None, score=None, max_score=None):
+    def add_result(self, *, test_type, card_name=None, length=None, responses=None, parsed_mcqs=None, score=None, max_score=None,
+                   terms=None, frq_grades=None):
         """
         Save a test attempt. responses should be a dict mapping question_display -> answer (e.g. "A" or text).
         parsed_mcqs is optional metadata produced when test was generated.
+        terms (the deck's terms) and frq_grades ([{"question", "score", "max"}]) let the attempt
+        update the per-term mastery stats.
         """
-        data = self._load_data()
         ts = datetime.utcnow().isoformat()
         percent = self._compute_percent(test_type, responses, parsed_mcqs, score, max_score)
         record = {
@@ -48,8 +245,26 @@ class TestStats:
             "max_score": max_score,
             "percent": percent,
         }
-        data.append(record)
-        self._save_data(data)
+        if frq_grades:
+            record["frq_grades"] = frq_grades
+        stored = self._store_record(record)
+        if self.db is None:
+            key = segment_key(ts)
+            if self._hot_key is not None and self._hot_key < key:
+                # first attempt of a new month: seal last month's records first
+                self.seal_segments()
+            if self._hot_key is None:
+                self._hot_key = key
+        if self.db is not None:
+            row_id = self.db.add(stored)
+            start, end = row_id - 1, row_id
+        else:
+            start, end = self._append_record(stored)
+        if self._columns is not None:
+            self._columns.append(record, start, end)
+        if terms:
+            outcomes = question_outcomes(test_type, responses, parsed_mcqs, frq_grades)
+            self.mastery.record(record["card_name"], terms, outcomes, ts)
         return record
 
     def _compute_percent(self, test_type, responses, parsed_mcqs, score, max_score):
@@ -89,7 +304,9 @@ class TestStats:
         return 0.0
 
     # ---------- Plots ----------
-    def _embed_figure(self, parent, fig: Figure, title="Plot"):
+    def _embed_figure(self, parent, fig, title="Plot"):
+        import ttkbootstrap as ttk
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
         win = ttk.Toplevel(parent)
         win.title(title)
         canvas = FigureCanvasTkAgg(fig, master=win)
@@ -98,33 +315,50 @@ class TestStats:
         widget.pack(fill="both", expand=True)
         return win
 
-    def plot_score_over_time(self, parent=None, card_name=None, recent_n=None):
-        data = self._load_data()
-        if card_name:
-            data = [d for d in data if d.get("card_name") == card_name]
-        if not data:
+    def _get_columns(self):
+        # numpy is only needed for plotting, so the column cache is imported on first use
+        if self._columns is None:
+            from stats_columns import ResultColumns
+            self._columns = ResultColumns(self.file_path, store=self.db, archive=self.archive)
+        self._columns.refresh()
+        return self._columns
+
+    def show_stats_window(self, parent=None):
+        """Open (or bring back) the persistent score-over-time window, refreshed to the latest results."""
+        import tkinter as tk
+        from stats_window import StatsWindow
+        if self._window is None or not self._window.winfo_exists():
+            self._window = StatsWindow(self, parent or tk._default_root)
+        else:
+            self._window.deiconify()
+            self._window.lift()
+        self._window.refresh()
+        return self._window
+
+    def plot_score_over_time(self, parent=None, card_name=None, recent_n=None, test_type=None, rolling=5):
+        import tkinter as tk
+        import ttkbootstrap as ttk
+        from stats_columns import lttb, rolling_mean
+        times, percents = self._get_columns().scores(card_name=card_name, test_type=test_type, recent_n=recent_n)
+        if not len(times):
             popup = ttk.Toplevel(parent)
             popup.title("No Data")
             ttk.Label(popup, text="No test results found.", bootstyle="warning").pack(padx=20, pady=20)
             return
 
-        # sort by timestamp
-        def _parse_ts(x):
-            try:
-                return datetime.fromisoformat(x["timestamp"])
-            except Exception:
-                return datetime.utcnow()
-
-        data.sort(key=_parse_ts)
-        if recent_n:
-            data = data[-recent_n:]
-
-        times = [_parse_ts(d) for d in data]
-        percents = [d.get("percent", 0.0) for d in data]
-
+        from matplotlib.figure import Figure
         fig = Figure(figsize=(7, 3.5), dpi=100)
         ax = fig.add_subplot(111)
-        ax.plot(times, percents, marker="o", linestyle="-")
+        # no more points than the figure is pixels wide
+        budget = int(fig.get_figwidth() * fig.dpi)
+        x = times.astype("datetime64[us]").astype("int64")
+        keep = lttb(x, percents, budget)
+        ax.plot(times[keep], percents[keep], marker="o" if len(keep) <= 200 else "", linestyle="-", label="Attempt")
+        if rolling and len(percents) > rolling:
+            average = rolling_mean(percents, rolling)
+            keep = lttb(x, average, budget)
+            ax.plot(times[keep], average[keep], linestyle="--", label=f"{rolling}-attempt average")
+            ax.legend()
         ax.set_title(f"Score / Answered % Over Time ({card_name or 'All'})")
         ax.set_xlabel("Date")
         ax.set_ylabel("Percent (%)")
@@ -138,47 +372,21 @@ class TestStats:
         For MCQ tests, plot how many times each option was selected for the given question index
         across attempts (cumulative over time).
         """
-        data = self._load_data()
-        if card_name:
-            data = [d for d in data if d.get("card_name") == card_name]
-
-        # collect selections per timestamp
-        times = []
-        selections = []
-        for d in data:
-            if d.get("test_type") != "MCQ":
-                continue
-            resp = d.get("responses", {})
-            keys = list(resp.keys())
-            if len(keys) <= question_index:
-                continue
-            key = keys[question_index]
-            val = resp.get(key)
-            if val is None:
-                continue
-            times.append(datetime.fromisoformat(d["timestamp"]) if "timestamp" in d else datetime.utcnow())
-            selections.append(val)
-
-        if not selections:
+        import tkinter as tk
+        import ttkbootstrap as ttk
+        timestamps, opts, cumulative = self._get_columns().selection_counts(question_index, card_name=card_name)
+
+        if not opts:
             popup = ttk.Toplevel(parent)
             popup.title("No Data")
             ttk.Label(popup, text="No MCQ selection data found for that question index.", bootstyle="warning").pack(padx=20, pady=20)
             return
 
-        opts = sorted(set(selections))
-        cumulative = {o: [] for o in opts}
-        counts = Counter()
-        timestamps = []
-        for t, sel in zip(times, selections):
-            counts[sel] += 1
-            timestamps.append(t)
-            for o in opts:
-                cumulative[o].append(counts[o])
-
+        from matplotlib.figure import Figure
         fig = Figure(figsize=(7, 3.5), dpi=100)
         ax = fig.add_subplot(111)
-        for o in opts:
-            ax.plot(timestamps, cumulative[o], marker="o", label=str(o))
+        for j, o in enumerate(opts):
+            ax.plot(timestamps, cumulative[:, j], marker="o", label=str(o))
         ax.set_title(f"Selections over time for question #{question_index+1} ({card_name or 'All'})")
         ax.set_xlabel("Date")
         ax.set_ylabel("Cumulative selections")
@@ -187,6 +395,126 @@ class TestStats:
 
         self._embed_figure(parent or tk._default_root, fig, title="Question Selection Trend")
 
-    # ---------- Utility: return raw results ----------
+    # ---------- Term mastery ----------
+    @property
+    def mastery(self):
+        if self._mastery is None:
+            store = None
+            if self.db_path:
+                from db_utils import MasteryStore
+                store = MasteryStore(self.db_path)
+            self._mastery = TermMastery(self.file_path.with_name(self.file_path.stem + ".mastery.json"), store=store)
+        return self._mastery
+
+    def get_term_mastery(self, card_name, term):
+        """{attempts, correct, last_seen, accuracy} for one term, or None if it was never tested."""
+        return self.mastery.get(card_name, term)
+
+    def get_deck_mastery(self, card_name):
+        return self.mastery.deck(card_name)
+
+    def get_weakest_terms(self, card_name=None, n=10, min_attempts=1):
+        return self.mastery.weakest(card_name, n, min_attempts)
+
+    # ---------- Queries ----------
     def get_all_results(self):
-        return self._load_data()
\ No newline at end of file
+        return self._load_data()
+
+    def import_records(self, records):
+        """Bulk-insert finished records (e.g. from another TestStats), keeping their timestamps."""
+        stored = [self._store_record(r) for r in records]
+        if self.db is not None:
+            self.db.add_many(stored)
+        else:
+            for record in stored:
+                self._append_record(record)
+
+    def get_history(self, card_name, test_type=None):
+        """All attempts for one deck, oldest first."""
+        return sorted(self.iter_results(card_name=card_name, test_type=test_type),
+                      key=lambda d: d.get("timestamp") or "")
+
+    def get_between(self, start=None, end=None, card_name=None):
+        """Attempts with start <= timestamp < end; datetimes or ISO strings, either bound optional."""
+        return sorted(self.iter_results(card_name=card_name, start=start, end=end),
+                      key=lambda d: d.get("timestamp") or "")
+
+    def get_recent(self, n, card_name=None):
+        """The n most recent attempts, newest first."""
+        if self.db is not None:
+            return self._wrap(self.db.recent(n, card_name))
+        def newest_first(records):
+            return sorted(records, key=lambda d: d.get("timestamp") or "", reverse=True)
+
+        rows = newest_first(self._scan([self._iter_hot_lines()], card_name=card_name))
+        # walk sealed segments from the newest back, only as far as needed
+        for segment in reversed(self.archive.select(card_name=card_name)):
+            if len(rows) >= n and (segment["end"] or "") < (rows[n - 1].get("timestamp") or ""):
+                break
+            rows = newest_first(rows + list(self._scan([self.archive.iter_lines(segment)], card_name=card_name)))
+        return rows[:n]
+
+    # ---------- Streaming reader ----------
+    def iter_results(self, card_name=None, test_type=None, start=None, end=None, fields=None):
+        """
+        Yield the attempts matching every given filter one at a time, without loading the history.
+        start <= timestamp < end (datetimes or ISO strings). fields limits each yielded dict to
+        those keys, e.g. ("timestamp", "percent"); parsed_mcqs are only rebuilt if asked for.
+        Sealed segments the index rules out are never opened, and lines are skipped before
+        parsing when they can't match.
+        """
+        start = start.isoformat() if isinstance(start, datetime) else start
+        end = end.isoformat() if isinstance(end, datetime) else end
+        if self.db is not None:
+            for record in self.db.iter(card_name, test_type, start, end, fields):
+                yield self._project(record, fields)
+            return
+        sources = [self.archive.iter_lines(s) for s in self.archive.select(card_name, start, end)]
+        sources.append(self._iter_hot_lines())
+        yield from self._scan(sources, card_name, test_type, start, end, fields)
+
+    def _iter_hot_lines(self):
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield line
+        except FileNotFoundError:
+            return
+
+    def _scan(self, sources, card_name=None, test_type=None, start=None, end=None, fields=None):
+        # a line can only match if it contains the encoded filter values; non-ASCII values may be
+        # \u-escaped in older logs, so those are left to the exact check after parsing
+        needles = [json.dumps(v, ensure_ascii=False) for v in (card_name, test_type)
+                   if isinstance(v, str) and v.isascii()]
+        for lines in sources:
+            for line in lines:
+                if any(needle not in line for needle in needles):
+                    continue
+                if start is not None or end is not None:
+                    m = _TIMESTAMP.search(line)
+                    if m and ((start is not None and m.group(1) < start) or (end is not None and m.group(1) >= end)):
+                        continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # torn write from a crash mid-append; skip it
+                    continue
+                ts = record.get("timestamp") or ""
+                if (card_name is not None and record.get("card_name") != card_name) \
+                        or (test_type is not None and record.get("test_type") != test_type) \
+                        or (start is not None and ts < start) or (end is not None and ts >= end):
+                    continue
+                yield self._project(record, fields)
+
+    def _project(self, record, fields):
+        if fields is None:
+            return ResultRecord(record, self.questions) if "question_refs" in record else record
+        out = {}
+        for key in fields:
+            if key == "parsed_mcqs" and "question_refs" in record:
+                out[key] = self.questions.expand(record["question_refs"])
+            elif key in record:
+                out[key] = record[key]
+        return out
\ No newline at end of file
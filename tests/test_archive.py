@@ -0,0 +1,38 @@
+from archive_utils import HistoryArchive, merge_summaries, segment_key, summarize
+
+
+def rec(ts, card="Deck", percent=50.0):
+    return {"timestamp": ts, "card_name": card, "percent": percent}
+
+
+def test_segment_key():
+    assert segment_key("2025-10-28T07:42:44") == "2025-10"
+    assert segment_key(None) == ""
+
+
+def test_summaries_merge_like_one_batch():
+    a = [rec("2025-01-05T00:00:00", percent=40), rec("2025-01-20T00:00:00", "Other", 90)]
+    b = [rec("2025-02-01T00:00:00", percent=80)]
+    merged = merge_summaries([summarize(a), summarize([]), summarize(b)])
+    assert merged == summarize(a + b)
+    assert merged["start"] == "2025-01-05T00:00:00" and merged["count"] == 3
+    assert merged["cards"]["Deck"] == {"count": 2, "percent_sum": 120.0, "best": 80.0, "worst": 40.0,
+                                       "first": "2025-01-05T00:00:00", "last": "2025-02-01T00:00:00"}
+
+
+def test_seal_read_and_select(tmp_path):
+    archive = HistoryArchive(tmp_path / "results.archive")
+    jan = [rec("2025-01-05T00:00:00"), rec("2025-01-20T00:00:00", "Other")]
+    feb = [rec("2025-02-01T00:00:00")]
+    archive.seal("2025-02", feb)
+    archive.seal("2025-01", jan)
+    # a late record for a sealed month goes into a part file
+    archive.seal("2025-01", [rec("2025-01-31T00:00:00")])
+
+    reopened = HistoryArchive(tmp_path / "results.archive")
+    assert [s["file"] for s in reopened.segments] == ["2025-01.jsonl.gz", "2025-01.1.jsonl.gz", "2025-02.jsonl.gz"]
+    assert reopened.read(reopened.segments[0]) == jan
+    assert [s["file"] for s in reopened.select(card_name="Other")] == ["2025-01.jsonl.gz"]
+    assert [s["file"] for s in reopened.select(start="2025-01-25")] == ["2025-01.1.jsonl.gz", "2025-02.jsonl.gz"]
+    assert [s["file"] for s in reopened.select(end="2025-01-10")] == ["2025-01.jsonl.gz"]
+    assert reopened.select(card_name="Missing") == []
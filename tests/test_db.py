@@ -0,0 +1,81 @@
+import json
+
+from db_utils import DeckStore, ResultStore, import_json
+from fc_utils import FlashcardManager
+from test_stats import TestStats as Stats   # aliased so pytest does not try to collect it
+
+
+def result(ts, card="Deck", test_type="MCQ", percent=50.0):
+    return {"timestamp": ts, "card_name": card, "test_type": test_type, "percent": percent,
+            "responses": {}, "parsed_mcqs": None}
+
+
+def test_deck_ops_keep_order_after_replace_all(tmp_path):
+    store = DeckStore(tmp_path / "x.db")
+    store.apply([{"op": "add_flashcard", "name": "B"}, {"op": "add_term", "card": "B", "term": "old"}])
+    store.replace_all([{"name": "A", "terms": ["one", "two"]}, {"name": "C", "terms": []}])
+    store.apply([{"op": "add_flashcard", "name": "D"}, {"op": "add_term", "card": "A", "term": "three"},
+                 {"op": "delete_term", "card": "A", "term": "one"}, {"op": "add_term", "card": "D", "term": "one"},
+                 {"op": "delete_flashcard", "name": "C"}, {"op": "add_flashcard", "name": "A"}])
+    assert store.load() == [{"name": "A", "terms": ["two", "three"]}, {"name": "D", "terms": ["one"]}]
+    assert store.decks_with_term("one") == ["D"]
+
+
+def test_result_queries(tmp_path):
+    store = ResultStore(tmp_path / "x.db")
+    store.add_many([result("2025-01-02T00:00:00", percent=20), result("2025-01-01T00:00:00", "Other", "FRQ", 90)])
+    last = store.add(result("2025-01-03T00:00:00", percent=60))
+    assert store.count() == 3
+    assert [r["percent"] for r in store.all()] == [20, 90, 60]   # insertion order
+    assert [rid for rid, _ in store.since(last - 1)] == [last]
+
+    assert list(store.iter(card_name="Deck", fields=("timestamp", "percent"))) == \
+        [{"timestamp": "2025-01-02T00:00:00", "percent": 20.0}, {"timestamp": "2025-01-03T00:00:00", "percent": 60.0}]
+    # a field that isn't a column comes from the stored record
+    assert [r["responses"] for r in store.iter(test_type="FRQ", fields=("responses",))] == [{}]
+    assert [r["percent"] for r in store.iter(start="2025-01-02", end="2025-01-03")] == [20]
+    assert [r["percent"] for r in store.recent(2)] == [60, 20]
+    assert [r["percent"] for r in store.recent(5, card_name="Other")] == [90]
+
+
+def test_managers_round_trip_through_the_database(tmp_path):
+    db = tmp_path / "x.db"
+    manager = FlashcardManager(str(tmp_path / "flashcards.json"), db_path=db)
+    manager.add_flashcard("Physics")
+    manager.add_term("Physics", "Momentum")
+    manager.add_term("Physics", "Inertia")
+    manager.save()
+    manager.delete_term("Physics", "Momentum")
+    manager.save()
+    assert not (tmp_path / "flashcards.json").exists()
+    reopened = FlashcardManager(str(tmp_path / "flashcards.json"), db_path=db)
+    assert [(d["name"], list(d["terms"])) for d in reopened.flashcards] == [("Physics", ["Inertia"])]
+
+    stats = Stats(tmp_path / "r.jsonl", db_path=db)
+    questions = [{"index": 1, "display": "1. Why?", "options": {"A": "yes"}, "full_text": "1. Why?\nA. yes"}]
+    stats.add_result(test_type="MCQ", card_name="Physics", length="15 min", responses={1: "A"},
+                     parsed_mcqs=questions, score=1, max_score=1)
+    stats.add_result(test_type="FRQ", card_name="Physics", responses={"FRQ_1": "text"}, score=4, max_score=5)
+    assert not (tmp_path / "r.jsonl").exists()
+
+    reopened = Stats(tmp_path / "r.jsonl", db_path=db)
+    mcq, frq = reopened.get_history("Physics")
+    assert mcq["parsed_mcqs"] == questions and frq["percent"] == 80.0
+    assert [r["test_type"] for r in reopened.get_recent(1)] == ["FRQ"]
+    assert list(reopened.iter_results(test_type="MCQ", fields=("card_name",))) == [{"card_name": "Physics"}]
+
+
+def test_import_json(tmp_path):
+    flashcards = tmp_path / "flashcards.json"
+    flashcards.write_text(json.dumps([{"name": "Deck", "terms": ["a", "b"]}]), encoding="utf-8")
+    results = tmp_path / "r.jsonl"
+    with open(results, "w", encoding="utf-8") as f:
+        for r in (result("2025-01-01T00:00:00"), result("2025-01-02T00:00:00", percent=70)):
+            f.write(json.dumps(r) + "\n")
+    db = tmp_path / "x.db"
+
+    assert import_json(db, str(flashcards), results) == (1, 2)
+    # decks are replaced, results only go into an empty table
+    assert import_json(db, str(flashcards), results) == (1, 0)
+    assert DeckStore(db).load() == [{"name": "Deck", "terms": ["a", "b"]}]
+    assert [r["percent"] for r in Stats(results, db_path=db).get_history("Deck")] == [50.0, 70.0]
@@ -0,0 +1,47 @@
+from cache_utils import ExplanationCache
+
+
+def test_puts_append_to_the_journal_and_survive_reopen(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = ExplanationCache(path)
+    cache.put("a", "alpha")
+    cache.put("b", "beta")
+    cache.invalidate("a")
+    assert not path.exists()   # nothing rewritten yet
+    assert len(cache.journal_path.read_text(encoding="utf-8").splitlines()) == 3
+
+    reopened = ExplanationCache(path)
+    assert reopened.get("a") is None
+    assert reopened.get("b") == "beta"
+    # loading folds the journal into the snapshot
+    assert path.exists() and not reopened.journal_path.exists()
+
+
+def test_journal_is_compacted_every_n_ops(tmp_path):
+    cache = ExplanationCache(tmp_path / "cache.json", compact_every=3)
+    for i in range(7):
+        cache.put(str(i), i)
+    assert len(cache.journal_path.read_text(encoding="utf-8").splitlines()) < 3
+    assert [ExplanationCache(tmp_path / "cache.json").get(str(i)) for i in range(7)] == list(range(7))
+
+
+def test_lru_eviction_and_torn_journal_line(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = ExplanationCache(path, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")          # a is now the most recently used
+    cache.put("c", 3)       # evicts b
+    assert "b" not in cache and cache.get("a") == 1
+    with open(cache.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "key": "d"')
+    reopened = ExplanationCache(path, max_entries=2)
+    assert reopened.get("c") == 3 and "d" not in reopened
+
+
+def test_close_writes_the_snapshot(tmp_path):
+    cache = ExplanationCache(tmp_path / "cache.json")
+    cache.put("a", "alpha")
+    cache.close()
+    assert not cache.journal_path.exists()
+    assert ExplanationCache(tmp_path / "cache.json").get("a") == "alpha"
@@ -0,0 +1,76 @@
+from fc_utils import FlashcardManager, TermSet
+
+
+def test_termset_keeps_insertion_order_without_duplicates():
+    terms = TermSet(["ion", "atom", "ion"])
+    assert list(terms) == ["ion", "atom"] and len(terms) == 2
+    assert terms.add("proton") and not terms.add("atom")
+    assert terms.discard("ion") and not terms.discard("ion")
+    assert list(terms) == ["atom", "proton"]
+    assert "atom" in terms and "ion" not in terms
+
+
+def test_termset_equality():
+    assert TermSet(["a", "b"]) == TermSet(["a", "b"])
+    assert TermSet(["a", "b"]) != TermSet(["b", "a"])   # order matters, as it does for lists
+    assert TermSet(["a", "b"]) == ["a", "b"]
+    assert TermSet(["a"]) != ("a",)
+    assert repr(TermSet(["a"])) == "['a']"
+
+
+def journal_lines(manager):
+    with open(manager.journal_path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_save_appends_to_the_journal_and_reopen_replays_it(tmp_path):
+    path = str(tmp_path / "flashcards.json")
+    manager = FlashcardManager(path)
+    manager.add_flashcard("Physics")
+    manager.add_term("Physics", "Momentum")
+    manager.add_term("Physics", "Inertia")
+    manager.delete_term("Physics", "Momentum")
+    manager.save()
+    assert len(journal_lines(manager)) == 4
+    assert not (tmp_path / "flashcards.json").exists()
+
+    reopened = FlashcardManager(path)
+    assert reopened.get_flashcard_names() == ["Physics"]
+    assert list(reopened.get_flashcard("Physics")["terms"]) == ["Inertia"]
+
+
+def test_journal_is_compacted_at_compact_every(tmp_path):
+    path = str(tmp_path / "flashcards.json")
+    manager = FlashcardManager(path, compact_every=5)
+    manager.add_flashcard("Deck")
+    for term in ("a", "b"):
+        manager.add_term("Deck", term)
+    manager.save()
+    assert len(journal_lines(manager)) == 3
+
+    manager.add_term("Deck", "c")
+    manager.add_term("Deck", "d")
+    manager.save()   # 5 ops: written as a snapshot, journal started afresh
+    assert not (tmp_path / "flashcards.json.journal").exists()
+    manager.add_term("Deck", "e")
+    manager.save()
+    assert len(journal_lines(manager)) == 1
+    assert list(FlashcardManager(path).get_flashcard("Deck")["terms"]) == ["a", "b", "c", "d", "e"]
+
+
+def test_torn_journal_line_is_dropped_and_forces_a_snapshot(tmp_path):
+    path = str(tmp_path / "flashcards.json")
+    manager = FlashcardManager(path)
+    manager.add_flashcard("Deck")
+    manager.add_term("Deck", "atom")
+    manager.save()
+    with open(manager.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "add_term", "card": "De')
+
+    reopened = FlashcardManager(path)
+    assert list(reopened.get_flashcard("Deck")["terms"]) == ["atom"]
+    reopened.add_term("Deck", "ion")
+    reopened.save()
+    # the next save rewrites the snapshot instead of appending after the broken line
+    assert not (tmp_path / "flashcards.json.journal").exists()
+    assert list(FlashcardManager(path).get_flashcard("Deck")["terms"]) == ["atom", "ion"]
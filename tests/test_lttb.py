@@ -0,0 +1,27 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+from stats_columns import lttb
+
+
+def test_short_series_are_kept_whole():
+    assert lttb([1, 2, 3], [5, 6, 7], 10).tolist() == [0, 1, 2]
+    assert lttb(range(50), range(50), 2).tolist() == list(range(50))
+
+
+def test_keeps_endpoints_and_budget():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 40)
+    keep = lttb(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert (np.diff(keep) > 0).all()
+
+
+def test_keeps_spikes_that_striding_drops():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[[137, 555]] = [100.0, -100.0]
+    keep = lttb(x, y, 50)
+    assert {137, 555} <= set(keep.tolist())
+    assert not {137, 555} & set(range(0, 1000, 20))
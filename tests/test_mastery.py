@@ -0,0 +1,69 @@
+import pytest
+
+from mastery_utils import TermMastery, match_terms, question_outcomes
+
+TERMS = ["Atom", "Ion", "Isotope"]
+
+
+def test_match_terms_is_case_insensitive():
+    assert match_terms("Which ION carries a charge of an atom?", TERMS) == ["Atom", "Ion"]
+
+
+def test_mcq_outcomes_match_the_stem_only():
+    mcqs = [{"index": 1, "display": "1. Which particle has no charge?", "answer": "B",
+             "full_text": "1. Which particle has no charge?\nA. Ion\nB. Neutron", "explanation": "Unlike an ion..."}]
+    (text, score), = question_outcomes("MCQ", {1: "B"}, parsed_mcqs=mcqs)
+    assert match_terms(text, TERMS + ["Neutron"]) == []
+
+
+def test_question_outcomes():
+    mcqs = [{"index": 1, "display": "1. atom?", "answer": "B"},
+            {"index": 2, "display": "2. ion?", "answer": "C"},
+            {"index": 3, "display": "3. no key"}]
+    assert question_outcomes("MCQ", {1: "b", "2": "A"}, parsed_mcqs=mcqs) == [("1. atom?", 1.0), ("2. ion?", 0.0)]
+    grades = [{"question": "isotope?", "score": 4, "max": 5}, {"question": "ion?", "score": 9}]
+    assert question_outcomes("FRQ", {}, frq_grades=grades) == [("isotope?", 0.8), ("ion?", 1.0)]
+
+
+def test_record_decays_accuracy_and_persists(tmp_path):
+    path = tmp_path / "mastery.json"
+    mastery = TermMastery(path, alpha=0.5)
+    mastery.record("Deck", TERMS, [("atom?", 1.0), ("ion and atom?", 0.0)], "t1")
+    mastery.record("Deck", TERMS, [("atom?", 1.0)], "t2")
+
+    atom = TermMastery(path).get("Deck", "Atom")
+    assert atom["attempts"] == 3 and atom["correct"] == 2.0 and atom["last_seen"] == "t2"
+    assert atom["accuracy"] == pytest.approx(0.75)   # 1 -> 0.5 -> 0.75
+    assert mastery.get("Deck", "Isotope") is None
+    assert [r["term"] for r in mastery.weakest("Deck", n=1)] == ["Ion"]
+
+
+def test_record_ignores_unmatched_outcomes(tmp_path):
+    mastery = TermMastery(tmp_path / "mastery.json")
+    assert mastery.record("Deck", TERMS, [("photosynthesis?", 1.0)], "t1") == {}
+    assert not (tmp_path / "mastery.json").exists()
+
+
+def test_attempts_are_journaled_and_compacted(tmp_path):
+    path = tmp_path / "mastery.json"
+    mastery = TermMastery(path, compact_every=3)
+    mastery.record("Deck", TERMS, [("atom?", 1.0)], "t1")
+    mastery.record("Deck", TERMS, [("ion?", 0.0)], "t2")
+    assert not path.exists()
+    assert len(mastery.journal_path.read_text(encoding="utf-8").splitlines()) == 2
+    mastery.record("Deck", TERMS, [("isotope?", 1.0)], "t3")
+    assert path.exists() and not mastery.journal_path.exists()
+    mastery.record("Deck", TERMS, [("atom?", 0.0)], "t4")
+    assert TermMastery(path).deck("Deck") == mastery.deck("Deck")
+
+
+def test_torn_journal_line_is_dropped_on_load(tmp_path):
+    path = tmp_path / "mastery.json"
+    mastery = TermMastery(path)
+    mastery.record("Deck", TERMS, [("atom?", 1.0)], "t1")
+    with open(mastery.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"deck": "Deck", "terms": {"Ion"')
+    reopened = TermMastery(path)
+    assert set(reopened.deck("Deck")) == {"Atom"}
+    # loading folds the journal into the snapshot
+    assert path.exists() and not reopened.journal_path.exists()
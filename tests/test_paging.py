@@ -0,0 +1,91 @@
+import tkinter as tk
+
+import pytest
+
+pytest.importorskip("ttkbootstrap")
+from list_utils import PagedView
+from test_gen_utils import AnswerSheet
+
+
+@pytest.fixture
+def interp():
+    # StringVars only need an interpreter, not a display
+    return tk.Tcl()
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+def test_answers_survive_page_changes(interp):
+    sheet = AnswerSheet()
+    for key in (1, 2, "FRQ_3"):
+        sheet.add(key)
+    sheet.bind(1, interp).set(" b ")
+    sheet.bind(2, interp).set("C")
+    sheet.sync()   # page 1 torn down
+    sheet.bind("FRQ_3", interp).set("  kept as typed ")
+    sheet.sync()
+    # page 1 shown again: its vars start from the saved answers
+    assert sheet.bind(1, interp).get() == " b "
+    assert sheet.collect() == {1: "b", 2: "C", "FRQ_3": "  kept as typed "}
+
+
+def test_collect_keeps_the_page_bound(interp):
+    sheet = AnswerSheet()
+    sheet.add(1)
+    var = sheet.bind(1, interp)
+    var.set("A")
+    assert sheet.collect() == {1: "A"}
+    # the page stays on screen after submit; later reads still follow its vars
+    var.set("D")
+    assert sheet.collect() == {1: "D"}
+    sheet.clear()
+    assert sheet.collect() == {}
+
+
+def test_paged_view_renders_one_page(root):
+    shown = []
+    cleared = []
+    view = PagedView(root, render=lambda parent, item: shown.append(item), page_size=10,
+                     on_clear=lambda: cleared.append(view.page))
+    view.set_items(range(25))
+    assert view.pages() == 3 and shown == list(range(10))
+    assert str(view.prev_button.cget("state")) == "disabled"
+
+    shown.clear()
+    view.show_page(5)   # clamped to the last page
+    assert view.page == 2 and shown == list(range(20, 25)) and cleared[-1] == 0
+    assert str(view.next_button.cget("state")) == "disabled"
+    assert str(view.page_label.cget("text")) == "Page 3 of 3"
+
+    # added items are drawn at once only if they land on the current page
+    shown.clear()
+    for item in range(25, 31):
+        view.add(item)
+    assert shown == [25, 26, 27, 28, 29] and view.pages() == 4
+
+
+def test_paged_answers_round_trip(root):
+    sheet = AnswerSheet()
+    vars_by_key = {}
+
+    def render(parent, key):
+        sheet.add(key)
+        vars_by_key[key] = sheet.bind(key, parent)
+
+    view = PagedView(root, render=render, page_size=2, on_clear=sheet.sync)
+    view.set_items([1, 2, 3])
+    vars_by_key[1].set("A")
+    view.show_page(1)
+    vars_by_key[3].set("B")
+    view.show_page(0)
+    assert vars_by_key[1].get() == "A"
+    assert sheet.collect() == {1: "A", 2: "", 3: "B"}
@@ -0,0 +1,49 @@
+import time
+
+from question_bank import QuestionBank, renumber, terms_signature
+
+TERMS = ["atom", "ion"]
+
+
+def fake_generate(terms, test_type):
+    return [{"index": i, "display": f"{i}. About {terms[i % len(terms)]}?", "options": {"A": "x"}}
+            for i in range(1, 6)]
+
+
+def wait_for_depth(bank, depth, timeout=5):
+    deadline = time.time() + timeout
+    while bank.depth("Deck", TERMS, "MCQ") < depth:
+        assert time.time() < deadline, "refill did not finish"
+        time.sleep(0.01)
+
+
+def test_refill_draw_and_persist(tmp_path):
+    path = tmp_path / "bank.json"
+    bank = QuestionBank(fake_generate, file_path=path, target_depth=10)
+    bank.schedule_refill("Deck", TERMS, "MCQ")
+    wait_for_depth(bank, 10)
+
+    drawn = bank.draw("Deck", TERMS, "MCQ", 4)
+    assert [q["index"] for q in drawn] == [1, 2, 3, 4]
+    assert all(q["display"].startswith(f"{q['index']}. ") for q in drawn)
+    assert bank.depth("Deck", TERMS, "MCQ") == 6
+    assert bank.draw("Deck", TERMS, "MCQ", 7) is None
+    bank.shutdown()
+
+    assert QuestionBank(fake_generate, file_path=path).depth("Deck", TERMS, "MCQ") == 6
+
+
+def test_changed_terms_or_invalidation_drop_the_bank(tmp_path):
+    bank = QuestionBank(fake_generate, file_path=tmp_path / "bank.json", target_depth=5)
+    bank.schedule_refill("Deck", TERMS, "MCQ")
+    wait_for_depth(bank, 5)
+    assert bank.depth("Deck", TERMS + ["neutron"], "MCQ") == 0
+    bank.invalidate_deck("Deck")
+    assert bank.depth("Deck", TERMS, "MCQ") == 0
+    bank.shutdown()
+
+
+def test_renumber_and_signature():
+    q = {"index": 7, "display": "7. Why?", "full_text": "7. Why?\nA. yes", "options": {"A": "yes"}}
+    assert renumber(q, 2) == {"index": 2, "display": "2. Why?", "full_text": "2. Why?\nA. yes", "options": {"A": "yes"}}
+    assert terms_signature(["b", "a"]) == terms_signature(["a", "b"])
@@ -0,0 +1,50 @@
+from question_parser import IncrementalQuestionParser, parse_questions
+
+MCQ_TEXT = """Here is your test.
+
+1. What is an atom
+made of?
+A. Protons, neutrons and electrons
+B) Only protons
+(C) Quarks
+D. Light
+Answer: A
+Explanation: Atoms are made of protons, neutrons and electrons.
+Q2: Which particle has no charge?
+A. Proton
+B. Neutron
+Correct answer: (b)
+"""
+
+
+def test_parse_mcq():
+    questions = parse_questions(MCQ_TEXT, "MCQ")
+    assert [q.index for q in questions] == [1, 2]
+    first = questions.get(1)
+    assert first.stem == "What is an atom made of?"
+    assert first.options == {"A": "Protons, neutrons and electrons", "B": "Only protons", "C": "Quarks", "D": "Light"}
+    assert first.answer == "A" and first.explanation.startswith("Atoms")
+    assert questions.get(2).answer == "B" and questions.get(2).explanation is None
+    d = first.to_dict()
+    assert d["display"] == "1. What is an atom made of?"
+    assert "Answer" not in d["full_text"] and d["answer"] == "A"
+
+
+def test_streamed_chunks_match_a_single_pass():
+    parser = IncrementalQuestionParser("MCQ")
+    emitted = []
+    for i in range(0, len(MCQ_TEXT), 7):
+        emitted += [q.index for q in parser.feed(MCQ_TEXT[i:i + 7])]
+    # the first question is complete at its explanation, the second only once the stream closes
+    assert emitted == [1]
+    emitted += [q.index for q in parser.close()]
+    assert emitted == [1, 2]
+    assert [q.to_dict() for q in parser.questions] == [q.to_dict() for q in parse_questions(MCQ_TEXT, "MCQ")]
+
+
+def test_parse_frq_numbering_and_fallback():
+    numbered = parse_questions("Answer these:\n3) Explain inertia.\nQuestion 7 - Define mass.\nGood luck!", "FRQ")
+    assert [q.text for q in numbered] == ["1. Explain inertia.", "2. Define mass."]
+    unnumbered = parse_questions("Explain inertia.\n\nDefine mass.", "FRQ")
+    assert [q.to_dict() for q in unnumbered] == [{"index": 1, "text": "1. Explain inertia."},
+                                                 {"index": 2, "text": "2. Define mass."}]
@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+from stats_columns import ResultColumns, rolling_mean
+
+
+def line(day, card="Deck", test_type="MCQ", percent=50.0, responses=None):
+    return json.dumps({"timestamp": f"2025-03-{day:02d}T10:00:00", "card_name": card, "test_type": test_type,
+                       "percent": percent, "responses": responses or {}}) + "\n"
+
+
+def append(path, *lines):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+def test_rolling_mean():
+    assert rolling_mean([2, 4, 6, 8], 2).tolist() == [2.0, 3.0, 5.0, 7.0]
+    assert rolling_mean([1, 2, 3], 5).tolist() == [1.0, 1.5, 2.0]
+    assert rolling_mean([1, 2], 1).tolist() == [1.0, 2.0]
+    assert len(rolling_mean([], 3)) == 0
+
+
+def test_refresh_reads_only_new_complete_lines(tmp_path):
+    path = tmp_path / "r.jsonl"
+    append(path, line(1, percent=40), line(2, "Other", "FRQ", 80))
+    columns = ResultColumns(path)
+    columns.refresh()
+    assert len(columns) == 2 and columns.offset == os.path.getsize(path)
+
+    # a half-written line is left for the next refresh
+    partial = line(3, percent=60)
+    append(path, partial[:10])
+    columns.refresh()
+    assert len(columns) == 2
+    append(path, partial[10:])
+    columns.refresh()
+    assert len(columns) == 3 and columns.offset == os.path.getsize(path)
+
+    times, percents = columns.scores(card_name="Deck")
+    assert percents.tolist() == [40.0, 60.0]
+    assert columns.scores(test_type="FRQ")[1].tolist() == [80.0]
+    assert columns.scores(recent_n=2)[1].tolist() == [80.0, 60.0]
+    assert len(columns.scores(card_name="Missing")[0]) == 0
+
+
+def test_rewritten_or_truncated_log_is_read_again(tmp_path):
+    path = tmp_path / "r.jsonl"
+    append(path, line(1), line(2), line(3))
+    columns = ResultColumns(path)
+    columns.refresh()
+    assert len(columns) == 3
+
+    # replaced by a new file (new inode), as migration and sealing do
+    tmp = tmp_path / "r.jsonl.tmp"
+    append(tmp, line(4, percent=90))
+    os.replace(tmp, path)
+    columns.refresh()
+    assert columns.scores()[1].tolist() == [90.0]
+
+    # truncated in place
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(line(5, percent=10)[:5])
+    columns.refresh()
+    assert len(columns) == 0
+
+    os.remove(path)
+    columns.refresh()
+    assert len(columns) == 0 and columns.offset == 0
+
+
+def test_append_skips_the_reread(tmp_path):
+    path = tmp_path / "r.jsonl"
+    append(path, line(1))
+    columns = ResultColumns(path)
+    columns.refresh()
+
+    start = os.path.getsize(path)
+    record = line(2, percent=70)
+    append(path, record)
+    columns.append(json.loads(record), start, start + len(record.encode()))
+    columns.refresh()   # already up to date: nothing is read twice
+    assert columns.scores()[1].tolist() == [50.0, 70.0]
+
+    # an append at an offset this cache hasn't reached is left to refresh()
+    other = line(3, percent=20)
+    append(path, line(4, percent=30), other)
+    columns.append(json.loads(other), start, start + 1)
+    columns.refresh()
+    assert columns.scores()[1].tolist() == [50.0, 70.0, 20.0, 30.0]
+
+
+def test_selection_counts(tmp_path):
+    path = tmp_path / "r.jsonl"
+    append(path, line(1, responses={"1": "A", "2": "B"}), line(2, responses={"1": "B"}),
+           line(3, "Other", responses={"1": "A"}), line(4, "Deck", "FRQ", responses={"FRQ_1": "text"}))
+    columns = ResultColumns(path)
+    columns.refresh()
+    times, options, cumulative = columns.selection_counts(0)
+    assert options == ["A", "B"] and cumulative.tolist() == [[1, 0], [1, 1], [2, 1]]
+    assert columns.selection_counts(0, card_name="Other")[2].tolist() == [[1]]
+    assert columns.selection_counts(1)[1] == ["B"]
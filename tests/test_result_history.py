@@ -0,0 +1,105 @@
+import json
+from datetime import datetime
+
+from test_stats import TestStats as Stats   # aliased so pytest does not try to collect it
+
+
+def mcq(index, stem):
+    return {"index": index, "display": f"{index}. {stem}", "options": {"A": "yes", "B": "no"},
+            "full_text": f"{index}. {stem}\nA. yes\nB. no", "answer": "A"}
+
+
+def add(stats, card_name, questions, responses):
+    return stats.add_result(test_type="MCQ", card_name=card_name, length="15 min", responses=responses,
+                            parsed_mcqs=questions, score=1, max_score=len(questions))
+
+
+def test_import_records_carries_questions_into_db(tmp_path):
+    source = Stats(tmp_path / "r.jsonl", legacy_path=None)
+    add(source, "Deck", [mcq(1, "First?"), mcq(2, "Second?")], {1: "A", 2: "B"})
+    add(source, "Deck", [mcq(1, "Third?")], {1: "B"})
+
+    target = Stats(tmp_path / "r.jsonl", legacy_path=None, db_path=tmp_path / "x.db")
+    target.import_records(source.get_all_results())
+
+    # a fresh instance has to find the questions in the database, not in the source's store
+    reopened = Stats(tmp_path / "r.jsonl", legacy_path=None, db_path=tmp_path / "x.db")
+    stems = [[q["display"] for q in r["parsed_mcqs"]] for r in reopened.get_all_results()]
+    assert stems == [["1. First?", "2. Second?"], ["1. Third?"]]
+    assert len(reopened.questions) == 3
+
+
+def test_import_records_between_files(tmp_path):
+    source = Stats(tmp_path / "a.jsonl", legacy_path=None)
+    add(source, "Deck", [mcq(1, "Only?")], {1: "A"})
+
+    target = Stats(tmp_path / "b.jsonl", legacy_path=None)
+    target.import_records(source.get_all_results())
+    record, = Stats(tmp_path / "b.jsonl", legacy_path=None).get_all_results()
+    assert record["parsed_mcqs"] == [mcq(1, "Only?")]
+
+
+def test_new_log_does_not_import_the_apps_history(tmp_path):
+    stats = Stats(tmp_path / "fresh.jsonl")
+    assert stats.get_all_results() == []
+    assert not (tmp_path / "fresh.archive").exists()
+
+
+def test_embedded_questions_are_moved_out_on_open(tmp_path):
+    log = tmp_path / "old.jsonl"
+    record = {"timestamp": "2099-01-01T00:00:00", "test_type": "MCQ", "card_name": "Deck",
+              "responses": {"1": "A"}, "parsed_mcqs": [mcq(1, "Old?")], "score": 1, "max_score": 1}
+    log.write_text(json.dumps(record) + "\n", encoding="utf-8")
+
+    stats = Stats(log)
+    assert "question_refs" in json.loads(log.read_text(encoding="utf-8"))
+    inode = log.stat().st_ino
+    # reads never rewrite the log
+    assert stats.get_all_results()[0]["parsed_mcqs"] == [mcq(1, "Old?")]
+    assert log.stat().st_ino == inode
+
+
+def history(tmp_path, now):
+    # two sealed months plus the current month in the hot log, and a torn last line
+    rows = [("2025-01-05T10:00:00", "Deck", "MCQ", 40.0), ("2025-01-09T10:00:00", "Café", "FRQ", 60.0),
+            ("2025-02-02T10:00:00", "Deck", "FRQ", 70.0),
+            (now + "-01T10:00:00", "Other", "MCQ", 90.0), (now + "-02T10:00:00", "Deck", "MCQ", 100.0)]
+    path = tmp_path / "r.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for ts, card, test_type, percent in rows:
+            f.write(json.dumps({"timestamp": ts, "card_name": card, "test_type": test_type,
+                                "responses": {"note": "mentions Deck"}, "parsed_mcqs": None,
+                                "percent": percent}) + "\n")
+        f.write('{"timestamp": "' + now + '-03T10:00:00", "card_name": "De')
+    return Stats(path, legacy_path=None)
+
+
+def test_iter_results_filters(tmp_path):
+    now = datetime.utcnow().strftime("%Y-%m")
+    stats = history(tmp_path, now)
+    assert [s["key"] for s in stats.archive.segments] == ["2025-01", "2025-02"]
+
+    def percents(**filters):
+        return [r["percent"] for r in stats.iter_results(**filters)]
+
+    assert percents() == [40.0, 60.0, 70.0, 90.0, 100.0]
+    assert percents(card_name="Deck") == [40.0, 70.0, 100.0]
+    assert percents(card_name="Café") == [60.0]
+    assert percents(card_name="Deck", test_type="MCQ") == [40.0, 100.0]
+    assert percents(start="2025-01-06", end=now) == [60.0, 70.0]
+    assert percents(start=datetime(2025, 2, 1)) == [70.0, 90.0, 100.0]
+    assert list(stats.iter_results(card_name="Other", fields=("timestamp", "percent"))) == \
+        [{"timestamp": now + "-01T10:00:00", "percent": 90.0}]
+
+
+def test_iter_results_skips_segments_the_index_rules_out(tmp_path):
+    stats = history(tmp_path, datetime.utcnow().strftime("%Y-%m"))
+    opened = []
+    iter_lines = stats.archive.iter_lines
+    stats.archive.iter_lines = lambda segment: (opened.append(segment["key"]), iter_lines(segment))[1]
+
+    assert len(list(stats.iter_results(card_name="Café"))) == 1
+    assert opened == ["2025-01"]
+    opened.clear()
+    assert len(list(stats.iter_results(start="2025-02-01"))) == 3
+    assert opened == ["2025-02"]
@@ -0,0 +1,101 @@
+import os
+import random
+
+from fc_utils import FlashcardManager
+from review_utils import DAY, INITIAL_EASE, MIN_EASE, ReviewScheduler, sm2
+
+NOW = 1_700_000_000
+
+
+def test_sm2_intervals():
+    state = [NOW, 0, INITIAL_EASE, 0]
+    state = sm2(state, 4, NOW)
+    assert state == [NOW + DAY, 1, 2.5, 1]
+    state = sm2(state, 4, NOW)
+    assert state[1:] == [6, 2.5, 2]
+    state = sm2(state, 5, NOW)
+    assert state[1:] == [15, 2.6, 3]
+    # a lapse restarts the intervals and lowers the ease
+    state = sm2(state, 1, NOW)
+    assert state[1] == 1 and state[3] == 0 and state[2] < 2.6
+
+
+def test_sm2_ease_floor():
+    state = [NOW, 1, MIN_EASE, 0]
+    assert sm2(state, 0, NOW)[2] == MIN_EASE
+
+
+def deck(tmp_path, terms):
+    manager = FlashcardManager(str(tmp_path / "flashcards.json"))
+    manager.add_flashcard("Deck")
+    for term in terms:
+        manager.add_term("Deck", term)
+    return manager
+
+
+def test_next_due_follows_answers(tmp_path):
+    manager = deck(tmp_path, ["atom", "ion", "isotope"])
+    scheduler = ReviewScheduler(manager)
+    now = NOW * 2   # new terms are due at creation time, so this is after all of them
+    assert scheduler.due_count("Deck", now) == 3
+    seen = set()
+    for _ in range(3):
+        term = scheduler.next_due("Deck", now)
+        seen.add(term)
+        scheduler.answer("Deck", term, 4, now)
+    assert seen == {"atom", "ion", "isotope"}
+    assert scheduler.next_due("Deck", now) is None
+    assert scheduler.due_count("Deck", now + DAY) == 3
+    assert scheduler.next_due_time("Deck") == now + DAY
+
+
+def test_state_persists_and_tracks_deck_changes(tmp_path):
+    manager = deck(tmp_path, ["atom", "ion"])
+    scheduler = ReviewScheduler(manager)
+    due = scheduler.answer("Deck", "atom", 5, NOW)
+    scheduler.flush()
+
+    reopened = ReviewScheduler(manager)
+    assert reopened.get_state("Deck", "atom") == {"due": due, "interval_days": 1, "ease": 2.6, "reps": 1}
+
+    # a deleted term drops out; an added one is due straight away
+    manager.delete_term("Deck", "ion")
+    manager.add_term("Deck", "proton")
+    later = NOW * 2   # new terms are due at the wall-clock time they were added
+    assert reopened.next_due("Deck", later) in {"atom", "proton"}
+    assert reopened.due_count("Deck", later) == 2
+    reopened.answer("Deck", "proton", 4, later)
+    reopened.answer("Deck", "atom", 4, later)
+    assert reopened.next_due("Deck", later) is None
+
+
+def test_due_count_matches_a_full_scan(tmp_path):
+    rng = random.Random(7)
+    terms = [f"term {i}" for i in range(200)]
+    manager = deck(tmp_path, terms)
+    scheduler = ReviewScheduler(manager)
+    now = NOW * 2
+    for step in range(600):
+        now += rng.choice([0, 600, DAY // 2, 3 * DAY])
+        term = scheduler.next_due("Deck", now) or rng.choice(terms)
+        scheduler.answer("Deck", term, rng.choice([1, 3, 4, 5]), now)
+        if step % 150 == 0:
+            manager.delete_term("Deck", terms.pop(rng.randrange(len(terms))))
+        expected = sum(1 for t in terms if scheduler.get_state("Deck", t)["due"] <= now)
+        assert scheduler.due_count("Deck", now) == expected
+
+
+def test_deleting_a_deck_removes_its_state_file(tmp_path):
+    manager = deck(tmp_path, ["atom"])
+    scheduler = ReviewScheduler(manager)
+    scheduler.answer("Deck", "atom", 4, NOW)
+    scheduler.flush()
+    path = scheduler._path("Deck")
+    assert os.path.exists(path)
+    manager.save()
+
+    # a later session deletes the deck without having reviewed it
+    manager = FlashcardManager(str(tmp_path / "flashcards.json"))
+    ReviewScheduler(manager)
+    manager.delete_flashcard("Deck")
+    assert not os.path.exists(path)
@@ -0,0 +1,49 @@
+from term_index import PrefixIndex, TermIndex, normalize
+
+PAIRS = [("Physics", "Newton's 2nd Law"), ("Physics", "Momentum"), ("History", "French Revolution"),
+         ("History", "Industrial Revolution"), ("Chemistry", "Momentum")]
+
+
+def test_normalize():
+    assert normalize("  Newton's   2nd LAW ") == "newtons 2nd law"
+
+
+def test_prefix_index_matches_any_word():
+    index = PrefixIndex(["Revolution", "French Revolution", "Reaction"])
+    assert index.search("rev") == ["French Revolution", "Revolution"]   # in key order, no duplicates
+    assert index.search("french re") == ["French Revolution"]
+    assert len(index.search("re", limit=2)) == 2
+    index.remove("Reaction")
+    assert index.search("rea") == []
+
+
+def test_exact_and_prefix_lookups():
+    index = TermIndex(PAIRS)
+    assert len(index) == 5
+    assert sorted(index.exact("momentum")) == [("Chemistry", "Momentum"), ("Physics", "Momentum")]
+    assert index.exact("newtons 2nd law!") == [("Physics", "Newton's 2nd Law")]
+    assert set(index.prefix("revol")) == {("History", "French Revolution"), ("History", "Industrial Revolution")}
+    assert index.prefix("zzz") == []
+
+
+def test_fuzzy_finds_typos_and_ranks_exact_first():
+    index = TermIndex(PAIRS)
+    hits = index.fuzzy("Industrail Revolution")
+    assert hits[0][1:] == ("History", "Industrial Revolution")
+    assert all(score >= 0.7 for score, _, _ in hits)
+    assert index.fuzzy("momentum") == [(1.0, "Physics", "Momentum"), (1.0, "Chemistry", "Momentum")]
+    assert index.fuzzy("photosynthesis") == []
+    assert index.fuzzy("!!!") == []
+
+
+def test_add_and_remove_keep_lookups_current():
+    index = TermIndex(PAIRS)
+    index.add("Biology", "Photosynthesis")
+    assert index.fuzzy("photosynthsis")[0][1:] == ("Biology", "Photosynthesis")
+    assert index.prefix("photo") == [("Biology", "Photosynthesis")]
+    index.remove("Biology", "Photosynthesis")
+    index.remove("Biology", "Photosynthesis")   # removing twice is a no-op
+    assert len(index) == 5
+    assert index.fuzzy("photosynthesis") == [] and index.prefix("photo") == []
+    index.remove("Physics", "Momentum")
+    assert index.exact("momentum") == [("Chemistry", "Momentum")]
@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+import tkinter as tk
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+import ttkbootstrap as ttk
+
+# how long the UI waits on a single AI call before giving up on it
+DEFAULT_AI_TIMEOUT = 90
+
+
+class AITask:
+    """Handle for a background AI call; results are delivered on the Tk thread."""
+    def __init__(self, widget, on_success, on_error, timeout, poll_ms, on_item=None):
+        self.future = None
+        self.widget = widget
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_item = on_item
+        self.timeout = timeout
+        self.poll_ms = poll_ms
+        self.started = time.monotonic()
+        self.cancelled = False
+        self.finished = False
+        self._items = queue.SimpleQueue()
+
+    def cancel(self):
+        # a plain call already in flight can't be interrupted and its result is simply dropped;
+        # a streaming call stops at its next emit()
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def emit(self, item):
+        # called from the worker thread by streaming tasks
+        if self.cancelled:
+            raise CancelledError()
+        self._items.put(item)
+
+    def _drain(self):
+        while not self.cancelled:
+            try:
+                item = self._items.get_nowait()
+            except queue.Empty:
+                return
+            if self.on_item:
+                self.on_item(item)
+
+    def _poll(self):
+        if self.cancelled or self.finished:
+            return
+        try:
+            if not self.widget.winfo_exists():
+                self.cancel()
+                return
+        except tk.TclError:
+            self.cancel()
+            return
+
+        self._drain()
+        if self.future.done():
+            self.finished = True
+            self._drain()
+            try:
+                value = self.future.result()
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+                return
+            if self.on_success:
+                self.on_success(value)
+            return
+
+        if self.timeout is not None and time.monotonic() - self.started > self.timeout:
+            self.finished = True
+            self.cancel()
+            if self.on_error:
+                self.on_error(TimeoutError(f"AI request timed out after {self.timeout:.0f}s"))
+            return
+
+        self.widget.after(self.poll_ms, self._poll)
+
+
+class AIWorker:
+    """
+    Runs blocking AI calls on a thread pool so the Tk mainloop keeps running.
+    Tk is not thread-safe, so worker threads never touch widgets: the main thread polls
+    each future with after() and calls on_success / on_error itself.
+    """
+    def __init__(self, max_workers=4, poll_ms=50):
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-worker")
+
+    def submit(self, widget, fn, *args, on_success=None, on_error=None, timeout=None, **kwargs):
+        task = AITask(widget, on_success, on_error, timeout, self.poll_ms)
+        task.future = self._executor.submit(fn, *args, **kwargs)
+        widget.after(self.poll_ms, task._poll)
+        return task
+
+    def submit_stream(self, widget, fn, *args, on_item=None, on_success=None, on_error=None, timeout=None, **kwargs):
+        """
+        Like submit(), for producers: fn is called with an extra emit= callback and every
+        emitted item is handed to on_item on the Tk thread as soon as the next poll runs.
+        """
+        task = AITask(widget, on_success, on_error, timeout, self.poll_ms, on_item=on_item)
+        task.future = self._executor.submit(fn, *args, emit=task.emit, **kwargs)
+        widget.after(self.poll_ms, task._poll)
+        return task
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BusyIndicator:
+    """Label + indeterminate progress bar shown while a task is running."""
+    def __init__(self, parent, text="Working..."):
+        self.frame = ttk.Frame(parent)
+        self.label = ttk.Label(self.frame, text=text, bootstyle="info")
+        self.label.pack(pady=(0, 5))
+        self.bar = ttk.Progressbar(self.frame, mode="indeterminate", bootstyle="info-striped", length=250)
+        self.bar.pack()
+        self.frame.pack(pady=10)
+        self.bar.start(10)
+
+    def set_text(self, text):
+        self.label.config(text=text)
+
+    def destroy(self):
+        try:
+            self.bar.stop()
+            self.frame.destroy()
+        except tk.TclError:
+            pass
+
+
+_default_worker = None
+_default_worker_lock = threading.Lock()
+
+
+def get_ai_worker():
+    # one pool per process, shared by the main window and the test windows
+    global _default_worker
+    with _default_worker_lock:
+        if _default_worker is None:
+            _default_worker = AIWorker()
+        return _default_worker